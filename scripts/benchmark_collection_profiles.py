@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Compare Qdrant collection profiles against the full-precision baseline.
+
+For every profile in COLLECTION_PROFILES this script:
+1. Builds a collection from the parsed and chunked policy corpus
+2. Runs the same queries against it
+3. Reports recall@k against exact full-precision search, p50/p99 latency
+   and the Qdrant server's RSS growth while the collection was loaded
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import urllib.request
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from qdrant_client.http import models
+
+from g_sia.core.document_parser import PolicyDocumentParser
+from g_sia.core.content_aware_chunker import ContentAwareChunker
+from g_sia.core.qdrant_vector_store import QdrantPolicyVectorStore, COLLECTION_PROFILES
+
+from benchmark_utils import percentile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERIES = [
+    "What are the key principles of GDPR?",
+    "Lawfulness of processing personal data",
+    "Conditions for consent",
+    "Processing of special categories of personal data",
+    "Right to erasure and right to be forgotten",
+    "Data protection by design and by default",
+    "Notification of a personal data breach to the supervisory authority",
+    "Transfers of personal data to third countries",
+    "HIPAA privacy rule requirements",
+    "Uses and disclosures of protected health information",
+    "Minimum necessary standard",
+    "De-identification of protected health information",
+    "Business associate contracts",
+    "Breach notification to individuals",
+    "Civil money penalties for violations",
+    "Consumer right to delete personal information under CCPA",
+]
+
+# Bytes per vector dimension kept in RAM for each quantization mode
+RAM_BYTES_PER_DIMENSION = {None: 4.0, "scalar": 1.0, "binary": 1.0 / 8}
+
+
+def estimate_vector_ram(settings: Dict[str, Any], points: int, dimension: int) -> int:
+    """Estimate the bytes of vector data a profile keeps in RAM."""
+    ram = points * dimension * RAM_BYTES_PER_DIMENSION[settings["quantization"]]
+    if settings["quantization"] and not settings["on_disk_vectors"]:
+        # Original float32 vectors stay in RAM next to the quantized copy
+        ram += points * dimension * 4
+    return int(ram)
+
+
+def get_server_rss(qdrant_url: str) -> Optional[int]:
+    """Read the Qdrant server's resident memory from its Prometheus metrics."""
+    try:
+        with urllib.request.urlopen(f"{qdrant_url.rstrip('/')}/metrics", timeout=5) as response:
+            for line in response.read().decode("utf-8").splitlines():
+                if line.startswith("memory_resident_bytes"):
+                    return int(float(line.split()[-1]))
+    except Exception as e:
+        logger.warning(f"Could not read Qdrant metrics: {e}")
+    return None
+
+
+def wait_until_indexed(store: QdrantPolicyVectorStore, timeout: float = 300.0):
+    """Wait until the collection has finished optimizing."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = store.client.get_collection(store.collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1.0)
+    logger.warning(f"Collection '{store.collection_name}' still optimizing after {timeout:.0f}s")
+
+
+def build_profile_store(
+    profile: str,
+    chunks: List[Any],
+    collection_prefix: str,
+    qdrant_url: str
+) -> QdrantPolicyVectorStore:
+    """Create and populate the collection for one profile."""
+    store = QdrantPolicyVectorStore(
+        collection_name=f"{collection_prefix}_{profile.replace('-', '_')}",
+        qdrant_url=qdrant_url,
+        collection_profile=profile
+    )
+    # Build the HNSW graph even for a small corpus so the profile is actually exercised
+    store.client.update_collection(
+        collection_name=store.collection_name,
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1)
+    )
+    if not store.add_chunks(chunks, incremental=True):
+        raise RuntimeError(f"Failed to populate collection for profile '{profile}'")
+    wait_until_indexed(store)
+    return store
+
+
+def run_queries(store: QdrantPolicyVectorStore, queries: List[str], k: int) -> Dict[str, Any]:
+    """Run all queries and collect ranked chunk ids and latencies."""
+    # Warm up the query embedding cache so only search latency is measured
+    for query in queries:
+        store.embeddings.embed_query(query)
+    
+    rankings = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        results = store.search_similar(query, limit=k, score_threshold=0.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rankings.append([result.get("metadata", {}).get("chunk_id") for result in results])
+    
+    return {"rankings": rankings, "latencies_ms": latencies}
+
+
+def benchmark_profiles(
+    policy_docs_dir: str,
+    queries: List[str],
+    k: int,
+    collection_prefix: str,
+    qdrant_url: str,
+    keep_collections: bool
+) -> Dict[str, Any]:
+    """
+    Build every profile and compare it with the full-precision baseline.
+    
+    Args:
+        policy_docs_dir: Directory containing policy documents
+        queries: Benchmark queries
+        k: Cutoff for recall@k
+        collection_prefix: Prefix for the temporary collections
+        qdrant_url: Qdrant server URL
+        keep_collections: Whether to keep the collections afterwards
+    
+    Returns:
+        Report dictionary keyed by profile
+    """
+    parser = PolicyDocumentParser()
+    chunker = ContentAwareChunker()
+    chunks = []
+    for md_file in sorted(Path(policy_docs_dir).glob("*/*.md")):
+        chunks.extend(chunker.chunk_document_sections(parser.parse_document(str(md_file))))
+    logger.info(f"Benchmarking {len(COLLECTION_PROFILES)} profiles on {len(chunks)} chunks")
+    
+    # Baseline first, so its rankings serve as ground truth
+    profiles = ["full-precision"] + [name for name in COLLECTION_PROFILES if name != "full-precision"]
+    report = {}
+    ground_truth = None
+    
+    for profile in profiles:
+        rss_before = get_server_rss(qdrant_url)
+        store = build_profile_store(profile, chunks, collection_prefix, qdrant_url)
+        rss_after = get_server_rss(qdrant_url)
+        
+        run = run_queries(store, queries, k)
+        if ground_truth is None:
+            ground_truth = run["rankings"]
+        
+        recalls = []
+        for expected, actual in zip(ground_truth, run["rankings"]):
+            if expected:
+                recalls.append(len(set(expected[:k]) & set(actual[:k])) / len(expected[:k]))
+        
+        settings = COLLECTION_PROFILES[profile]
+        report[profile] = {
+            "recall_at_k": sum(recalls) / len(recalls) if recalls else 0.0,
+            "p50_ms": percentile(run["latencies_ms"], 50),
+            "p99_ms": percentile(run["latencies_ms"], 99),
+            "server_rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            "estimated_ram_vector_bytes": estimate_vector_ram(settings, len(chunks), store.vector_size),
+            "settings": settings,
+        }
+        
+        if not keep_collections:
+            store.delete_collection()
+    
+    return {"k": k, "queries": len(queries), "chunks": len(chunks), "profiles": report}
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Compare Qdrant collection profiles")
+    parser.add_argument(
+        "--policy-docs",
+        default="policy_corpus/output",
+        help="Directory containing policy documents"
+    )
+    parser.add_argument(
+        "--queries-file",
+        help="Optional file with one benchmark query per line"
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=10,
+        help="Cutoff for recall@k"
+    )
+    parser.add_argument(
+        "--collection-prefix",
+        default="profile_bench",
+        help="Prefix for the temporary benchmark collections"
+    )
+    parser.add_argument(
+        "--qdrant-url",
+        default="http://localhost:6333",
+        help="Qdrant server URL"
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the benchmark collections afterwards"
+    )
+    parser.add_argument(
+        "--output",
+        help="Optional path for the JSON report"
+    )
+    
+    args = parser.parse_args()
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Missing required environment variable: OPENAI_API_KEY")
+        sys.exit(1)
+    
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        with open(args.queries_file, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    
+    report = benchmark_profiles(
+        policy_docs_dir=args.policy_docs,
+        queries=queries,
+        k=args.k,
+        collection_prefix=args.collection_prefix,
+        qdrant_url=args.qdrant_url,
+        keep_collections=args.keep
+    )
+    
+    print(f"\n📊 Collection profiles ({report['chunks']} chunks, {report['queries']} queries, k={report['k']})")
+    print("=" * 78)
+    print(f"{'profile':<16}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS Δ MiB':>12}{'est. RAM MiB':>14}")
+    for profile, row in report["profiles"].items():
+        rss = row["server_rss_delta_bytes"]
+        rss_str = f"{rss / 2**20:.1f}" if rss is not None else "n/a"
+        print(
+            f"{profile:<16}{row['recall_at_k']:>10.3f}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            f"{rss_str:>12}{row['estimated_ram_vector_bytes'] / 2**20:>14.1f}"
+        )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📁 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Retrieval quality and latency benchmark for the policy vector stores.
+
+Runs a versioned, labelled query set (expected GDPR articles and HIPAA sections)
+against any vector store backend and reports:
+1. Quality: recall@k, MRR and nDCG@k, judged per section
+2. Latency: cold (first run of each query) and warm (repeat) p50/p95/p99
+3. Throughput: sequential queries per second and batched search_many throughput
+
+By default it builds a local FAISS index with hashing embeddings, so it runs
+fully offline. Results are written as JSON so runs can be compared.
+"""
+
+import sys
+import json
+import math
+import time
+import logging
+import platform
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.document_parser import PolicyDocumentParser
+from g_sia.core.content_aware_chunker import ContentAwareChunker
+from g_sia.core.vector_store_base import PolicyVectorStore, create_vector_store
+from g_sia.core.diversification import section_key
+
+from benchmark_utils import percentile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_SET = Path(__file__).parent.parent / "policy_corpus" / "benchmarks" / "retrieval_queries_v1.json"
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """Summarize a list of latencies."""
+    return {
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "mean_ms": sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+    }
+
+
+def load_query_set(path: str) -> Dict[str, Any]:
+    """Load a labelled query set."""
+    with open(path, 'r', encoding='utf-8') as f:
+        query_set = json.load(f)
+    if "version" not in query_set or "queries" not in query_set:
+        raise ValueError(f"Query set {path} needs 'version' and 'queries'")
+    return query_set
+
+
+def ranked_sections(results: List[Dict[str, Any]]) -> List[str]:
+    """Section keys of the results in rank order, each section counted once."""
+    sections = []
+    for result in results:
+        key = section_key(result.get("metadata") or {})
+        if key not in sections:
+            sections.append(key)
+    return sections
+
+
+def score_ranking(ranking: List[str], expected: List[str], k: int) -> Dict[str, float]:
+    """
+    Compute recall@k, reciprocal rank and binary nDCG@k for one query.
+    
+    Args:
+        ranking: Retrieved section keys in rank order
+        expected: Relevant section keys
+        k: Cutoff
+    
+    Returns:
+        Metric dictionary
+    """
+    relevant = set(expected)
+    top_k = ranking[:k]
+    
+    recall = len(relevant & set(top_k)) / len(relevant) if relevant else 0.0
+    reciprocal_rank = next((1.0 / rank for rank, key in enumerate(ranking, 1) if key in relevant), 0.0)
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, key in enumerate(top_k, 1) if key in relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    
+    return {
+        "recall_at_k": recall,
+        "reciprocal_rank": reciprocal_rank,
+        "ndcg_at_k": dcg / ideal if ideal else 0.0,
+    }
+
+
+def build_chunks(policy_docs_dir: str) -> List[Any]:
+    """Parse and chunk the policy corpus."""
+    parser = PolicyDocumentParser()
+    chunker = ContentAwareChunker(store_context_overlaps=False)
+    chunks = []
+    for md_file in sorted(Path(policy_docs_dir).glob("*/*.md")):
+        chunks.extend(chunker.chunk_document_sections(parser.parse_document(str(md_file))))
+    return chunks
+
+
+def run_pass(
+    store: PolicyVectorStore,
+    queries: List[Dict[str, Any]],
+    k: int,
+    score_threshold: Optional[float]
+) -> Dict[str, Any]:
+    """Run every query once and collect rankings and latencies."""
+    rankings = []
+    latencies = []
+    start = time.perf_counter()
+    for item in queries:
+        query_start = time.perf_counter()
+        results = store.search_similar(item["query"], limit=k, score_threshold=score_threshold)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        rankings.append(ranked_sections(results))
+    elapsed = time.perf_counter() - start
+    return {
+        "rankings": rankings,
+        "latencies_ms": latencies,
+        "queries_per_second": len(queries) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def benchmark_retrieval(
+    store: PolicyVectorStore,
+    query_set: Dict[str, Any],
+    k: int,
+    score_threshold: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run the labelled query set against a store.
+    
+    Args:
+        store: Populated vector store
+        query_set: Labelled query set
+        k: Cutoff for recall@k and nDCG@k
+        score_threshold: Minimum similarity score passed to the store
+    
+    Returns:
+        Report dictionary
+    """
+    queries = query_set["queries"]
+    
+    cold = run_pass(store, queries, k, score_threshold)
+    warm = run_pass(store, queries, k, score_threshold)
+    
+    batch_start = time.perf_counter()
+    store.search_many([item["query"] for item in queries], limit=k, score_threshold=score_threshold)
+    batch_elapsed = time.perf_counter() - batch_start
+    
+    per_query = []
+    for item, ranking in zip(queries, cold["rankings"]):
+        expected = [section_key(label) for label in item["expected"]]
+        per_query.append({
+            "id": item["id"],
+            **score_ranking(ranking, expected, k),
+            "retrieved": ranking[:k],
+            "expected": expected,
+        })
+    
+    count = len(per_query)
+    return {
+        "quality": {
+            "recall_at_k": sum(q["recall_at_k"] for q in per_query) / count if count else 0.0,
+            "mrr": sum(q["reciprocal_rank"] for q in per_query) / count if count else 0.0,
+            "ndcg_at_k": sum(q["ndcg_at_k"] for q in per_query) / count if count else 0.0,
+        },
+        "latency": {
+            "cold": latency_summary(cold["latencies_ms"]),
+            "warm": latency_summary(warm["latencies_ms"]),
+        },
+        "throughput": {
+            "cold_queries_per_second": cold["queries_per_second"],
+            "warm_queries_per_second": warm["queries_per_second"],
+            "batch_queries_per_second": len(queries) / batch_elapsed if batch_elapsed > 0 else 0.0,
+        },
+        "per_query": per_query,
+    }
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark policy retrieval quality and latency")
+    parser.add_argument(
+        "--policy-docs",
+        default="policy_corpus/output",
+        help="Directory containing policy documents"
+    )
+    parser.add_argument(
+        "--query-set",
+        default=str(DEFAULT_QUERY_SET),
+        help="Labelled query set (JSON)"
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=10,
+        help="Cutoff for recall@k and nDCG@k"
+    )
+    parser.add_argument(
+        "--score-threshold",
+        type=float,
+        default=None,
+        help="Minimum similarity score (default: none)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["faiss", "qdrant"],
+        default="faiss",
+        help="Vector store backend (faiss runs without a server)"
+    )
+    parser.add_argument(
+        "--embedding-provider",
+        choices=["hashing", "local", "openai"],
+        default="hashing",
+        help="Embedding provider (hashing runs offline without a model)"
+    )
+    parser.add_argument(
+        "--collection",
+        default="retrieval_bench",
+        help="Collection name for the benchmark index"
+    )
+    parser.add_argument(
+        "--index-dir",
+        help="FAISS index directory (default: a temporary directory)"
+    )
+    parser.add_argument(
+        "--qdrant-url",
+        default="http://localhost:6333",
+        help="Qdrant server URL"
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_true",
+        help="Disable the retrieval result cache so warm runs measure search itself"
+    )
+    parser.add_argument(
+        "--output",
+        help="Optional path for the JSON report"
+    )
+    
+    args = parser.parse_args()
+    
+    query_set = load_query_set(args.query_set)
+    
+    store_options = {
+        "collection_name": args.collection,
+        "embedding_provider": args.embedding_provider,
+        "embedding_cache_dir": None,
+        "result_cache_size": 0 if args.no_result_cache else 1024,
+    }
+    temp_dir = None
+    if args.backend == "faiss":
+        if not args.index_dir:
+            temp_dir = tempfile.TemporaryDirectory(prefix="retrieval_bench_")
+        store_options["index_dir"] = args.index_dir or temp_dir.name
+    else:
+        store_options["qdrant_url"] = args.qdrant_url
+    
+    try:
+        chunks = build_chunks(args.policy_docs)
+        logger.info(f"Indexing {len(chunks)} chunks with {args.backend}/{args.embedding_provider}")
+        
+        store = create_vector_store(args.backend, **store_options)
+        store.clear_collection()
+        index_start = time.perf_counter()
+        if not store.add_chunks(chunks):
+            raise RuntimeError("Failed to build the benchmark index")
+        index_seconds = time.perf_counter() - index_start
+        
+        report = benchmark_retrieval(store, query_set, args.k, args.score_threshold)
+        report = {
+            "query_set": {"path": args.query_set, "version": query_set["version"], "queries": len(query_set["queries"])},
+            "config": {
+                "backend": args.backend,
+                "embedding_provider": args.embedding_provider,
+                "k": args.k,
+                "score_threshold": args.score_threshold,
+                "result_cache": not args.no_result_cache,
+                "chunks": len(chunks),
+                "index_seconds": index_seconds,
+            },
+            "environment": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            **report,
+        }
+        
+        if args.backend == "qdrant":
+            store.delete_collection()
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    
+    quality = report["quality"]
+    print(f"\n📊 Retrieval benchmark (query set v{query_set['version']}, {len(query_set['queries'])} queries, k={args.k})")
+    print("=" * 60)
+    print(f"recall@{args.k}: {quality['recall_at_k']:.3f}   MRR: {quality['mrr']:.3f}   nDCG@{args.k}: {quality['ndcg_at_k']:.3f}")
+    for phase in ("cold", "warm"):
+        latency = report["latency"][phase]
+        print(
+            f"{phase:<5} p50 {latency['p50_ms']:.2f} ms   p95 {latency['p95_ms']:.2f} ms   "
+            f"p99 {latency['p99_ms']:.2f} ms   {report['throughput'][f'{phase}_queries_per_second']:.1f} q/s"
+        )
+    print(f"batch {report['throughput']['batch_queries_per_second']:.1f} q/s")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📁 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Show that structural parsing scales linearly with document size.
+
+The script builds synthetic documents by repeating a corpus document (by default
+GDPR.md) up to 100 times, writes each one to a temporary file and times:
+1. The lexer alone (classifying every line of the file)
+2. Section building on top of the lexer (everything parse_document does except
+   sentence counting, which depends on the NLP backend)
+
+Runtime per megabyte should stay flat as the documents grow; the report includes
+a least-squares fit of runtime against size and its coefficient of determination.
+"""
+
+import sys
+import json
+import time
+import logging
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.document_parser import PolicyDocumentParser, DocumentType
+from g_sia.core.section_lexer import lex_lines
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def linear_fit(sizes: List[float], seconds: List[float]) -> Dict[str, float]:
+    """Least-squares fit of seconds = slope * size + intercept, with R²."""
+    n = len(sizes)
+    mean_x = sum(sizes) / n
+    mean_y = sum(seconds) / n
+    sxx = sum((x - mean_x) ** 2 for x in sizes)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(sizes, seconds))
+    slope = sxy / sxx if sxx else 0.0
+    intercept = mean_y - slope * mean_x
+    ss_total = sum((y - mean_y) ** 2 for y in seconds)
+    ss_residual = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(sizes, seconds))
+    return {
+        "seconds_per_mb": slope,
+        "intercept_seconds": intercept,
+        "r_squared": 1 - ss_residual / ss_total if ss_total else 1.0,
+    }
+
+
+def time_file(file_path: Path, parser: PolicyDocumentParser, doc_type: DocumentType, repeats: int) -> Dict[str, Any]:
+    """Best-of-repeats timings of the lexer and of section building over one file."""
+    lex_seconds = build_seconds = float("inf")
+    for _ in range(repeats):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            start = time.perf_counter()
+            events = sum(1 for _ in lex_lines(f))
+            lex_seconds = min(lex_seconds, time.perf_counter() - start)
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            start = time.perf_counter()
+            sections = sum(1 for _ in parser.iter_structured_sections(f, doc_type))
+            build_seconds = min(build_seconds, time.perf_counter() - start)
+    
+    return {
+        "events": events,
+        "sections": sections,
+        "lex_seconds": lex_seconds,
+        "build_seconds": build_seconds,
+    }
+
+
+def benchmark_lexer(source_path: str, multipliers: List[int], repeats: int) -> Dict[str, Any]:
+    """
+    Time parsing of synthetic documents of growing size.
+    
+    Args:
+        source_path: Corpus document that is repeated
+        multipliers: Number of copies in each synthetic document
+        repeats: Timing repetitions per document (the fastest run is kept)
+    
+    Returns:
+        Report dictionary
+    """
+    source = Path(source_path).read_text(encoding='utf-8')
+    if not source.endswith('\n'):
+        source += '\n'
+    parser = PolicyDocumentParser()
+    doc_type = parser.detect_document_type(source)
+    
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for multiplier in multipliers:
+            file_path = Path(tmp_dir) / f"synthetic_{multiplier}x.md"
+            with open(file_path, 'w', encoding='utf-8') as f:
+                for _ in range(multiplier):
+                    f.write(source)
+            size_mb = file_path.stat().st_size / 1_000_000
+            
+            timings = time_file(file_path, parser, doc_type, repeats)
+            runs.append({
+                "multiplier": multiplier,
+                "size_mb": size_mb,
+                **timings,
+                "lex_mb_per_second": size_mb / timings["lex_seconds"],
+                "build_mb_per_second": size_mb / timings["build_seconds"],
+            })
+            logger.info(f"{multiplier}x ({size_mb:.1f} MB): {timings['build_seconds']:.2f}s, {timings['sections']} sections")
+            file_path.unlink()
+    
+    sizes = [run["size_mb"] for run in runs]
+    smallest, largest = runs[0], runs[-1]
+    return {
+        "source": source_path,
+        "runs": runs,
+        "lexer_fit": linear_fit(sizes, [run["lex_seconds"] for run in runs]),
+        "build_fit": linear_fit(sizes, [run["build_seconds"] for run in runs]),
+        # 1.0 means perfectly linear; superlinear parsing shows up as a growing ratio
+        "per_mb_ratio": (
+            (largest["build_seconds"] / largest["size_mb"]) / (smallest["build_seconds"] / smallest["size_mb"])
+        ),
+    }
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark the section lexer on synthetic documents")
+    parser.add_argument(
+        "--source",
+        default="policy_corpus/output/GDPR/GDPR.md",
+        help="Corpus document repeated to build the synthetic documents"
+    )
+    parser.add_argument(
+        "--multipliers",
+        default="1,10,25,50,100",
+        help="Comma-separated document sizes, in copies of the source"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timing repetitions per document"
+    )
+    parser.add_argument(
+        "--output",
+        help="Optional path for the JSON report"
+    )
+    
+    args = parser.parse_args()
+    
+    multipliers = sorted(int(value) for value in args.multipliers.split(","))
+    report = benchmark_lexer(args.source, multipliers, args.repeats)
+    
+    print(f"\n📊 Section lexer scaling ({Path(args.source).name})")
+    print("=" * 60)
+    for run in report["runs"]:
+        print(
+            f"{run['multiplier']:>4}x {run['size_mb']:7.1f} MB: lex {run['lex_seconds']:6.2f}s "
+            f"({run['lex_mb_per_second']:5.1f} MB/s), sections {run['build_seconds']:6.2f}s "
+            f"({run['build_mb_per_second']:5.1f} MB/s)"
+        )
+    build_fit = report["build_fit"]
+    print(
+        f"\nfit: {build_fit['seconds_per_mb'] * 1000:.1f} ms/MB, R² {build_fit['r_squared']:.4f}; "
+        f"time per MB at {multipliers[-1]}x vs {multipliers[0]}x: {report['per_mb_ratio']:.2f}"
+    )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📁 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compare the rule-based legal sentence segmenter with the spaCy path.
+
+For the parsed sections of every document in the policy corpus this script:
+1. Segments all section texts with both backends and reports the time taken
+2. Measures boundary agreement (precision/recall/F1 of the regex boundaries
+   against the spaCy boundaries, by character offset)
+3. Times a full chunking run of the corpus with each backend
+"""
+
+import sys
+import json
+import time
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Set
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.document_parser import PolicyDocumentParser
+from g_sia.core.content_aware_chunker import ContentAwareChunker
+from g_sia.core.legal_segmenter import LegalSentenceSegmenter
+from g_sia.core.nlp_service import get_nlp_service
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def boundary_offsets(spans: List[tuple]) -> Set[int]:
+    """Sentence end offsets, excluding the end of the text."""
+    return {end for _, end in spans[:-1]}
+
+
+def benchmark_segmenters(policy_docs_dir: str) -> Dict[str, Any]:
+    """
+    Run both backends over the corpus.
+    
+    Args:
+        policy_docs_dir: Directory containing policy documents
+    
+    Returns:
+        Report dictionary
+    """
+    parser = PolicyDocumentParser()
+    sections_by_file = {}
+    for md_file in sorted(Path(policy_docs_dir).glob("*/*.md")):
+        sections_by_file[md_file.name] = parser.parse_document(str(md_file))
+    texts = [section.content for sections in sections_by_file.values() for section in sections]
+    logger.info(f"Segmenting {len(texts)} sections ({sum(len(t) for t in texts)} characters)")
+    
+    # Load spaCy before timing so only segmentation is measured
+    get_nlp_service().nlp
+    start = time.perf_counter()
+    reference = get_nlp_service().sentence_spans_many(texts)
+    spacy_seconds = time.perf_counter() - start
+    
+    segmenter = LegalSentenceSegmenter()
+    start = time.perf_counter()
+    candidate = [segmenter.sentence_spans(text) for text in texts]
+    regex_seconds = time.perf_counter() - start
+    
+    matched = expected = predicted = 0
+    for reference_spans, candidate_spans in zip(reference, candidate):
+        reference_ends = boundary_offsets(reference_spans)
+        candidate_ends = boundary_offsets(candidate_spans)
+        matched += len(reference_ends & candidate_ends)
+        expected += len(reference_ends)
+        predicted += len(candidate_ends)
+    precision = matched / predicted if predicted else 1.0
+    recall = matched / expected if expected else 1.0
+    
+    chunking = {}
+    for backend in ("spacy", "regex"):
+        chunker = ContentAwareChunker(sentence_backend=backend)
+        start = time.perf_counter()
+        chunk_count = sum(len(chunker.chunk_document_sections(sections)) for sections in sections_by_file.values())
+        chunking[backend] = {"seconds": time.perf_counter() - start, "chunks": chunk_count}
+    
+    return {
+        "sections": len(texts),
+        "characters": sum(len(text) for text in texts),
+        "segmentation": {
+            "spacy_seconds": spacy_seconds,
+            "regex_seconds": regex_seconds,
+            "speedup": spacy_seconds / regex_seconds if regex_seconds else None,
+            "spacy_sentences": sum(len(spans) for spans in reference),
+            "regex_sentences": sum(len(spans) for spans in candidate),
+        },
+        "boundary_agreement": {
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        },
+        "chunking": {
+            **chunking,
+            "speedup": chunking["spacy"]["seconds"] / chunking["regex"]["seconds"] if chunking["regex"]["seconds"] else None,
+        },
+    }
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Compare sentence segmentation backends")
+    parser.add_argument(
+        "--policy-docs",
+        default="policy_corpus/output",
+        help="Directory containing policy documents"
+    )
+    parser.add_argument(
+        "--output",
+        help="Optional path for the JSON report"
+    )
+    
+    args = parser.parse_args()
+    
+    report = benchmark_segmenters(args.policy_docs)
+    
+    segmentation = report["segmentation"]
+    agreement = report["boundary_agreement"]
+    chunking = report["chunking"]
+    print(f"\n📊 Sentence segmenters ({report['sections']} sections, {report['characters']} characters)")
+    print("=" * 60)
+    print(
+        f"segmentation: spaCy {segmentation['spacy_seconds']:.2f}s, regex {segmentation['regex_seconds']:.3f}s "
+        f"({segmentation['speedup']:.1f}x)"
+    )
+    print(f"sentences:    spaCy {segmentation['spacy_sentences']}, regex {segmentation['regex_sentences']}")
+    print(f"agreement:    precision {agreement['precision']:.3f}, recall {agreement['recall']:.3f}, F1 {agreement['f1']:.3f}")
+    print(
+        f"chunking:     spaCy {chunking['spacy']['seconds']:.2f}s, regex {chunking['regex']['seconds']:.2f}s "
+        f"({chunking['speedup']:.1f}x)"
+    )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📁 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import math
+from typing import List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+    
+    Args:
+        values: Measurements in any order
+        pct: Percentile in (0, 100]
+    
+    Returns:
+        Smallest value with at least pct percent of the values at or below it
+        (0.0 for no values)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
@@ -11,6 +11,7 @@ This script sets up the complete RAG pipeline:
 
 import os
 import sys
+import time
 import asyncio
 import logging
 from pathlib import Path
@@ -21,6 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from g_sia.agents.policy_agent import PolicyAgent
 from g_sia.core.qdrant_vector_store import QdrantPolicyVectorStore
+from g_sia.core.ingest_pipeline import ProgressEvent
 
 # Configure logging
 logging.basicConfig(
@@ -30,11 +32,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def log_progress(event: ProgressEvent):
+    """Log a per-stage ingestion progress event."""
+    detail = f" ({event.detail})" if event.detail else ""
+    logger.info(f"[{event.stage}] {event.count} done after {event.elapsed_seconds:.1f}s{detail}")
+
+
 def build_rag_system(
     policy_docs_dir: str = "policy_corpus/output",
     collection_name: str = "policy_documents",
     qdrant_url: str = "http://localhost:6333",
-    clear_existing: bool = False
+    clear_existing: bool = False,
+    incremental: bool = False,
+    backend: str = "qdrant",
+    hybrid: bool = False,
+    slim_payloads: bool = False,
+    embedding_provider: str = "openai",
+    ingest_workers: Optional[int] = None,
+    streaming: bool = False,
+    build_cache_dir: Optional[str] = None,
+    watch: bool = False,
+    poll_interval: float = 1.0,
+    dedup_threshold: Optional[float] = None
 ):
     """
     Build the complete RAG system.
@@ -44,6 +63,19 @@ def build_rag_system(
         collection_name: Qdrant collection name
         qdrant_url: Qdrant server URL
         clear_existing: Whether to clear existing data
+        incremental: Only re-index new or changed chunks
+        backend: Vector store backend ('qdrant' or 'faiss')
+        hybrid: Index BM25 sparse vectors for hybrid dense + lexical search
+        slim_payloads: Keep only routing keys in Qdrant and chunk text in a local content store
+        embedding_provider: 'openai' or 'local' (CPU sentence-embedding model)
+        ingest_workers: Worker processes for parsing and chunking (default: CPU count)
+        streaming: Stream documents into the vector store one at a time, logging per-stage progress
+        build_cache_dir: Build manifest directory; unchanged documents are not re-parsed
+            or re-chunked and an unchanged corpus is not re-indexed
+        watch: After building, keep re-indexing changed sections until interrupted
+        poll_interval: Seconds between corpus scans in watch mode
+        dedup_threshold: Fold chunks at least this similar (MinHash Jaccard estimate)
+            into one canonical chunk with aliases before indexing
     """
     print("🚀 Building G-SIA Policy RAG System")
     print("=" * 50)
@@ -51,9 +83,21 @@ def build_rag_system(
     try:
         # Initialize policy agent
         print("📋 Initializing Policy Agent...")
+        vector_store_options = {}
+        if hybrid:
+            vector_store_options["enable_hybrid"] = True
+        if slim_payloads:
+            vector_store_options["payload_mode"] = "slim"
+        if embedding_provider != "openai":
+            vector_store_options["embedding_provider"] = embedding_provider
         agent = PolicyAgent(
             collection_name=collection_name,
-            qdrant_url=qdrant_url
+            qdrant_url=qdrant_url,
+            vector_backend=backend,
+            vector_store_options=vector_store_options or None,
+            ingest_workers=ingest_workers,
+            build_cache_dir=build_cache_dir,
+            near_duplicate_threshold=dedup_threshold
         )
         
         # Check if Qdrant is accessible
@@ -73,7 +117,10 @@ def build_rag_system(
         
         result = agent.initialize_vector_store(
             policy_documents_dir=policy_docs_dir,
-            clear_existing=clear_existing
+            clear_existing=clear_existing,
+            incremental=incremental,
+            streaming=streaming,
+            progress=log_progress if streaming else None
         )
         
         print("\n🎉 RAG System Built Successfully!")
@@ -82,6 +129,18 @@ def build_rag_system(
         print(f"  • Documents processed: {result.get('documents_count', 0)}")
         print(f"  • Sections extracted: {result.get('sections_count', 0)}")
         print(f"  • Chunks created: {result.get('chunks_count', 0)}")
+        ingest_stats = result.get('ingest_stats') or {}
+        if ingest_stats:
+            print(f"  • Ingest throughput: {ingest_stats.get('chunks_per_second', 0):.1f} chunks/s")
+        build_cache = result.get('build_cache')
+        if build_cache:
+            print(f"  • Build cache: {build_cache['stages_skipped']} stages skipped, {build_cache['stages_run']} run")
+        near_duplicates = result.get('near_duplicates')
+        if near_duplicates:
+            print(f"  • Near-duplicates: {near_duplicates['duplicates_removed']} chunks aliased, "
+                  f"{near_duplicates['chunks_kept']} indexed")
+        if result.get('index_skipped'):
+            print("  • Vector store already up to date, nothing embedded or uploaded")
         
         # Test the system
         print("\n🧪 Testing RAG System...")
@@ -108,6 +167,9 @@ def build_rag_system(
         print(f"  • Status: {vector_info.get('status', 'unknown')}")
         
         print(f"\n✨ RAG system is ready for Phase 3 development!")
+        
+        if watch:
+            watch_corpus(agent, policy_docs_dir, poll_interval)
         return True
     
     except Exception as e:
@@ -116,6 +178,26 @@ def build_rag_system(
         return False
 
 
+def watch_corpus(agent: PolicyAgent, policy_docs_dir: str, poll_interval: float):
+    """Re-index changed sections of the corpus until interrupted."""
+    # The build just indexed the corpus, so the watcher starts from the current files
+    watcher = agent.watch_corpus(policy_docs_dir, poll_interval=poll_interval, sync_first=False)
+    print(f"\n👀 Watching {policy_docs_dir} for changes (Ctrl-C to stop)...")
+    syncs = 0
+    try:
+        while True:
+            time.sleep(poll_interval)
+            if watcher.syncs != syncs:
+                syncs = watcher.syncs
+                sync = watcher.last_sync
+                print(f"  • {sync['sections_changed']} sections re-indexed, "
+                      f"{sync['sections_removed']} removed in {sync['seconds']:.2f}s")
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping corpus watcher")
+    finally:
+        watcher.stop()
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -141,6 +223,73 @@ def main():
         action="store_true",
         help="Clear existing vector data"
     )
+    parser.add_argument(
+        "--backend", 
+        choices=["qdrant", "faiss"],
+        default="qdrant",
+        help="Vector store backend (faiss builds a local index without a Qdrant server)"
+    )
+    parser.add_argument(
+        "--hybrid", 
+        action="store_true",
+        help="Index BM25 sparse vectors and fuse them with dense search (new Qdrant collections only)"
+    )
+    parser.add_argument(
+        "--slim-payloads", 
+        action="store_true",
+        help="Store only routing metadata in Qdrant and fetch chunk text for the final hits"
+    )
+    parser.add_argument(
+        "--embedding-provider", 
+        choices=["openai", "local"],
+        default="openai",
+        help="Embedding provider (local runs a quantized sentence-embedding model on CPU)"
+    )
+    parser.add_argument(
+        "--ingest-workers", 
+        type=int,
+        default=None,
+        help="Worker processes that parse and chunk documents (default: CPU count, 1 for in-process)"
+    )
+    parser.add_argument(
+        "--streaming", 
+        action="store_true",
+        help="Stream documents into the vector store one at a time (bounded memory, per-stage progress)"
+    )
+    parser.add_argument(
+        "--build-cache", 
+        nargs="?",
+        const=".cache/build",
+        default=None,
+        help="Cache parsed sections and chunks in a content-addressed build manifest and skip "
+             "unchanged stages (default directory: .cache/build)"
+    )
+    parser.add_argument(
+        "--incremental", 
+        action="store_true",
+        help="Only re-index new or changed chunks and remove deleted ones"
+    )
+    parser.add_argument(
+        "--dedup", 
+        nargs="?",
+        type=float,
+        const=0.85,
+        default=None,
+        metavar="THRESHOLD",
+        help="Index one canonical chunk per group of near-duplicates (MinHash/LSH over word "
+             "shingles) and record the others as aliases (default threshold: 0.85)"
+    )
+    parser.add_argument(
+        "--watch", 
+        action="store_true",
+        help="After building, watch the corpus and re-index changed sections until interrupted"
+    )
+    parser.add_argument(
+        "--poll-interval", 
+        type=float,
+        default=1.0,
+        help="Seconds between corpus scans in watch mode"
+    )
     parser.add_argument(
         "--verbose", 
         action="store_true",
@@ -173,7 +322,18 @@ def main():
         policy_docs_dir=args.policy_docs,
         collection_name=args.collection,
         qdrant_url=args.qdrant_url,
-        clear_existing=args.clear
+        clear_existing=args.clear,
+        incremental=args.incremental,
+        backend=args.backend,
+        hybrid=args.hybrid,
+        slim_payloads=args.slim_payloads,
+        embedding_provider=args.embedding_provider,
+        ingest_workers=args.ingest_workers,
+        streaming=args.streaming,
+        build_cache_dir=args.build_cache,
+        watch=args.watch,
+        poll_interval=args.poll_interval,
+        dedup_threshold=args.dedup
     )
     
     sys.exit(0 if success else 1)
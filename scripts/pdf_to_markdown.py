@@ -21,6 +21,11 @@ import torch
 from pdf2image import convert_from_path
 from transformers import AutoTokenizer, AutoProcessor, AutoModelForImageTextToText
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.build_manifest import BuildManifest
+
 # Set transformers verbosity for detailed logging
 os.environ["TRANSFORMERS_VERBOSITY"] = "info"
 
@@ -367,6 +372,17 @@ def main():
         default=5,
         help="Maximum number of pages to process per document (default: 5)"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=".cache/build",
+        help="Build manifest directory; PDFs whose markdown is up to date are skipped"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run OCR on every PDF even if its markdown is up to date"
+    )
     
     args = parser.parse_args()
     
@@ -377,12 +393,30 @@ def main():
     # Create output directory
     output_dir.mkdir(exist_ok=True)
     
-    # Initialize OCR converter
-    try:
-        converter = NanonetsOCRConverter(use_gpu=args.gpu)
-    except Exception as e:
-        logger.error(f"Failed to initialize OCR converter: {e}")
-        return 1
+    manifest = BuildManifest(args.cache_dir)
+    # OCR output depends on the model, the page limit and this script's code
+    convert_params = {
+        "converter": "nanonets/Nanonets-OCR-s",
+        "max_pages": args.max_pages,
+        "code": manifest.file_digest(__file__),
+    }
+    
+    # The OCR model is only loaded once a PDF actually needs converting
+    converters = []
+    
+    def convert(pdf_path: Path, output_path: Path) -> bool:
+        def run_ocr() -> bool:
+            if not converters:
+                try:
+                    converters.append(NanonetsOCRConverter(use_gpu=args.gpu))
+                except Exception as e:
+                    logger.error(f"Failed to initialize OCR converter: {e}")
+                    return False
+            return converters[0].convert_pdf_to_markdown(pdf_path, output_path, max_pages=args.max_pages)
+        
+        return manifest.run_file_stage(
+            "pdf_to_markdown", str(pdf_path), str(output_path), convert_params, run_ocr, force=args.force
+        )
     
     # Process files
     if args.file:
@@ -393,7 +427,7 @@ def main():
             return 1
         
         output_path = output_dir / f"{pdf_path.stem}.md"
-        success = converter.convert_pdf_to_markdown(pdf_path, output_path, max_pages=args.max_pages)
+        success = convert(pdf_path, output_path)
         
         if success:
             logger.info("🎉 Single file conversion completed successfully!")
@@ -423,7 +457,7 @@ def main():
         for pdf_path in pdf_files:
             output_path = output_dir / f"{pdf_path.stem}.md"
             
-            if converter.convert_pdf_to_markdown(pdf_path, output_path, max_pages=args.max_pages):
+            if convert(pdf_path, output_path):
                 successful += 1
             else:
                 failed += 1
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the Qdrant vector store in embedded local mode.
+
+This script builds collections with a local Qdrant client (in memory and on
+disk) and hashing embeddings, so it runs fully offline. It checks that:
+- Parallel upload workers are reduced to one for local clients
+- Every stored vector matches the embedding of its chunk after ingest
+- Searches find each chunk and never return the version sentinel
+"""
+
+import sys
+import math
+import logging
+import tempfile
+from pathlib import Path
+from typing import List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.document_parser import DocumentSection
+from g_sia.core.content_aware_chunker import ContentAwareChunker, ContentChunk
+from g_sia.core.qdrant_vector_store import QdrantPolicyVectorStore, VERSION_POINT_ID
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def build_chunks(count: int = 300) -> List[ContentChunk]:
+    """Chunk synthetic articles whose texts are all distinct."""
+    sections = [
+        DocumentSection(
+            content=(
+                f"Article {i} requires controller {i} to keep record {i * 7} of processing "
+                f"operation {i * 13} and to report breach {i * 17} within {i % 72 + 1} hours."
+            ),
+            section_type="article",
+            section_id=str(i),
+            title=f"Obligation {i}",
+            metadata={"document_type": "local_test"},
+        )
+        for i in range(1, count + 1)
+    ]
+    return ContentAwareChunker(tokenizer="words").chunk_document_sections(sections)
+
+
+def check_store(store: QdrantPolicyVectorStore, chunks: List[ContentChunk]) -> bool:
+    """Ingest with several requested workers and verify every stored vector."""
+    if store._upload_workers(4) != 1:
+        print("   ❌ Local client was not limited to one upload worker")
+        return False
+    
+    if not store.add_chunks(chunks, batch_size=8, upload_workers=4):
+        print("   ❌ add_chunks failed")
+        return False
+    
+    point_ids = [store.make_point_id(chunk) for chunk in chunks]
+    texts = [store._get_embedding_text(chunk) for chunk in chunks]
+    expected = dict(zip(point_ids, store.embeddings.embed_documents(texts)))
+    records = store.client.retrieve(store.collection_name, ids=point_ids, with_vectors=True)
+    
+    mismatched = 0
+    for record in records:
+        stored = record.vector
+        vector = expected[str(record.id)]
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        if any(abs(a - b / norm) > 1e-4 for a, b in zip(stored, vector)):
+            mismatched += 1
+    if len(records) != len(chunks) or mismatched:
+        print(f"   ❌ {len(records)}/{len(chunks)} points stored, {mismatched} with wrong vectors")
+        return False
+    
+    for point_id, text in list(zip(point_ids, texts))[::25]:
+        results = store.search_similar(text, limit=3, score_threshold=0.0)
+        if not results or results[0]["id"] != point_id:
+            print(f"   ❌ Search did not return chunk {point_id} first")
+            return False
+        if any(result["id"] == VERSION_POINT_ID for result in results):
+            print("   ❌ Search returned the version sentinel")
+            return False
+    
+    info = store.get_collection_info()
+    if info["points_count"] != len(chunks):
+        print(f"   ❌ Collection reports {info['points_count']} points, expected {len(chunks)}")
+        return False
+    
+    print(f"   ✅ {len(chunks)} chunks stored and searchable")
+    return True
+
+
+def main():
+    """Run the local-mode checks."""
+    chunks = build_chunks()
+    options = {
+        "embedding_provider": "hashing",
+        "embedding_cache_dir": None,
+    }
+    
+    print("🧪 Testing Qdrant local mode")
+    print("=" * 50)
+    
+    results = {}
+    print("\n1. In-memory client...")
+    store = QdrantPolicyVectorStore(collection_name="local_test", qdrant_location=":memory:", **options)
+    results["memory"] = check_store(store, chunks)
+    
+    print("\n2. On-disk client...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = QdrantPolicyVectorStore(collection_name="local_test", qdrant_path=tmp_dir, **options)
+        results["path"] = check_store(store, chunks)
+        store.client.close()
+    
+    passed = sum(results.values())
+    print(f"\n📊 {passed}/{len(results)} checks passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
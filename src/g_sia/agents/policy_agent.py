@@ -8,9 +8,10 @@ against GDPR, HIPAA, and other compliance documents using content-aware retrieva
 import os
 import sys
 import json
+import time
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator
 from dotenv import load_dotenv
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
@@ -18,9 +19,16 @@ from langchain_openai import ChatOpenAI
 # Add src directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
 
-from g_sia.core.qdrant_vector_store import QdrantPolicyVectorStore
-from g_sia.core.document_parser import PolicyDocumentParser, DocumentType
-from g_sia.core.content_aware_chunker import ContentAwareChunker
+from g_sia.core.vector_store_base import create_vector_store
+from g_sia.core.document_parser import PolicyDocumentParser, DocumentType, DocumentSection
+from g_sia.core.content_aware_chunker import ContentAwareChunker, ContentChunk
+from g_sia.core.ingest_pipeline import ProgressEvent, ProgressCallback
+from g_sia.core.token_counter import get_token_counter
+from g_sia.core.nlp_service import get_nlp_service
+from g_sia.core.parallel_processing import ParallelDocumentProcessor
+from g_sia.core.build_manifest import BuildManifest
+from g_sia.core.corpus_watcher import CorpusWatcher
+from g_sia.core.near_duplicates import NearDuplicateFilter
 
 load_dotenv()
 
@@ -40,7 +48,27 @@ class PolicyAgent:
         qdrant_url: str = "http://localhost:6333",
         qdrant_api_key: Optional[str] = None,
         model: str = "gpt-4.1",
-        temperature: float = 0.0
+        temperature: float = 0.0,
+        vector_backend: str = "qdrant",
+        faiss_index_dir: str = "data/faiss_index",
+        vector_store_options: Optional[Dict[str, Any]] = None,
+        rerank: bool = False,
+        rerank_candidates: int = 40,
+        rerank_top_k: int = 4,
+        rerank_latency_budget_ms: Optional[float] = 1000.0,
+        reranker_options: Optional[Dict[str, Any]] = None,
+        diversify: bool = False,
+        mmr_fetch_k: int = 40,
+        mmr_lambda: float = 0.5,
+        max_chunks_per_section: Optional[int] = 2,
+        context_window: int = 0,
+        nlp_options: Optional[Dict[str, Any]] = None,
+        sentence_backend: str = "spacy",
+        ingest_workers: Optional[int] = None,
+        tokenizer: str = "bpe",
+        context_token_budget: Optional[int] = None,
+        build_cache_dir: Optional[str] = None,
+        near_duplicate_threshold: Optional[float] = None
     ):
         """
         Initialize the policy agent.
@@ -51,22 +79,115 @@ class PolicyAgent:
             qdrant_api_key: API key for Qdrant Cloud (optional)
             model: OpenAI model to use
             temperature: LLM temperature setting
+            vector_backend: Vector store backend ('qdrant' or 'faiss')
+            faiss_index_dir: Index directory for the local FAISS backend
+            vector_store_options: Extra backend options (e.g. enable_hybrid, collection_profile)
+            rerank: Rescore over-fetched candidates with a CPU cross-encoder
+            rerank_candidates: Number of vector search candidates to rerank
+            rerank_top_k: Number of reranked chunks kept for the prompt
+            rerank_latency_budget_ms: Scoring budget of the rerank stage per request; beyond it
+                the top limit chunks are kept in vector order, marked 'rerank_fallback'
+            reranker_options: Extra CrossEncoderReranker options (e.g. model_name, num_threads)
+            diversify: Select retrieved chunks by maximal marginal relevance
+            mmr_fetch_k: Number of candidates considered for MMR selection
+            mmr_lambda: MMR trade-off (1.0 relevance only, 0.0 diversity only)
+            max_chunks_per_section: Maximum number of chunks per section with MMR
+            context_window: Neighbouring chunks of the same section added on each
+                side of every retrieved chunk (0 disables expansion)
+            nlp_options: Options of the shared sentence segmentation service
+                (e.g. batch_size, n_process); spaCy is only loaded when documents are processed
+            sentence_backend: Chunker sentence segmentation ('spacy' or 'regex')
+            ingest_workers: Worker processes that parse and chunk documents
+                (default: CPU count; 1 processes documents in-process)
+            tokenizer: Chunker token accounting ('bpe' or the 'words' approximation)
+            context_token_budget: Maximum BPE tokens of policy context in the analysis
+                prompt; passages are packed in relevance order (None: no limit)
+            build_cache_dir: Directory of the build manifest that caches parsed sections
+                and chunks per document and skips re-indexing an unchanged corpus
+                (None: every stage runs on every build)
+            near_duplicate_threshold: Drop chunks whose shingle Jaccard similarity (MinHash
+                estimate) with an earlier chunk of the same regulation reaches this value,
+                recording them as aliases of the kept chunk (None: index every chunk;
+                streaming ingest always indexes every chunk)
         """
         self.collection_name = collection_name
         
-        # Initialize vector store
-        self.vector_store = QdrantPolicyVectorStore(
-            collection_name=collection_name,
-            qdrant_url=qdrant_url,
-            qdrant_api_key=qdrant_api_key
+        # Dedup stage between chunking and indexing
+        self.near_duplicate_filter = (
+            NearDuplicateFilter(threshold=near_duplicate_threshold) if near_duplicate_threshold else None
         )
         
+        # Where points are indexed and how, for the index stage of the build manifest
+        self.index_params = {
+            "backend": vector_backend,
+            "collection_name": collection_name,
+            "location": faiss_index_dir if vector_backend == "faiss" else qdrant_url,
+            "vector_store_options": vector_store_options or {},
+            "near_duplicates": self.near_duplicate_filter.params if self.near_duplicate_filter else None,
+        }
+        
+        # Initialize vector store
+        if vector_backend == "faiss":
+            self.vector_store = create_vector_store(
+                "faiss",
+                collection_name=collection_name,
+                index_dir=faiss_index_dir,
+                **(vector_store_options or {})
+            )
+        else:
+            self.vector_store = create_vector_store(
+                vector_backend,
+                collection_name=collection_name,
+                qdrant_url=qdrant_url,
+                qdrant_api_key=qdrant_api_key,
+                **(vector_store_options or {})
+            )
+        
+        # Optional cross-encoder rerank stage between retrieval and prompt construction
+        self.reranker = None
+        self.rerank_candidates = rerank_candidates
+        self.rerank_top_k = rerank_top_k
+        self.rerank_latency_budget_ms = rerank_latency_budget_ms
+        if rerank:
+            from g_sia.core.reranker import CrossEncoderReranker
+            self.reranker = CrossEncoderReranker(**(reranker_options or {}))
+        
+        # Optional MMR diversification of retrieved chunks
+        self.diversify = diversify
+        self.mmr_fetch_k = mmr_fetch_k
+        self.mmr_lambda = mmr_lambda
+        self.max_chunks_per_section = max_chunks_per_section
+        self.context_window = context_window
+        
+        # Chunk sizing and prompt packing share one cached BPE token counter
+        self.token_counter = get_token_counter()
+        self.context_token_budget = context_token_budget
+        
         # Initialize document processing components
-        self.document_parser = PolicyDocumentParser()
+        nlp_service = get_nlp_service(**(nlp_options or {}))
+        self.document_parser = PolicyDocumentParser(nlp_service=nlp_service)
+        # Context comes from neighbour chunks at retrieval time, not stored overlaps
+        chunker_options = {
+            "target_chunk_size": 800,
+            "max_chunk_size": 1200,
+            "overlap_size": 100,
+            "store_context_overlaps": False,
+            "sentence_backend": sentence_backend,
+            "tokenizer": tokenizer
+        }
         self.chunker = ContentAwareChunker(
-            target_chunk_size=800,
-            max_chunk_size=1200,
-            overlap_size=100
+            nlp_service=nlp_service if sentence_backend == "spacy" else None,
+            **chunker_options
+        )
+        # Parse and chunk stage of initialize_vector_store, run on worker processes
+        self.build_manifest = BuildManifest(build_cache_dir) if build_cache_dir else None
+        self.document_processor = ParallelDocumentProcessor(
+            chunker_options=chunker_options,
+            nlp_options=nlp_options,
+            max_workers=ingest_workers,
+            document_parser=self.document_parser,
+            chunker=self.chunker,
+            manifest=self.build_manifest
         )
         
         # Initialize LLM
@@ -128,7 +249,10 @@ Be thorough in your analysis and always err on the side of caution when it comes
     def initialize_vector_store(
         self,
         policy_documents_dir: str = "policy_corpus/output",
-        clear_existing: bool = False
+        clear_existing: bool = False,
+        incremental: bool = False,
+        streaming: bool = False,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """
         Initialize the vector store with policy documents.
@@ -136,6 +260,12 @@ Be thorough in your analysis and always err on the side of caution when it comes
         Args:
             policy_documents_dir: Directory containing policy documents
             clear_existing: Whether to clear existing data
+            incremental: Only re-embed changed chunks and drop removed ones
+            streaming: Stream sections and chunks of one document at a time into
+                batched embedding and upload, instead of collecting the corpus
+                (the build manifest only caches the collecting path)
+            progress: Optional callback receiving per-stage ProgressEvents
+                ('parse', 'chunk', 'embed', 'upload')
             
         Returns:
             Processing results dictionary
@@ -161,20 +291,18 @@ Be thorough in your analysis and always err on the side of caution when it comes
             logger.info("Clearing existing vector store...")
             self.vector_store.clear_collection()
         
+        if streaming:
+            return self._stream_vector_store(policy_files, incremental, progress)
+        
         # Process documents
         all_chunks = []
         total_sections = 0
         
-        for file_path in policy_files:
-            logger.info(f"Processing {Path(file_path).name}...")
-            
-            # Parse document
-            sections = self.document_parser.parse_document(file_path)
+        # Parse and chunk documents in parallel, collected in file order
+        for file_path, sections, chunks in self.document_processor.process(policy_files):
+            logger.info(f"Processed {Path(file_path).name}")
             if sections:
                 total_sections += len(sections)
-                
-                # Create chunks
-                chunks = self.chunker.chunk_document_sections(sections)
                 all_chunks.extend(chunks)
                 
                 logger.info(f"  → {len(sections)} sections, {len(chunks)} chunks")
@@ -184,24 +312,121 @@ Be thorough in your analysis and always err on the side of caution when it comes
         if not all_chunks:
             raise ValueError("No chunks created from any documents")
         
-        # Add chunks to vector store
-        logger.info(f"Storing {len(all_chunks)} chunks in vector store...")
-        success = self.vector_store.add_chunks(all_chunks)
+        # The index stage depends on the chunks of every document
+        index_inputs = index_params = None
+        index_skipped = False
+        if self.build_manifest is not None:
+            index_inputs = {
+                file_path: self.build_manifest.output_digest("chunk", file_path) for file_path in policy_files
+            }
+            index_params = {**self.index_params, "embedding_model": self.vector_store.embedding_model_name}
+            # A wiped collection has to be rebuilt even if its inputs did not change
+            index_skipped = (
+                not clear_existing
+                and self.build_manifest.is_fresh("index", self.collection_name, index_inputs, index_params)
+                and self.is_ready()
+            )
         
-        if not success:
-            raise ValueError("Failed to add chunks to vector store")
+        index_chunks = all_chunks
+        if index_skipped:
+            logger.info(f"Vector store is up to date with {len(all_chunks)} chunks, skipping embedding and upload")
+        else:
+            # Near-duplicates are folded into one canonical chunk before anything is embedded
+            if self.near_duplicate_filter is not None:
+                index_chunks = self.near_duplicate_filter.filter(all_chunks)
+            
+            # Add chunks to vector store
+            logger.info(f"Storing {len(index_chunks)} chunks in vector store...")
+            success = self.vector_store.add_chunks(index_chunks, incremental=incremental)
+            
+            if not success:
+                raise ValueError("Failed to add chunks to vector store")
+            
+            if self.build_manifest is not None:
+                self.build_manifest.record("index", self.collection_name, index_inputs, index_params)
+                self.build_manifest.save()
         
         result = {
             "success": True,
             "documents_count": len(policy_files),
             "sections_count": total_sections,
             "chunks_count": len(all_chunks),
-            "file_paths": policy_files
+            "file_paths": policy_files,
+            "ingest_stats": None if index_skipped else self.vector_store.last_ingest_stats,
+            "index_skipped": index_skipped
         }
+        if self.near_duplicate_filter is not None and not index_skipped:
+            result["near_duplicates"] = self.near_duplicate_filter.last_stats
+        if self.build_manifest is not None:
+            result["build_cache"] = self.build_manifest.get_stats()
         
         logger.info(f"Successfully processed {len(all_chunks)} chunks from {len(policy_files)} documents")
         return result
     
+    def _stream_chunks(
+        self,
+        policy_files: List[str],
+        counts: Dict[str, int],
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[ContentChunk]:
+        """Parse and chunk documents lazily, counting sections and chunks as they pass."""
+        start = time.perf_counter()
+        
+        def counted_sections(file_path: str) -> Iterator[DocumentSection]:
+            for section in self.document_parser.iter_sections(file_path):
+                counts["sections"] += 1
+                yield section
+            if progress is not None:
+                progress(ProgressEvent("parse", counts["sections"], time.perf_counter() - start, Path(file_path).name))
+        
+        for file_path in policy_files:
+            for chunk in self.chunker.iter_chunks(counted_sections(file_path)):
+                counts["chunks"] += 1
+                yield chunk
+            counts["documents"] += 1
+            if progress is not None:
+                progress(ProgressEvent("chunk", counts["chunks"], time.perf_counter() - start, Path(file_path).name))
+    
+    def _stream_vector_store(
+        self,
+        policy_files: List[str],
+        incremental: bool,
+        progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        """Streaming variant of initialize_vector_store, one document in memory at a time."""
+        if self.near_duplicate_filter is not None:
+            # Aliases are recorded on canonical chunks, which may already be uploaded
+            logger.warning("Near-duplicate filtering needs the whole corpus and is skipped when streaming")
+        
+        # BM25 weights need corpus statistics, so hybrid stores take a fitting pass first
+        if getattr(self.vector_store, "enable_hybrid", False):
+            logger.info("Fitting the sparse encoder on the chunk stream...")
+            self.vector_store.fit_sparse_encoder(
+                self._stream_chunks(policy_files, {"documents": 0, "sections": 0, "chunks": 0})
+            )
+        
+        counts = {"documents": 0, "sections": 0, "chunks": 0}
+        success = self.vector_store.add_chunk_stream(
+            self._stream_chunks(policy_files, counts, progress),
+            incremental=incremental,
+            progress=progress
+        )
+        
+        if not success:
+            raise ValueError("Failed to add chunks to vector store")
+        if not counts["chunks"]:
+            raise ValueError("No chunks created from any documents")
+        
+        logger.info(f"Successfully streamed {counts['chunks']} chunks from {counts['documents']} documents")
+        return {
+            "success": True,
+            "documents_count": len(policy_files),
+            "sections_count": counts["sections"],
+            "chunks_count": counts["chunks"],
+            "file_paths": policy_files,
+            "ingest_stats": self.vector_store.last_ingest_stats
+        }
+    
     def is_ready(self) -> bool:
         """
         Check if the policy agent is ready for queries.
@@ -216,21 +441,57 @@ Be thorough in your analysis and always err on the side of caution when it comes
             logger.error(f"Error checking readiness: {e}")
             return False
     
+    def watch_corpus(
+        self,
+        policy_documents_dir: str = "policy_corpus/output",
+        poll_interval: float = 1.0,
+        sync_first: bool = True
+    ) -> CorpusWatcher:
+        """
+        Keep the vector store in sync with the corpus on a background thread.
+        
+        Changed files are re-parsed and only their changed sections re-indexed,
+        while the agent keeps answering queries from the same store.
+        
+        Args:
+            policy_documents_dir: Directory containing policy documents
+            poll_interval: Seconds between directory scans
+            sync_first: Reconcile the store with the whole corpus before watching
+        
+        Returns:
+            The running watcher (call stop() to end it)
+        """
+        watcher = CorpusWatcher(
+            self.vector_store,
+            self.document_parser,
+            self.chunker,
+            corpus_dir=policy_documents_dir,
+            poll_interval=poll_interval
+        )
+        return watcher.start(sync_first=sync_first)
+    
     def retrieve_relevant_policies(
         self,
         query: str,
         limit: int = 8,
         score_threshold: float = 0.7,
-        document_types: Optional[List[str]] = None
+        document_types: Optional[List[str]] = None,
+        context_window: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant policy documents for a query.
         
+        With reranking enabled, rerank_candidates chunks are fetched and the
+        best min(limit, rerank_top_k) of them are kept. If scoring exceeds the
+        rerank budget, the first limit chunks are kept in vector order and
+        carry 'rerank_fallback'.
+        
         Args:
             query: User query
             limit: Maximum number of results
             score_threshold: Minimum similarity score
             document_types: Optional filter by document types
+            context_window: Neighbour chunks added per side (default: the agent's setting)
             
         Returns:
             List of relevant policy chunks
@@ -242,13 +503,23 @@ Be thorough in your analysis and always err on the side of caution when it comes
                 filter_conditions["document_type"] = document_types
             
             # Search for relevant policies
-            results = self.vector_store.search_similar(
-                query=query,
-                limit=limit,
-                score_threshold=score_threshold,
-                filter_conditions=filter_conditions if filter_conditions else None
-            )
+            search_kwargs = {
+                "query": query,
+                "limit": max(limit, self.rerank_candidates) if self.reranker else limit,
+                "score_threshold": score_threshold,
+                "filter_conditions": filter_conditions if filter_conditions else None,
+            }
+            if self.diversify:
+                results = self.vector_store.search_diverse(
+                    **search_kwargs,
+                    fetch_k=self.mmr_fetch_k,
+                    lambda_mult=self.mmr_lambda,
+                    max_per_section=self.max_chunks_per_section
+                )
+            else:
+                results = self.vector_store.search_similar(**search_kwargs)
             
+            results = self._finish_retrieval(query, results, limit, context_window)
             logger.debug(f"Retrieved {len(results)} relevant policy chunks")
             return results
             
@@ -256,12 +527,86 @@ Be thorough in your analysis and always err on the side of caution when it comes
             logger.error(f"Error retrieving policies: {e}")
             return []
     
-    def get_policy_verdict(self, query: str, **kwargs) -> Dict[str, Any]:
+    def _finish_retrieval(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        limit: int,
+        context_window: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Rerank the search hits of a query and expand them into passages."""
+        if self.reranker and results:
+            # The budget covers scoring only; search latency varies with the embedding provider
+            results = self.reranker.rerank(
+                query,
+                results,
+                top_k=min(limit, self.rerank_top_k),
+                latency_budget_ms=self.rerank_latency_budget_ms,
+                fallback_k=limit
+            )
+        else:
+            results = results[:limit]
+        
+        # Expand the final hits into contiguous passages of their sections
+        window = self.context_window if context_window is None else context_window
+        if window > 0:
+            results = self.vector_store.expand_with_neighbours(results, window)
+        return results
+    
+    def retrieve_relevant_policies_many(
+        self,
+        queries: List[str],
+        limit: int = 8,
+        score_threshold: float = 0.7,
+        document_types: Optional[List[str]] = None,
+        context_window: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant policy documents for several queries in one round trip.
+        
+        All queries are embedded in one provider call and searched with one
+        batched request; the hits are then reranked and expanded per query like
+        in retrieve_relevant_policies. MMR diversification is not applied.
+        
+        Args:
+            queries: User queries
+            limit: Maximum number of results per query
+            score_threshold: Minimum similarity score
+            document_types: Optional filter by document types
+            context_window: Neighbour chunks added per side (default: the agent's setting)
+            
+        Returns:
+            One list of relevant policy chunks per query
+        """
+        filter_conditions = {"document_type": document_types} if document_types else None
+        
+        try:
+            batches = self.vector_store.search_many(
+                queries,
+                limit=max(limit, self.rerank_candidates) if self.reranker else limit,
+                score_threshold=score_threshold,
+                filter_conditions=filter_conditions
+            )
+            results = [
+                self._finish_retrieval(query, hits, limit, context_window)
+                for query, hits in zip(queries, batches)
+            ]
+        except Exception as e:
+            logger.error(f"Error retrieving policies: {e}")
+            return [[] for _ in queries]
+        
+        logger.debug(f"Retrieved policy chunks for {len(queries)} queries")
+        return results
+    
+    def get_policy_verdict(self, query: str, context_queries: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
         """
         Analyze a user query against policy documents and return compliance verdict.
         
         Args:
             query: User query to analyze
+            context_queries: Further queries whose policy passages are added to the
+                context (e.g. the original of a rewritten query); all queries are
+                retrieved in one batched round trip
             **kwargs: Additional parameters for retrieval
             
         Returns:
@@ -285,7 +630,16 @@ Be thorough in your analysis and always err on the side of caution when it comes
             
             # Retrieve relevant policy information
             logger.debug("Retrieving relevant policy information...")
-            relevant_docs = self.retrieve_relevant_policies(query, **kwargs)
+            if context_queries:
+                batches = self.retrieve_relevant_policies_many([query, *context_queries], **kwargs)
+                # The query's own passages come first; passages found again are kept once
+                relevant_docs, seen = [], set()
+                for doc in (doc for batch in batches for doc in batch):
+                    if doc.get("id") not in seen:
+                        seen.add(doc.get("id"))
+                        relevant_docs.append(doc)
+            else:
+                relevant_docs = self.retrieve_relevant_policies(query, **kwargs)
             
             if not relevant_docs:
                 logger.warning("No relevant policy documents found")
@@ -301,27 +655,7 @@ Be thorough in your analysis and always err on the side of caution when it comes
                 }
             
             # Format context for LLM analysis
-            context_parts = []
-            for i, doc in enumerate(relevant_docs):
-                metadata = doc.get('metadata', {})
-                
-                # Create source information
-                source_info = []
-                if metadata.get('document_type'):
-                    source_info.append(metadata['document_type'].upper())
-                if metadata.get('section_type') and metadata.get('section_id'):
-                    source_info.append(f"{metadata['section_type']} {metadata['section_id']}")
-                if metadata.get('section_title'):
-                    source_info.append(metadata['section_title'])
-                
-                source_str = " | ".join(source_info) if source_info else f"Document {i+1}"
-                
-                context_parts.append(
-                    f"[{source_str}] (Relevance: {doc.get('score', 0):.3f})\n"
-                    f"{doc.get('content', '')}\n"
-                )
-            
-            context = "\n" + "="*80 + "\n".join(context_parts)
+            context = self._build_context(relevant_docs)
             
             # Analyze with LLM
             logger.debug("Performing compliance analysis...")
@@ -389,6 +723,74 @@ Be thorough in your analysis and always err on the side of caution when it comes
                 "confidence_score": 0.0
             }
     
+    def _build_context(self, relevant_docs: List[Dict[str, Any]]) -> str:
+        """
+        Format retrieved passages as prompt context, packed to the token budget.
+        
+        Passages are added in relevance order while they fit; one that does not
+        fit is skipped so smaller ones further down can still use the budget.
+        If not even the first passage fits, it is cut to the budget.
+        
+        Args:
+            relevant_docs: Retrieved passages, most relevant first
+            
+        Returns:
+            Context text for the analysis prompt
+        """
+        context_parts = []
+        for i, doc in enumerate(relevant_docs):
+            metadata = doc.get('metadata', {})
+            
+            # Create source information
+            source_info = []
+            if metadata.get('document_type'):
+                source_info.append(metadata['document_type'].upper())
+            if metadata.get('section_type') and metadata.get('section_id'):
+                source_info.append(f"{metadata['section_type']} {metadata['section_id']}")
+            if metadata.get('section_title'):
+                source_info.append(metadata['section_title'])
+            
+            source_str = " | ".join(source_info) if source_info else f"Document {i+1}"
+            
+            context_parts.append(
+                f"[{source_str}] (Relevance: {doc.get('score', 0):.3f})\n"
+                f"{doc.get('content', '')}\n"
+            )
+        
+        header = "\n" + "="*80
+        if self.context_token_budget is None:
+            return header + "\n".join(context_parts)
+        
+        budget = self.context_token_budget - self.token_counter.count(header)
+        packed = []
+        used = 0
+        for part in context_parts:
+            # Each part after the first is joined with a newline
+            part_tokens = self.token_counter.count(part) + (1 if packed else 0)
+            if used + part_tokens <= budget:
+                packed.append(part)
+                used += part_tokens
+        if not packed and context_parts:
+            packed.append(self.token_counter.truncate(context_parts[0], budget))
+        
+        context = header + "\n".join(packed)
+        # Token merges across joins can differ slightly from the summed counts, so
+        # the last passage is cut to what remains (and dropped if nothing does)
+        while packed and self.token_counter.count(context) > self.context_token_budget:
+            excess = self.token_counter.count(context) - self.context_token_budget
+            keep = self.token_counter.count(packed[-1]) - excess
+            if keep > 0:
+                packed[-1] = self.token_counter.truncate(packed[-1], keep)
+            else:
+                packed.pop()
+            context = header + "\n".join(packed)
+        
+        logger.debug(
+            f"Packed {len(packed)} of {len(context_parts)} passages into "
+            f"{self.token_counter.count(context)}/{self.context_token_budget} context tokens"
+        )
+        return context
+    
     def analyze_query_by_regulation(
         self,
         query: str,
@@ -414,7 +816,11 @@ Be thorough in your analysis and always err on the side of caution when it comes
     
     def get_vector_store_info(self) -> Dict[str, Any]:
         """Get information about the underlying vector store."""
-        return self.vector_store.get_collection_info()
+        info = self.vector_store.get_collection_info()
+        if self.reranker is not None:
+            info["reranker"] = self.reranker.get_stats()
+        info["token_counter"] = self.token_counter.get_stats()
+        return info
 
 
 # Global instance for backward compatibility
@@ -0,0 +1,367 @@
+"""
+Content-addressed build manifest for the ingest pipeline.
+
+Every stage of the pipeline (PDF to markdown, markdown to sections, sections to
+chunks, chunks to indexed points) is recorded per target with a key derived from
+the content hashes of its inputs and the parameters it ran with, including the
+source of the code that implements it. A stage whose key matches the recorded one
+and whose outputs are still intact is skipped, like an up-to-date target in make.
+Intermediate artifacts (sections, chunk records) are pickled into the cache
+directory under their key, and the hash of each stage's output is what the next
+stage is keyed on, so a rebuild that reproduces the same output stops there.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Any, Optional, Tuple, Iterable, Callable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def digest_value(value: Any) -> str:
+    """
+    Hash a JSON-serializable value independently of dict ordering.
+    
+    Args:
+        value: Parameters or input digests
+    
+    Returns:
+        Hex sha256 digest
+    """
+    encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def code_digest(*modules: ModuleType) -> str:
+    """
+    Hash the source files of the modules that implement a stage.
+    
+    Args:
+        *modules: Imported modules
+    
+    Returns:
+        Hex sha256 digest of their sources
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records stage keys and output hashes, and stores intermediate artifacts.
+    """
+    
+    def __init__(self, cache_dir: str = ".cache/build"):
+        """
+        Initialize the manifest, loading the recorded state if present.
+        
+        Args:
+            cache_dir: Directory holding manifest.json and the artifacts
+        """
+        self.cache_dir = Path(cache_dir)
+        self.artifact_dir = self.cache_dir / "artifacts"
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.cache_dir / "manifest.json"
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        # "stage:target" -> {"key", "inputs", "params", "outputs"}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # path -> [size, mtime_ns, digest], so unchanged files are not re-read
+        self._file_digests: Dict[str, list] = {}
+        self._load()
+    
+    def _load(self):
+        """Load the recorded stages from disk."""
+        if not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.warning(f"Build manifest at {self.manifest_path} has another version, starting empty")
+                return
+            self._entries = data.get("stages", {})
+            self._file_digests = data.get("files", {})
+            logger.info(f"Loaded build manifest with {len(self._entries)} stage records from {self.manifest_path}")
+        except Exception as e:
+            logger.warning(f"Could not load build manifest, starting empty: {e}")
+    
+    def save(self):
+        """Write the manifest to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": MANIFEST_VERSION, "stages": self._entries, "files": self._file_digests}
+            tmp_path = self.manifest_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1, sort_keys=True, default=str)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+    
+    def file_digest(self, path: str) -> str:
+        """
+        Content hash of a file, reusing the recorded hash while size and mtime match.
+        
+        Args:
+            path: File path
+        
+        Returns:
+            Hex sha256 digest of the file contents
+        """
+        stat = os.stat(path)
+        key = str(Path(path))
+        with self._lock:
+            recorded = self._file_digests.get(key)
+            if recorded and recorded[0] == stat.st_size and recorded[1] == stat.st_mtime_ns:
+                return recorded[2]
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        
+        with self._lock:
+            self._file_digests[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+            self._dirty = True
+        return digest.hexdigest()
+    
+    @staticmethod
+    def stage_key(stage: str, inputs: Dict[str, str], params: Dict[str, Any]) -> str:
+        """Key of a stage run: its name, input hashes and parameters."""
+        return digest_value({"stage": stage, "inputs": inputs, "params": params})
+    
+    def _entry_name(self, stage: str, target: str) -> str:
+        return f"{stage}:{target}"
+    
+    def output_digest(self, stage: str, target: str, name: str = "artifact") -> Optional[str]:
+        """
+        Recorded hash of a stage output, to key the next stage on.
+        
+        Args:
+            stage: Stage name
+            target: Target the stage ran for (e.g. a document path)
+            name: Output name
+        
+        Returns:
+            Hex digest, or None if the stage has no record
+        """
+        entry = self._entries.get(self._entry_name(stage, target))
+        return entry["outputs"].get(name) if entry else None
+    
+    def _is_current(
+        self,
+        stage: str,
+        target: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any],
+        output_paths: Iterable[str] = ()
+    ) -> bool:
+        """Whether the recorded run has the same key and its output files are intact."""
+        entry = self._entries.get(self._entry_name(stage, target))
+        if entry is None or entry["key"] != self.stage_key(stage, inputs, params):
+            return False
+        return all(
+            os.path.exists(path) and entry["outputs"].get(str(Path(path))) == self.file_digest(path)
+            for path in output_paths
+        )
+    
+    def _count(self, fresh: bool):
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def is_fresh(
+        self,
+        stage: str,
+        target: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any],
+        output_paths: Iterable[str] = ()
+    ) -> bool:
+        """
+        Check whether a stage can be skipped.
+        
+        Args:
+            stage: Stage name
+            target: Target the stage runs for
+            inputs: Content hashes of the stage inputs
+            params: Stage parameters
+            output_paths: Files the stage writes; each must still have its recorded hash
+        
+        Returns:
+            True if the recorded run had the same key and its outputs are intact
+        """
+        fresh = self._is_current(stage, target, inputs, params, output_paths)
+        self._count(fresh)
+        return fresh
+    
+    def record(
+        self,
+        stage: str,
+        target: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any],
+        outputs: Optional[Dict[str, str]] = None,
+        output_paths: Iterable[str] = ()
+    ):
+        """
+        Record a completed stage run.
+        
+        Args:
+            stage: Stage name
+            target: Target the stage ran for
+            inputs: Content hashes of the stage inputs
+            params: Stage parameters
+            outputs: Output name -> content hash
+            output_paths: Files the stage wrote (hashed and recorded under their path)
+        """
+        outputs = dict(outputs or {})
+        for path in output_paths:
+            outputs[str(Path(path))] = self.file_digest(path)
+        
+        with self._lock:
+            self._entries[self._entry_name(stage, target)] = {
+                "key": self.stage_key(stage, inputs, params),
+                "inputs": inputs,
+                "params": params,
+                "outputs": outputs,
+            }
+            self._dirty = True
+    
+    def run_file_stage(
+        self,
+        stage: str,
+        input_path: str,
+        output_path: str,
+        params: Dict[str, Any],
+        build: Callable[[], bool],
+        force: bool = False
+    ) -> bool:
+        """
+        Run a stage that turns one file into another, unless it is up to date.
+        
+        Args:
+            stage: Stage name
+            input_path: Input file (the stage target)
+            output_path: Output file written by build
+            params: Stage parameters
+            build: Runs the stage and returns whether it succeeded
+            force: Run the stage even if it is up to date
+        
+        Returns:
+            True if the output is up to date or was rebuilt successfully
+        """
+        inputs = {"input": self.file_digest(input_path)}
+        if not force and self.is_fresh(stage, str(input_path), inputs, params, [output_path]):
+            logger.info(f"{output_path} is up to date, skipping {stage}")
+            return True
+        
+        if not build():
+            return False
+        self.record(stage, str(input_path), inputs, params, output_paths=[output_path])
+        self.save()
+        return True
+    
+    def _artifact_path(self, key: str) -> Path:
+        return self.artifact_dir / f"{key}.pkl"
+    
+    def load_artifact(
+        self,
+        stage: str,
+        target: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any]
+    ) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Load the cached artifact of a stage if the stage is up to date.
+        
+        Args:
+            stage: Stage name
+            target: Target the stage runs for
+            inputs: Content hashes of the stage inputs
+            params: Stage parameters
+        
+        Returns:
+            (artifact, artifact hash), or (None, None) if the stage has to run
+        """
+        if not self._is_current(stage, target, inputs, params):
+            self._count(False)
+            return None, None
+        
+        path = self._artifact_path(self.stage_key(stage, inputs, params))
+        try:
+            data = path.read_bytes()
+        except OSError:
+            data = b""
+        
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != self.output_digest(stage, target):
+            logger.warning(f"Cached {stage} artifact of {target} is missing or corrupted, rebuilding")
+            self._count(False)
+            return None, None
+        
+        self._count(True)
+        return pickle.loads(data), digest
+    
+    def store_artifact(
+        self,
+        stage: str,
+        target: str,
+        inputs: Dict[str, str],
+        params: Dict[str, Any],
+        artifact: Any
+    ) -> str:
+        """
+        Store the artifact of a stage run and record the run.
+        
+        Args:
+            stage: Stage name
+            target: Target the stage ran for
+            inputs: Content hashes of the stage inputs
+            params: Stage parameters
+            artifact: Picklable stage output
+        
+        Returns:
+            Hash of the stored artifact
+        """
+        data = pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()
+        
+        path = self._artifact_path(self.stage_key(stage, inputs, params))
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        
+        # The artifact of the previous run of this target is no longer reachable
+        entry = self._entries.get(self._entry_name(stage, target))
+        if entry is not None and entry["key"] != path.stem:
+            self._artifact_path(entry["key"]).unlink(missing_ok=True)
+        
+        self.record(stage, target, inputs, params, outputs={"artifact": digest})
+        return digest
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Stage cache statistics of this run."""
+        return {
+            "cache_dir": str(self.cache_dir),
+            "stage_records": len(self._entries),
+            "stages_skipped": self.hits,
+            "stages_run": self.misses,
+        }
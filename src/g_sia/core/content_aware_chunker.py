@@ -7,41 +7,136 @@ while optimizing for semantic coherence and retrieval performance.
 
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 from pathlib import Path
 
-import spacy
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 
 from .document_parser import DocumentSection, PolicyDocumentParser
+from .nlp_service import SentenceNLPService, get_nlp_service
+from .legal_segmenter import LegalSentenceSegmenter
+from .ingest_pipeline import batched
+from .token_counter import TokenCounter, get_token_counter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+class SectionTable:
+    """
+    Sections of one chunking batch, stored once and referenced by integer id.
+    """
+    
+    __slots__ = ("sections", "_refs")
+    
+    def __init__(self, sections: Iterable[DocumentSection] = ()):
+        self.sections: List[DocumentSection] = []
+        self._refs: Dict[int, int] = {}
+        for section in sections:
+            self.add(section)
+    
+    def add(self, section: DocumentSection) -> int:
+        """Add a section (once) and return its id in the table."""
+        ref = self._refs.get(id(section))
+        if ref is None:
+            ref = len(self.sections)
+            self.sections.append(section)
+            self._refs[id(section)] = ref
+        return ref
+    
+    def __getitem__(self, ref: int) -> DocumentSection:
+        return self.sections[ref]
+    
+    def __len__(self) -> int:
+        return len(self.sections)
+
+
 class ContentChunk:
-    """Represents a content-aware chunk with rich metadata."""
-    content: str
-    chunk_id: str
-    source_section: DocumentSection
-    chunk_type: str  # 'full_section', 'partial_section', 'cross_section'
-    chunk_index: int  # Index within the source section
-    word_count: int
-    overlap_with_previous: str = ""
-    overlap_with_next: str = ""
-    metadata: Dict[str, Any] = None
+    """
+    Represents a content-aware chunk with rich metadata.
+    
+    Chunks are compact: section fields live once in a SectionTable, and the text
+    is a (start, end) slice of the section content unless explicit text is
+    given. content, chunk_id, source_section and metadata are derived on access.
+    """
     
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
+    __slots__ = (
+        "table", "section_ref", "start", "end", "text",
+        "chunk_type", "chunk_index", "word_count", "estimated_tokens", "sentence_count",
+        "overlap_with_previous", "overlap_with_next", "sentence_spans", "aliases",
+    )
+    
+    def __init__(
+        self,
+        table: SectionTable,
+        section_ref: int,
+        chunk_type: str,  # 'full_section', 'partial_section', 'cross_section'
+        chunk_index: int,  # Index within the source section
+        start: int = 0,
+        end: Optional[int] = None,
+        text: Optional[str] = None,
+        word_count: int = 0,
+        estimated_tokens: int = 0,
+        sentence_count: Optional[int] = None,
+        overlap_with_previous: str = "",
+        overlap_with_next: str = "",
+        sentence_spans: Optional[List[Tuple[int, int]]] = None,
+        aliases: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.table = table
+        self.section_ref = section_ref
+        self.chunk_type = chunk_type
+        self.chunk_index = chunk_index
+        self.start = start
+        self.end = len(table[section_ref].content) if end is None and text is None else end
+        # Explicit text for chunks that are not a slice of their section
+        self.text = text
+        self.estimated_tokens = estimated_tokens
+        self.sentence_count = sentence_count
+        self.overlap_with_previous = overlap_with_previous
+        self.overlap_with_next = overlap_with_next
+        # (start, end) offsets of the chunk's sentences in content, kept from splitting
+        self.sentence_spans = sentence_spans
+        # Near-duplicate chunks folded into this one at index time
+        self.aliases = aliases
         
         # Ensure word count is accurate
-        if self.word_count == 0:
-            self.word_count = len(self.content.split())
+        self.word_count = word_count or len(self.content.split())
+    
+    @property
+    def source_section(self) -> DocumentSection:
+        return self.table[self.section_ref]
+    
+    @property
+    def content(self) -> str:
+        if self.text is not None:
+            return self.text
+        return self.source_section.content[self.start:self.end]
+    
+    @property
+    def chunk_id(self) -> str:
+        return ContentAwareChunker.make_chunk_id(self.source_section, self.chunk_index)
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Section fields, chunk measures and section metadata, assembled on access."""
+        section = self.source_section
+        metadata = {
+            'section_type': section.section_type,
+            'section_id': section.section_id,
+            'section_title': section.title,
+            'parent_section': section.parent_section,
+            'estimated_tokens': self.estimated_tokens,
+        }
+        if self.sentence_count is not None:
+            metadata['sentence_count'] = self.sentence_count
+        metadata.update(section.metadata)
+        return metadata
+    
+    def __repr__(self) -> str:
+        return f"ContentChunk(chunk_id={self.chunk_id!r}, chunk_type={self.chunk_type!r}, word_count={self.word_count})"
 
 
 class ContentAwareChunker:
@@ -56,7 +151,12 @@ class ContentAwareChunker:
         min_chunk_size: int = 200,
         overlap_size: int = 100,
         respect_sentence_boundaries: bool = True,
-        respect_section_boundaries: bool = True
+        respect_section_boundaries: bool = True,
+        store_context_overlaps: bool = True,
+        nlp_service: Optional[SentenceNLPService] = None,
+        sentence_backend: str = "spacy",
+        tokenizer: str = "bpe",
+        token_counter: Optional[TokenCounter] = None
     ):
         """
         Initialize the content-aware chunker.
@@ -68,6 +168,15 @@ class ContentAwareChunker:
             overlap_size: Overlap size between chunks
             respect_sentence_boundaries: Whether to avoid breaking sentences
             respect_section_boundaries: Whether to avoid breaking sections
+            store_context_overlaps: Whether to store neighbouring text on each chunk
+                (not needed when context is expanded from neighbour chunks at retrieval)
+            nlp_service: Sentence segmentation service (default: the shared,
+                lazily loaded process-wide service)
+            sentence_backend: 'spacy' or 'regex' (rule-based legal segmenter);
+                ignored when nlp_service is given
+            tokenizer: 'bpe' counts real tokens with a cached local BPE tokenizer,
+                'words' keeps the 1.3 tokens-per-word approximation
+            token_counter: BPE token counter (default: the shared process-wide counter)
         """
         self.target_chunk_size = target_chunk_size
         self.max_chunk_size = max_chunk_size
@@ -75,41 +184,72 @@ class ContentAwareChunker:
         self.overlap_size = overlap_size
         self.respect_sentence_boundaries = respect_sentence_boundaries
         self.respect_section_boundaries = respect_section_boundaries
-        
-        # Initialize NLP model for sentence detection
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("en_core_web_sm not found, using basic sentencizer")
-            from spacy.lang.en import English
-            self.nlp = English()
-            self.nlp.add_pipe('sentencizer')
-        
-        # Initialize fallback text splitter
+        self.store_context_overlaps = store_context_overlaps
+        
+        # Sentence segmentation: shared spaCy service (loaded on first use) or legal regex rules
+        if sentence_backend not in ("spacy", "regex"):
+            raise ValueError(f"Unknown sentence backend: {sentence_backend}")
+        self.sentence_backend = sentence_backend
+        if nlp_service is not None:
+            self.nlp_service = nlp_service
+        elif sentence_backend == "regex":
+            self.nlp_service = LegalSentenceSegmenter()
+        else:
+            self.nlp_service = get_nlp_service()
+        
+        # Token accounting for chunk sizes, overlap limits and estimated_tokens
+        if tokenizer not in ("bpe", "words"):
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        self.tokenizer = tokenizer
+        self.token_counter = None
+        if tokenizer == "bpe":
+            self.token_counter = token_counter or get_token_counter()
+        
+        # Initialize fallback text splitter (sized in tokens when they are counted)
+        splitter_options = {"length_function": self.token_counter.count} if self.token_counter else {}
         self.fallback_splitter = RecursiveCharacterTextSplitter(
             chunk_size=target_chunk_size,
             chunk_overlap=overlap_size,
             separators=["\n\n", "\n", ". ", " ", ""],
-            keep_separator=True
+            keep_separator=True,
+            **splitter_options
         )
     
+    @staticmethod
+    def make_chunk_id(section: DocumentSection, chunk_index: int) -> str:
+        """
+        Build a chunk id that is unique across documents and section types.
+        
+        Args:
+            section: Source document section
+            chunk_index: Index of the chunk within the section
+            
+        Returns:
+            Chunk id such as 'gdpr_article_6_chunk_0'
+        """
+        document_type = section.metadata.get('document_type', 'unknown')
+        return f"{document_type}_{section.section_type}_{section.section_id}_chunk_{chunk_index}"
+    
     def estimate_token_count(self, text: str) -> int:
         """
-        Estimate token count using word-based approximation.
+        Count tokens with the BPE tokenizer, or estimate them from the word count.
         
         Args:
-            text: Text to estimate
+            text: Text to count
             
         Returns:
-            Estimated token count
+            Token count (estimated with the 'words' tokenizer)
         """
+        if self.token_counter is not None:
+            return self.token_counter.count(text)
+        
         # Rough approximation: 1.3 tokens per word for English
         word_count = len(text.split())
         return int(word_count * 1.3)
     
     def split_by_sentences(self, text: str) -> List[str]:
         """
-        Split text into sentences using spaCy.
+        Split text into sentences with the configured backend.
         
         Args:
             text: Text to split
@@ -117,8 +257,17 @@ class ContentAwareChunker:
         Returns:
             List of sentences
         """
-        doc = self.nlp(text)
-        return [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+        return self.nlp_service.split_sentences(text)
+    
+    def _overlap_text(self, sentences: List[str], from_end: bool) -> str:
+        """Join the 1-2 edge sentences of a neighbour, falling back to one if too long."""
+        overlap_sentences = sentences[-2:] if from_end else sentences[:2]
+        overlap = " ".join(overlap_sentences)
+        
+        # Limit overlap size
+        if self.estimate_token_count(overlap) > self.overlap_size:
+            overlap = overlap_sentences[-1] if from_end else overlap_sentences[0]
+        return overlap
     
     def create_overlap(self, previous_text: str, current_text: str, next_text: str = "") -> Tuple[str, str]:
         """
@@ -136,160 +285,129 @@ class ContentAwareChunker:
         overlap_with_next = ""
         
         if previous_text:
-            # Take last few sentences from previous chunk
+            # Take last 1-2 sentences from previous chunk
             prev_sentences = self.split_by_sentences(previous_text)
             if prev_sentences:
-                # Take last 1-2 sentences for context
-                overlap_sentences = prev_sentences[-2:] if len(prev_sentences) > 1 else prev_sentences[-1:]
-                overlap_with_previous = " ".join(overlap_sentences)
-                
-                # Limit overlap size
-                if self.estimate_token_count(overlap_with_previous) > self.overlap_size:
-                    overlap_with_previous = overlap_sentences[-1]  # Just take the last sentence
+                overlap_with_previous = self._overlap_text(prev_sentences, from_end=True)
         
         if next_text:
-            # Take first few sentences from next chunk
+            # Take first 1-2 sentences from next chunk
             next_sentences = self.split_by_sentences(next_text)
             if next_sentences:
-                # Take first 1-2 sentences for context
-                overlap_sentences = next_sentences[:2] if len(next_sentences) > 1 else next_sentences[:1]
-                overlap_with_next = " ".join(overlap_sentences)
-                
-                # Limit overlap size
-                if self.estimate_token_count(overlap_with_next) > self.overlap_size:
-                    overlap_with_next = next_sentences[0]  # Just take the first sentence
+                overlap_with_next = self._overlap_text(next_sentences, from_end=False)
         
         return overlap_with_previous, overlap_with_next
     
-    def chunk_section_intelligently(self, section: DocumentSection) -> List[ContentChunk]:
+    def chunk_section_intelligently(
+        self,
+        section: DocumentSection,
+        sentence_spans: Optional[List[Tuple[int, int]]] = None,
+        table: Optional[SectionTable] = None
+    ) -> List[ContentChunk]:
         """
         Intelligently chunk a single document section.
         
         Args:
             section: Document section to chunk
+            sentence_spans: Pre-computed sentence offsets in the section content
+                (segmented on demand if omitted)
+            table: Section table the chunks refer to (default: a table of this section)
             
         Returns:
             List of content chunks
         """
+        if table is None:
+            table = SectionTable()
+        section_ref = table.add(section)
+        
         chunks = []
         content = section.content
         estimated_tokens = self.estimate_token_count(content)
         
         # If section is small enough, keep as single chunk
         if estimated_tokens <= self.target_chunk_size:
-            chunk = ContentChunk(
-                content=content,
-                chunk_id=f"{section.section_id}_chunk_0",
-                source_section=section,
+            chunks.append(ContentChunk(
+                table=table,
+                section_ref=section_ref,
                 chunk_type="full_section",
                 chunk_index=0,
-                word_count=len(content.split()),
-                metadata={
-                    'section_type': section.section_type,
-                    'section_id': section.section_id,
-                    'section_title': section.title,
-                    'parent_section': section.parent_section,
-                    'estimated_tokens': estimated_tokens,
-                    **section.metadata
-                }
-            )
-            chunks.append(chunk)
+                estimated_tokens=estimated_tokens
+            ))
             return chunks
         
         # For larger sections, split intelligently
         if self.respect_sentence_boundaries:
-            sentences = self.split_by_sentences(content)
-            current_chunk_sentences = []
+            if sentence_spans is None:
+                sentence_spans = self.nlp_service.sentence_spans_many([content])[0]
+            current_spans = []
             current_chunk_tokens = 0
             chunk_index = 0
             
-            for sentence in sentences:
-                sentence_tokens = self.estimate_token_count(sentence)
+            def make_chunk(spans: List[Tuple[int, int]], tokens: int, index: int) -> ContentChunk:
+                # The chunk is the section text from its first to its last sentence
+                chunk_start = spans[0][0]
+                return ContentChunk(
+                    table=table,
+                    section_ref=section_ref,
+                    chunk_type="partial_section",
+                    chunk_index=index,
+                    start=chunk_start,
+                    end=spans[-1][1],
+                    estimated_tokens=tokens,
+                    sentence_count=len(spans),
+                    sentence_spans=[(start - chunk_start, end - chunk_start) for start, end in spans]
+                )
+            
+            for span in sentence_spans:
+                sentence_tokens = self.estimate_token_count(content[span[0]:span[1]])
                 
                 # Check if adding this sentence would exceed target size
                 if (current_chunk_tokens + sentence_tokens > self.target_chunk_size and 
-                    current_chunk_sentences and 
+                    current_spans and 
                     current_chunk_tokens >= self.min_chunk_size):
                     
                     # Create chunk from current sentences
-                    chunk_content = " ".join(current_chunk_sentences)
-                    chunk = ContentChunk(
-                        content=chunk_content,
-                        chunk_id=f"{section.section_id}_chunk_{chunk_index}",
-                        source_section=section,
-                        chunk_type="partial_section",
-                        chunk_index=chunk_index,
-                        word_count=len(chunk_content.split()),
-                        metadata={
-                            'section_type': section.section_type,
-                            'section_id': section.section_id,
-                            'section_title': section.title,
-                            'parent_section': section.parent_section,
-                            'estimated_tokens': current_chunk_tokens,
-                            'sentence_count': len(current_chunk_sentences),
-                            **section.metadata
-                        }
-                    )
-                    chunks.append(chunk)
+                    chunks.append(make_chunk(current_spans, current_chunk_tokens, chunk_index))
                     
                     # Start new chunk with overlap
-                    if self.overlap_size > 0 and len(current_chunk_sentences) > 1:
+                    if self.overlap_size > 0 and len(current_spans) > 1:
                         # Keep last sentence for overlap
-                        overlap_sentence = current_chunk_sentences[-1]
-                        current_chunk_sentences = [overlap_sentence, sentence]
-                        current_chunk_tokens = self.estimate_token_count(overlap_sentence) + sentence_tokens
+                        overlap_span = current_spans[-1]
+                        current_spans = [overlap_span, span]
+                        current_chunk_tokens = self.estimate_token_count(content[overlap_span[0]:overlap_span[1]]) + sentence_tokens
                     else:
-                        current_chunk_sentences = [sentence]
+                        current_spans = [span]
                         current_chunk_tokens = sentence_tokens
                     
                     chunk_index += 1
                 else:
-                    current_chunk_sentences.append(sentence)
+                    current_spans.append(span)
                     current_chunk_tokens += sentence_tokens
             
             # Add final chunk if there are remaining sentences
-            if current_chunk_sentences:
-                chunk_content = " ".join(current_chunk_sentences)
-                chunk = ContentChunk(
-                    content=chunk_content,
-                    chunk_id=f"{section.section_id}_chunk_{chunk_index}",
-                    source_section=section,
-                    chunk_type="partial_section",
-                    chunk_index=chunk_index,
-                    word_count=len(chunk_content.split()),
-                    metadata={
-                        'section_type': section.section_type,
-                        'section_id': section.section_id,
-                        'section_title': section.title,
-                        'parent_section': section.parent_section,
-                        'estimated_tokens': current_chunk_tokens,
-                        'sentence_count': len(current_chunk_sentences),
-                        **section.metadata
-                    }
-                )
-                chunks.append(chunk)
+            if current_spans:
+                chunks.append(make_chunk(current_spans, current_chunk_tokens, chunk_index))
         
         else:
             # Fallback to character-based splitting
             text_chunks = self.fallback_splitter.split_text(content)
+            position = 0
             for i, chunk_text in enumerate(text_chunks):
-                chunk = ContentChunk(
-                    content=chunk_text,
-                    chunk_id=f"{section.section_id}_chunk_{i}",
-                    source_section=section,
+                # Split pieces are normally verbatim slices; keep the text otherwise
+                start = content.find(chunk_text, position)
+                located = start >= 0
+                if located:
+                    position = start + 1
+                chunks.append(ContentChunk(
+                    table=table,
+                    section_ref=section_ref,
                     chunk_type="partial_section",
                     chunk_index=i,
-                    word_count=len(chunk_text.split()),
-                    metadata={
-                        'section_type': section.section_type,
-                        'section_id': section.section_id,
-                        'section_title': section.title,
-                        'parent_section': section.parent_section,
-                        'estimated_tokens': self.estimate_token_count(chunk_text),
-                        **section.metadata
-                    }
-                )
-                chunks.append(chunk)
+                    start=start if located else 0,
+                    end=start + len(chunk_text) if located else 0,
+                    text=None if located else chunk_text,
+                    estimated_tokens=self.estimate_token_count(chunk_text)
+                ))
         
         return chunks
     
@@ -297,41 +415,89 @@ class ContentAwareChunker:
         """
         Add cross-section context overlaps to chunks.
         
+        Overlaps are cut from the sentence offsets recorded while splitting, and
+        the chunks are updated in place. Chunks without offsets (whole sections,
+        character-split text) are segmented once, in a single batch.
+        
         Args:
             chunks: List of chunks to enhance with overlaps
             
         Returns:
-            Enhanced chunks with overlap information
+            The same chunks, with overlap information
         """
-        enhanced_chunks = []
+        unsegmented = [chunk for chunk in chunks if chunk.sentence_spans is None]
+        if unsegmented:
+            spans = self.nlp_service.sentence_spans_many(chunk.content for chunk in unsegmented)
+            for chunk, chunk_spans in zip(unsegmented, spans):
+                chunk.sentence_spans = chunk_spans
         
         for i, chunk in enumerate(chunks):
-            previous_chunk = chunks[i-1] if i > 0 else None
-            next_chunk = chunks[i+1] if i < len(chunks) - 1 else None
+            if i > 0:
+                previous_chunk = chunks[i-1]
+                previous_content = previous_chunk.content
+                edge = [previous_content[start:end] for start, end in previous_chunk.sentence_spans[-2:]]
+                chunk.overlap_with_previous = self._overlap_text(edge, from_end=True) if edge else ""
+            if i < len(chunks) - 1:
+                next_chunk = chunks[i+1]
+                next_content = next_chunk.content
+                edge = [next_content[start:end] for start, end in next_chunk.sentence_spans[:2]]
+                chunk.overlap_with_next = self._overlap_text(edge, from_end=False) if edge else ""
+        
+        return chunks
+    
+    def _chunk_section_batch(self, sections: List[DocumentSection]) -> List[ContentChunk]:
+        """Chunk sections, segmenting every section that needs splitting in one batched pass."""
+        table = SectionTable(sections)
+        
+        presplit = {}
+        if self.respect_sentence_boundaries:
+            large = [
+                i for i, section in enumerate(sections)
+                if self.estimate_token_count(section.content) > self.target_chunk_size
+            ]
+            spans = self.nlp_service.sentence_spans_many(sections[i].content for i in large)
+            presplit = dict(zip(large, spans))
+        
+        chunks = []
+        for i, section in enumerate(sections):
+            section_chunks = self.chunk_section_intelligently(section, presplit.get(i), table)
+            chunks.extend(section_chunks)
             
-            # Create overlaps
-            overlap_prev, overlap_next = self.create_overlap(
-                previous_chunk.content if previous_chunk else "",
-                chunk.content,
-                next_chunk.content if next_chunk else ""
-            )
+            logger.debug(f"Section {section.section_id}: {len(section_chunks)} chunks created")
+        return chunks
+    
+    def iter_chunks(self, sections: Iterable[DocumentSection], batch_size: int = 64) -> Iterator[ContentChunk]:
+        """
+        Chunk a stream of sections, yielding chunks as their batch is done.
+        
+        Only one batch of sections is held at a time; with context overlaps the
+        last chunk of a batch waits for the first chunk of the next one.
+        
+        Args:
+            sections: Document sections, in document order (consumed lazily)
+            batch_size: Number of sections segmented together
             
-            # Create enhanced chunk
-            enhanced_chunk = ContentChunk(
-                content=chunk.content,
-                chunk_id=chunk.chunk_id,
-                source_section=chunk.source_section,
-                chunk_type=chunk.chunk_type,
-                chunk_index=chunk.chunk_index,
-                word_count=chunk.word_count,
-                overlap_with_previous=overlap_prev,
-                overlap_with_next=overlap_next,
-                metadata=chunk.metadata
-            )
+        Yields:
+            Content chunks, in document order
+        """
+        stores_overlaps = self.overlap_size > 0 and self.store_context_overlaps
+        held: Optional[ContentChunk] = None
+        
+        for batch in batched(sections, batch_size):
+            chunks = self._chunk_section_batch(batch)
+            if not stores_overlaps:
+                yield from chunks
+                continue
             
-            enhanced_chunks.append(enhanced_chunk)
-        
-        return enhanced_chunks
+            window = ([held] if held is not None else []) + chunks
+            if not window:
+                continue
+            self.add_cross_section_context(window)
+            yield from window[:-1]
+            held = window[-1]
+        
+        if held is not None:
+            yield held
     
     def chunk_document_sections(self, sections: List[DocumentSection]) -> List[ContentChunk]:
         """
@@ -343,18 +509,12 @@ class ContentAwareChunker:
         Returns:
             List of content-aware chunks
         """
-        all_chunks = []
-        
         logger.info(f"Chunking {len(sections)} document sections")
         
-        for section in sections:
-            section_chunks = self.chunk_section_intelligently(section)
-            all_chunks.extend(section_chunks)
-            
-            logger.debug(f"Section {section.section_id}: {len(section_chunks)} chunks created")
+        all_chunks = self._chunk_section_batch(sections)
         
         # Add cross-section context
-        if self.overlap_size > 0:
+        if self.overlap_size > 0 and self.store_context_overlaps:
             all_chunks = self.add_cross_section_context(all_chunks)
         
         logger.info(f"Total chunks created: {len(all_chunks)}")
@@ -404,7 +564,7 @@ class ContentAwareChunker:
 
 def main():
     """Example usage of the content-aware chunker."""
-    from .document_parser import PolicyDocumentParser, DocumentType
+    from .document_parser import DocumentType
     
     # Initialize components
     parser = PolicyDocumentParser()
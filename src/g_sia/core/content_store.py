@@ -0,0 +1,106 @@
+"""
+Local chunk content store for two-phase retrieval.
+
+This module keeps full chunk payloads (text, overlaps and metadata) in a local
+SQLite file so the vector index only needs to hold slim routing payloads; full
+text is fetched for the final top-k hits only.
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ChunkContentStore:
+    """
+    SQLite-backed key-value store of full chunk payloads keyed by point id.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the content store.
+        
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_content (point_id TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        """
+        Insert or replace full payloads.
+        
+        Args:
+            items: Iterable of (point id, payload) pairs
+        """
+        rows = [(point_id, json.dumps(payload, separators=(",", ":"))) for point_id, payload in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunk_content (point_id, payload) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+    
+    def get_many(self, point_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch full payloads.
+        
+        Args:
+            point_ids: Point ids to fetch
+        
+        Returns:
+            Mapping of point id to payload (missing ids are omitted)
+        """
+        if not point_ids:
+            return {}
+        
+        placeholders = ",".join("?" for _ in point_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT point_id, payload FROM chunk_content WHERE point_id IN ({placeholders})",
+                list(point_ids)
+            ).fetchall()
+        return {point_id: json.loads(payload) for point_id, payload in rows}
+    
+    def delete_many(self, point_ids: List[str]):
+        """
+        Delete payloads.
+        
+        Args:
+            point_ids: Point ids to delete
+        """
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunk_content WHERE point_id = ?", [(point_id,) for point_id in point_ids]
+            )
+            self._conn.commit()
+    
+    def clear(self):
+        """Delete all payloads."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_content")
+            self._conn.commit()
+    
+    def count(self) -> int:
+        """Number of stored payloads."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunk_content").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
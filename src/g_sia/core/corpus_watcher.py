@@ -0,0 +1,333 @@
+"""
+Live corpus watcher with section-level incremental reindexing.
+
+The watcher polls the policy corpus directory for added, changed and deleted
+markdown files. Changed files are re-parsed and their sections compared, by
+section hash, with what the vector store holds; only new or changed sections are
+re-chunked and re-embedded, and points of changed or removed sections that no
+longer exist are deleted by section. New points are written before stale ones are
+removed and the store keeps answering searches throughout, so amendments become
+searchable within a poll interval and without a rebuild. Sections that a
+near-duplicate filter folded into a replaced chunk are re-indexed on their own,
+since the watcher does not deduplicate.
+
+Section hashes only cover section text and structure: after changing chunker or
+embedding settings, rebuild the collection instead.
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+from .document_parser import DocumentSection, PolicyDocumentParser
+from .content_aware_chunker import ContentAwareChunker
+from .vector_store_base import PolicyVectorStore, section_fingerprint
+from .diversification import section_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of a watched file
+FileStamp = Tuple[int, int]
+
+
+class CorpusWatcher:
+    """
+    Keeps a vector store in sync with the markdown files of a corpus directory.
+    """
+    
+    def __init__(
+        self,
+        vector_store: PolicyVectorStore,
+        document_parser: PolicyDocumentParser,
+        chunker: ContentAwareChunker,
+        corpus_dir: str = "policy_corpus/output",
+        poll_interval: float = 1.0,
+        settle_seconds: float = 0.5,
+        batch_size: int = 100
+    ):
+        """
+        Initialize the watcher.
+        
+        Args:
+            vector_store: Store to keep in sync (Qdrant or FAISS)
+            document_parser: Parser for changed files
+            chunker: Chunker for changed sections (the one the collection was built with)
+            corpus_dir: Directory holding one sub-directory of markdown files per document
+            poll_interval: Seconds between directory scans
+            settle_seconds: A changed file is only read once it has not changed for this long
+            batch_size: Number of chunks per embedding batch
+        """
+        self.vector_store = vector_store
+        self.document_parser = document_parser
+        self.chunker = chunker
+        self.corpus_dir = Path(corpus_dir)
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.batch_size = batch_size
+        
+        # Stamps of the files as last synced, and the section keys each file produced
+        self._stamps: Dict[str, FileStamp] = {}
+        self._file_sections: Dict[str, Set[str]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.syncs = 0
+        self.last_sync: Optional[Dict[str, Any]] = None
+    
+    def scan(self) -> Dict[str, FileStamp]:
+        """
+        Stamp every markdown file of the corpus.
+        
+        Returns:
+            Mapping of file path to (size, mtime_ns)
+        """
+        stamps = {}
+        if not self.corpus_dir.exists():
+            return stamps
+        for md_file in self.corpus_dir.glob("*/*.md"):
+            try:
+                stat = md_file.stat()
+            except OSError:
+                # Deleted between listing and stat
+                continue
+            stamps[str(md_file)] = (stat.st_size, stat.st_mtime_ns)
+        return stamps
+    
+    def _section_hashes(self, sections: List[DocumentSection]) -> Dict[str, Tuple[str, DocumentSection]]:
+        """Section key -> (section hash, section) of a parsed file."""
+        hashes = {}
+        for section in sections:
+            key = section_key({
+                "document_type": section.metadata.get("document_type", ""),
+                "section_type": section.section_type,
+                "section_id": section.section_id,
+            })
+            hashes[key] = (section_fingerprint(section), section)
+        return hashes
+    
+    def sync(self, changed_paths: List[str], deleted_paths: List[str], full: bool = False) -> Dict[str, Any]:
+        """
+        Reindex the changed sections of the given files.
+        
+        Args:
+            changed_paths: Added or modified files, re-parsed and diffed
+            deleted_paths: Removed files, whose sections are deleted
+            full: Also delete indexed sections that no current file produces
+                (used for the initial reconciliation)
+        
+        Returns:
+            Sync statistics
+        """
+        start = time.perf_counter()
+        
+        parsed = {}
+        for file_path in changed_paths:
+            parsed[file_path] = self._section_hashes(self.document_parser.parse_document(file_path))
+        
+        # One scan of the stored section hashes covers all touched document types
+        if full:
+            indexed = self.vector_store.get_section_hashes()
+        else:
+            document_types = {key.split(":", 1)[0] for sections in parsed.values() for key in sections}
+            document_types.update(
+                key.split(":", 1)[0] for path in deleted_paths for key in self._file_sections.get(path, ())
+            )
+            indexed = self.vector_store.get_section_hashes(document_types) if document_types else {}
+        
+        # File ownership of sections is only committed once the store accepted the update
+        file_sections = dict(self._file_sections)
+        changed_sections: List[DocumentSection] = []
+        changed_keys: Set[str] = set()
+        removed_keys: Set[str] = set()
+        for file_path, sections in parsed.items():
+            for key, (section_hash, section) in sections.items():
+                if indexed.get(key) != section_hash:
+                    changed_sections.append(section)
+                    changed_keys.add(key)
+            removed_keys.update(file_sections.get(file_path, set()) - sections.keys())
+            file_sections[file_path] = set(sections)
+        for file_path in deleted_paths:
+            removed_keys.update(file_sections.pop(file_path, set()))
+        
+        # Another file may still produce a removed key
+        claimed = set().union(*file_sections.values())
+        if full:
+            removed_keys.update(indexed)
+        removed_keys = {key for key in removed_keys if key in indexed and key not in claimed}
+        
+        if full:
+            self._fit_sparse_encoder(parsed)
+        
+        # Sections folded into replaced chunks as near-duplicates lose their only
+        # record with them, so they are indexed on their own again
+        replaced = changed_keys | removed_keys
+        orphaned = self.vector_store.get_alias_sections(replaced) - replaced if replaced else set()
+        if orphaned:
+            found = self._find_sections(orphaned, parsed, file_sections, deleted_paths)
+            logger.info(f"Re-indexing {len(found)} sections that were aliases of replaced chunks")
+            changed_sections.extend(found.values())
+            changed_keys.update(found)
+        
+        chunks = self.chunker.chunk_document_sections(changed_sections) if changed_sections else []
+        if changed_keys or removed_keys:
+            if not self.vector_store.replace_sections(chunks, changed_keys | removed_keys, batch_size=self.batch_size):
+                raise RuntimeError("Vector store rejected the section update")
+        self._file_sections = file_sections
+        
+        stats = {
+            "files_changed": len(changed_paths),
+            "files_deleted": len(deleted_paths),
+            "sections_changed": len(changed_sections),
+            "sections_removed": len(removed_keys),
+            "chunks_written": len(chunks),
+            "seconds": time.perf_counter() - start,
+        }
+        self.syncs += 1
+        self.last_sync = stats
+        if changed_sections or removed_keys:
+            logger.info(
+                f"Corpus sync: {stats['sections_changed']} sections re-indexed ({stats['chunks_written']} chunks), "
+                f"{stats['sections_removed']} removed in {stats['seconds']:.2f}s"
+            )
+        return stats
+    
+    def _find_sections(
+        self,
+        section_keys: Set[str],
+        parsed: Dict[str, Dict[str, Tuple[str, DocumentSection]]],
+        file_sections: Dict[str, Set[str]],
+        deleted_paths: List[str]
+    ) -> Dict[str, DocumentSection]:
+        """
+        Parse the current sections with the given keys from the corpus.
+        
+        Files parsed in this sync are searched first, then files known to hold
+        the keys, then files this watcher has not parsed yet (whose ownership is
+        recorded in file_sections on the way).
+        
+        Returns:
+            Section key -> section, for the keys that still exist
+        """
+        found = {}
+        for sections in parsed.values():
+            found.update((key, section) for key, (_, section) in sections.items() if key in section_keys)
+        
+        remaining = section_keys - found.keys()
+        # Files known to hold the keys come first
+        candidates = sorted(
+            (path for path in self._stamps if path not in parsed and path not in deleted_paths),
+            key=lambda path: not (file_sections.get(path, set()) & remaining)
+        )
+        for file_path in candidates:
+            if not remaining:
+                break
+            known = file_sections.get(file_path)
+            if known is not None and not known & remaining:
+                continue
+            sections = self._section_hashes(self.document_parser.parse_document(file_path))
+            if known is None:
+                file_sections[file_path] = set(sections)
+            for key in remaining & sections.keys():
+                found[key] = sections[key][1]
+            remaining -= sections.keys()
+        return found
+    
+    def _fit_sparse_encoder(self, parsed: Dict[str, Dict[str, Tuple[str, DocumentSection]]]):
+        """Fit the BM25 statistics of a hybrid store on the whole corpus if this process has none."""
+        sparse_encoder = getattr(self.vector_store, "sparse_encoder", None)
+        if sparse_encoder is None or sparse_encoder.document_count:
+            return
+        sections = [section for file_sections in parsed.values() for _, section in file_sections.values()]
+        logger.info(f"Fitting the sparse encoder on {len(sections)} corpus sections")
+        self.vector_store.fit_sparse_encoder(self.chunker.iter_chunks(iter(sections)))
+    
+    def sync_all(self) -> Dict[str, Any]:
+        """
+        Reconcile the store with the whole corpus.
+        
+        Returns:
+            Sync statistics
+        """
+        stamps = self.scan()
+        self._file_sections.clear()
+        stats = self.sync(sorted(stamps), [], full=True)
+        self._stamps = stamps
+        return stats
+    
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Sync the files that changed since the last poll.
+        
+        Returns:
+            Sync statistics, or None if nothing changed
+        """
+        stamps = self.scan()
+        changed = [path for path, stamp in stamps.items() if self._stamps.get(path) != stamp]
+        deleted = [path for path in self._stamps if path not in stamps]
+        if not changed and not deleted:
+            return None
+        
+        # Wait until writers are done with the changed files
+        while changed and self.settle_seconds > 0 and not self._stop.is_set():
+            time.sleep(self.settle_seconds)
+            settled = self.scan()
+            if all(settled.get(path) == stamps.get(path) for path in changed):
+                break
+            stamps = settled
+            changed = [path for path, stamp in stamps.items() if self._stamps.get(path) != stamp]
+            deleted = [path for path in self._stamps if path not in stamps]
+        
+        changed = [path for path in changed if path in stamps]
+        stats = self.sync(changed, deleted)
+        self._stamps = stamps
+        return stats
+    
+    def run(self, sync_first: bool = True):
+        """
+        Watch the corpus until stop() is called.
+        
+        Args:
+            sync_first: Reconcile the store with the whole corpus before watching
+        """
+        if sync_first:
+            self.sync_all()
+        else:
+            self._stamps = self.scan()
+        logger.info(f"Watching {self.corpus_dir} for changes every {self.poll_interval}s")
+        
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # A bad file or a store hiccup must not end the watcher; unsynced files stay pending
+                logger.error(f"Corpus sync failed, retrying on the next poll: {e}")
+    
+    def start(self, sync_first: bool = True) -> "CorpusWatcher":
+        """
+        Run the watcher on a background thread.
+        
+        Args:
+            sync_first: Reconcile the store with the whole corpus before watching
+        
+        Returns:
+            The watcher
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(sync_first,), name="corpus-watcher", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop watching.
+        
+        Args:
+            timeout: Seconds to wait for a sync in progress
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,96 @@
+"""
+Maximal marginal relevance (MMR) diversification of search candidates.
+
+Neighbouring chunks of the same provision tend to crowd the top of a similarity
+ranking. MMR trades relevance against redundancy with already selected chunks,
+and a per-group cap bounds how many chunks a single section may contribute.
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+    groups: Optional[Sequence[Any]] = None,
+    max_per_group: Optional[int] = None
+) -> List[int]:
+    """
+    Select candidates by maximal marginal relevance.
+    
+    All similarities are computed as one matrix product up front; each
+    selection step is then a handful of vector operations over all candidates.
+    
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Candidate embeddings, in ranking order
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+        groups: Optional group key per candidate (e.g. its section)
+        max_per_group: Maximum number of selected candidates per group
+    
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    if len(candidate_vectors) == 0 or k <= 0:
+        return []
+    
+    candidates = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+    
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+    
+    group_ids = None
+    group_counts = None
+    if groups is not None and max_per_group:
+        _, group_ids = np.unique(np.asarray([str(group) for group in groups]), return_inverse=True)
+        group_counts = np.zeros(group_ids.max() + 1, dtype=np.int64)
+    
+    available = np.ones(len(candidates), dtype=bool)
+    # Highest similarity of every candidate to anything selected so far
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    selected: List[int] = []
+    
+    while len(selected) < k and available.any():
+        if selected:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+        
+        if group_counts is not None:
+            group = group_ids[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available &= group_ids != group
+    
+    return selected
+
+
+def section_key(metadata: Dict[str, Any]) -> str:
+    """Group key of a chunk's section across documents."""
+    return ":".join([
+        str(metadata.get("document_type", "")),
+        str(metadata.get("section_type", "")),
+        str(metadata.get("section_id", "")),
+    ])
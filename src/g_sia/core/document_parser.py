@@ -7,13 +7,14 @@ GDPR and HIPAA documents while preserving their hierarchical structure.
 
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
 from dataclasses import dataclass
 from pathlib import Path
 from enum import Enum
 
-import spacy
-from spacy.lang.en import English
+from .nlp_service import SentenceNLPService, get_nlp_service
+from .ingest_pipeline import batched
+from .section_lexer import lex_lines
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +28,18 @@ class DocumentType(Enum):
     CCPA = "ccpa"
 
 
+# Content indicators of each document type, in detection priority order
+DOCUMENT_TYPE_INDICATORS = [
+    (DocumentType.GDPR, ['general data protection regulation', 'gdpr', 'recital', 'whereas:']),
+    (DocumentType.HIPAA, ['hipaa', 'health insurance portability', 'administrative simplification']),
+    (DocumentType.CCPA, ['california consumer privacy act', 'ccpa']),
+]
+
+# Structural markers recognized per document layout
+GDPR_KINDS = {'recital', 'chapter', 'article'}
+HIPAA_KINDS = {'part', 'subpart', 'section'}
+
+
 @dataclass
 class DocumentSection:
     """Represents a structured section of a policy document."""
@@ -47,38 +60,15 @@ class PolicyDocumentParser:
     Advanced parser for policy documents that preserves hierarchical structure.
     """
     
-    def __init__(self):
-        """Initialize the parser with NLP capabilities."""
-        try:
-            # Try to load the full English model
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Fallback to basic English tokenizer
-            logger.warning("en_core_web_sm not found, using basic tokenizer")
-            self.nlp = English()
-            self.nlp.add_pipe('sentencizer')
+    def __init__(self, nlp_service: Optional[SentenceNLPService] = None):
+        """
+        Initialize the parser with NLP capabilities.
         
-        # Document-specific patterns
-        self.gdpr_patterns = self._init_gdpr_patterns()
-        self.hipaa_patterns = self._init_hipaa_patterns()
-    
-    def _init_gdpr_patterns(self) -> Dict[str, re.Pattern]:
-        """Initialize GDPR-specific regex patterns."""
-        return {
-            'recital': re.compile(r'^\s*-\s*\((\d+)\)\s*(.*?)(?=^\s*-\s*\(\d+\)|^CHAPTER|^Article|\Z)', re.MULTILINE | re.DOTALL),
-            'chapter': re.compile(r'^CHAPTER\s+([IVXLCDM]+)\s*(.*)$', re.MULTILINE),
-            'article': re.compile(r'^Article\s+(\d+)\s*(.*)$', re.MULTILINE),
-            'section': re.compile(r'^(\d+)\.\s*(.*)$', re.MULTILINE),
-        }
-    
-    def _init_hipaa_patterns(self) -> Dict[str, re.Pattern]:
-        """Initialize HIPAA-specific regex patterns."""
-        return {
-            'part': re.compile(r'^PART\s+(\d+)[—\-]\s*(.*)$', re.MULTILINE),
-            'subpart': re.compile(r'^SUBPART\s+([A-Z])[—\-]\s*(.*)$', re.MULTILINE),
-            'section': re.compile(r'^§\s*(\d+\.\d+)\s+(.*)$', re.MULTILINE),
-            'title': re.compile(r'^TITLE\s+([IVXLCDM]+)[—\-]\s*(.*)$', re.MULTILINE),
-        }
+        Args:
+            nlp_service: Sentence segmentation service (default: the shared,
+                lazily loaded process-wide service)
+        """
+        self.nlp_service = nlp_service or get_nlp_service()
     
     def detect_document_type(self, content: str) -> DocumentType:
         """
@@ -90,22 +80,23 @@ class PolicyDocumentParser:
         Returns:
             Detected document type
         """
-        content_lower = content.lower()
-        
-        # Check for GDPR indicators
-        gdpr_indicators = ['general data protection regulation', 'gdpr', 'recital', 'whereas:']
-        if any(indicator in content_lower for indicator in gdpr_indicators):
-            return DocumentType.GDPR
-        
-        # Check for HIPAA indicators
-        hipaa_indicators = ['hipaa', 'health insurance portability', 'administrative simplification']
-        if any(indicator in content_lower for indicator in hipaa_indicators):
-            return DocumentType.HIPAA
-        
-        # Check for CCPA indicators
-        ccpa_indicators = ['california consumer privacy act', 'ccpa']
-        if any(indicator in content_lower for indicator in ccpa_indicators):
-            return DocumentType.CCPA
+        return self._detect_from_lines([content])
+    
+    def _detect_from_lines(self, lines: Iterable[str]) -> DocumentType:
+        """Detect the document type from a stream of lines (the first type in priority order wins)."""
+        found = set()
+        for line in lines:
+            line_lower = line.lower()
+            for doc_type, indicators in DOCUMENT_TYPE_INDICATORS:
+                if doc_type not in found and any(indicator in line_lower for indicator in indicators):
+                    found.add(doc_type)
+            # GDPR has the highest priority, so nothing later can change the result
+            if DocumentType.GDPR in found:
+                break
+        
+        for doc_type, _ in DOCUMENT_TYPE_INDICATORS:
+            if doc_type in found:
+                return doc_type
         
         # Default to GDPR if uncertain
         logger.warning("Could not detect document type, defaulting to GDPR")
@@ -143,83 +134,19 @@ class PolicyDocumentParser:
         Returns:
             List of structured document sections
         """
-        sections = []
-        current_chapter = None
-        
-        # Extract recitals first
-        recital_matches = self.gdpr_patterns['recital'].findall(content)
-        for recital_num, recital_content in recital_matches:
-            section = DocumentSection(
-                content=self.clean_text(recital_content),
-                section_type='recital',
-                section_id=recital_num,
-                title=f"Recital {recital_num}",
-                metadata={
-                    'document_type': 'gdpr',
-                    'recital_number': int(recital_num),
-                    'section_length': len(recital_content.split())
-                }
-            )
-            sections.append(section)
-        
-        # Extract chapters and articles
-        lines = content.split('\n')
-        current_section_content = []
-        current_section_info = None
+        return list(self.iter_gdpr_sections(content))
+    
+    def iter_gdpr_sections(self, content: str) -> Iterator[DocumentSection]:
+        """
+        Yield structured sections of a GDPR document as they are found.
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check for chapter
-            chapter_match = self.gdpr_patterns['chapter'].match(line)
-            if chapter_match:
-                # Save previous section if exists
-                if current_section_info and current_section_content:
-                    sections.append(self._create_section_from_content(
-                        current_section_content, current_section_info, 'gdpr'
-                    ))
-                
-                current_chapter = chapter_match.group(1)
-                current_section_info = {
-                    'type': 'chapter',
-                    'id': current_chapter,
-                    'title': chapter_match.group(2).strip(),
-                    'parent': None
-                }
-                current_section_content = [line]
-                continue
-            
-            # Check for article
-            article_match = self.gdpr_patterns['article'].match(line)
-            if article_match:
-                # Save previous section if exists
-                if current_section_info and current_section_content:
-                    sections.append(self._create_section_from_content(
-                        current_section_content, current_section_info, 'gdpr'
-                    ))
-                
-                current_section_info = {
-                    'type': 'article',
-                    'id': article_match.group(1),
-                    'title': article_match.group(2).strip(),
-                    'parent': current_chapter
-                }
-                current_section_content = [line]
-                continue
+        Args:
+            content: GDPR document content
             
-            # Add to current section content
-            if current_section_info:
-                current_section_content.append(line)
-        
-        # Add final section
-        if current_section_info and current_section_content:
-            sections.append(self._create_section_from_content(
-                current_section_content, current_section_info, 'gdpr'
-            ))
-        
-        return sections
+        Yields:
+            Structured document sections, in document order
+        """
+        return self.iter_structured_sections(content.splitlines(), DocumentType.GDPR)
     
     def extract_hipaa_sections(self, content: str) -> List[DocumentSection]:
         """
@@ -231,86 +158,130 @@ class PolicyDocumentParser:
         Returns:
             List of structured document sections
         """
-        sections = []
-        current_part = None
-        current_subpart = None
+        return list(self.iter_hipaa_sections(content))
+    
+    def iter_hipaa_sections(self, content: str) -> Iterator[DocumentSection]:
+        """
+        Yield structured sections of a HIPAA document as they are found.
         
-        lines = content.split('\n')
-        current_section_content = []
-        current_section_info = None
+        Args:
+            content: HIPAA document content
+            
+        Yields:
+            Structured document sections, in document order
+        """
+        return self.iter_structured_sections(content.splitlines(), DocumentType.HIPAA)
+    
+    def iter_structured_sections(self, lines: Iterable[str], doc_type: DocumentType) -> Iterator[DocumentSection]:
+        """
+        Build sections from the structural events of a document in one pass.
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        Recitals end at the next structural marker and are only recognized
+        before the first chapter or article, so numbered points inside articles
+        (e.g. the definitions of Article 4) stay part of their article. An
+        article or chapter heading without a title takes the heading that
+        follows it as its title. A section id that occurs again gets an
+        occurrence suffix ("164.D (2)"), so its chunks never replace the
+        chunks of the first occurrence.
+        
+        Args:
+            lines: Document lines (an open file is read lazily)
+            doc_type: Document type (anything but HIPAA is parsed as GDPR)
             
-            # Check for part
-            part_match = self.hipaa_patterns['part'].match(line)
-            if part_match:
-                # Save previous section if exists
-                if current_section_info and current_section_content:
-                    sections.append(self._create_section_from_content(
-                        current_section_content, current_section_info, 'hipaa'
-                    ))
-                
-                current_part = part_match.group(1)
-                current_section_info = {
-                    'type': 'part',
-                    'id': current_part,
-                    'title': part_match.group(2).strip(),
-                    'parent': None
-                }
-                current_section_content = [line]
-                continue
+        Yields:
+            Structured document sections, in document order
+        """
+        type_name = 'hipaa' if doc_type == DocumentType.HIPAA else 'gdpr'
+        kinds = HIPAA_KINDS if type_name == 'hipaa' else GDPR_KINDS
+        
+        # Enclosing chapter, or part and subpart letter, of the current position
+        parents = {}
+        current_section_info = None
+        current_section_content = []
+        in_recitals = True
+        
+        # (kind, id) -> occurrences so far
+        seen: Dict[Tuple[str, str], int] = {}
+        def unique_id(kind: str, section_id: str) -> str:
+            count = seen.get((kind, section_id), 0) + 1
+            seen[(kind, section_id)] = count
+            if count == 1:
+                return section_id
+            logger.warning(f"{type_name} {kind} {section_id} occurs {count} times; numbering the repeat")
+            return f"{section_id} ({count})"
+        
+        for event in lex_lines(lines, kinds):
+            if event.kind == 'recital' and not in_recitals:
+                event = event._replace(kind='text')
             
-            # Check for subpart
-            subpart_match = self.hipaa_patterns['subpart'].match(line)
-            if subpart_match:
-                # Save previous section if exists
-                if current_section_info and current_section_content:
-                    sections.append(self._create_section_from_content(
-                        current_section_content, current_section_info, 'hipaa'
-                    ))
-                
-                current_subpart = subpart_match.group(1)
-                current_section_info = {
-                    'type': 'subpart',
-                    'id': current_subpart,
-                    'title': subpart_match.group(2).strip(),
-                    'parent': current_part
-                }
-                current_section_content = [line]
+            if event.kind in ('heading', 'text'):
+                if current_section_info is None:
+                    continue
+                # A bare "Article 1" heading is followed by its title heading
+                if event.kind == 'heading' and not current_section_info['title'] and len(current_section_content) == 1:
+                    current_section_info['title'] = event.title
+                current_section_content.append(event.text)
                 continue
             
-            # Check for section
-            section_match = self.hipaa_patterns['section'].match(line)
-            if section_match:
-                # Save previous section if exists
-                if current_section_info and current_section_content:
-                    sections.append(self._create_section_from_content(
-                        current_section_content, current_section_info, 'hipaa'
-                    ))
-                
+            # Save previous section if exists
+            if current_section_info:
+                yield self._finish_section(current_section_content, current_section_info, type_name)
+            
+            if event.kind == 'recital':
                 current_section_info = {
-                    'type': 'section',
-                    'id': section_match.group(1),
-                    'title': section_match.group(2).strip(),
-                    'parent': f"{current_part}.{current_subpart}" if current_part and current_subpart else current_part
+                    'type': 'recital',
+                    'id': unique_id('recital', event.section_id),
+                    'number': int(event.section_id),
+                    'title': f"Recital {event.section_id}"
                 }
-                current_section_content = [line]
+                current_section_content = [event.title]
                 continue
             
-            # Add to current section content
-            if current_section_info:
-                current_section_content.append(line)
+            in_recitals = False
+            if event.kind in ('chapter', 'part'):
+                parents = {event.kind: event.section_id}
+                parent = None
+            elif event.kind == 'subpart':
+                parents['subpart'] = event.section_id
+                parent = parents.get('part')
+                # Every part restarts at Subpart A, so subpart ids carry their part
+                if parent:
+                    event = event._replace(section_id=f"{parent}.{event.section_id}")
+            elif event.kind == 'article':
+                parent = parents.get('chapter')
+            else:
+                part, subpart = parents.get('part'), parents.get('subpart')
+                parent = f"{part}.{subpart}" if part and subpart else part
+            
+            current_section_info = {
+                'type': event.kind,
+                'id': unique_id(event.kind, event.section_id),
+                'title': event.title,
+                'parent': parent
+            }
+            current_section_content = [event.text]
         
         # Add final section
-        if current_section_info and current_section_content:
-            sections.append(self._create_section_from_content(
-                current_section_content, current_section_info, 'hipaa'
-            ))
+        if current_section_info:
+            yield self._finish_section(current_section_content, current_section_info, type_name)
+    
+    def _finish_section(self, content_lines: List[str], section_info: Dict[str, Any], doc_type: str) -> DocumentSection:
+        """Create the DocumentSection of a recital or a structural section."""
+        if section_info['type'] != 'recital':
+            return self._create_section_from_content(content_lines, section_info, doc_type)
         
-        return sections
+        recital_content = '\n'.join(content_lines)
+        return DocumentSection(
+            content=self.clean_text(recital_content),
+            section_type='recital',
+            section_id=section_info['id'],
+            title=section_info['title'],
+            metadata={
+                'document_type': doc_type,
+                'recital_number': section_info['number'],
+                'section_length': len(recital_content.split())
+            }
+        )
     
     def _create_section_from_content(self, content_lines: List[str], section_info: Dict[str, Any], doc_type: str) -> DocumentSection:
         """
@@ -327,14 +298,13 @@ class PolicyDocumentParser:
         content = '\n'.join(content_lines)
         cleaned_content = self.clean_text(content)
         
-        # Calculate content metrics
+        # Calculate content metrics (sentences are counted in one batch by parse_document)
         word_count = len(cleaned_content.split())
-        sentence_count = len(list(self.nlp(cleaned_content).sents))
         
         metadata = {
             'document_type': doc_type,
             'word_count': word_count,
-            'sentence_count': sentence_count,
+            'sentence_count': None,
             'section_length': len(cleaned_content)
         }
         
@@ -364,31 +334,54 @@ class PolicyDocumentParser:
         Returns:
             List of structured document sections
         """
+        sections = list(self.iter_sections(file_path, doc_type))
+        logger.info(f"Extracted {len(sections)} sections from document")
+        return sections
+    
+    def iter_sections(
+        self,
+        file_path: str,
+        doc_type: Optional[DocumentType] = None,
+        batch_size: int = 64
+    ) -> Iterator[DocumentSection]:
+        """
+        Parse a policy document and yield its sections as they are extracted.
+        
+        Args:
+            file_path: Path to the document file
+            doc_type: Optional document type (auto-detected if not provided)
+            batch_size: Number of sections whose sentences are counted together
+            
+        Yields:
+            Structured document sections, in document order
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            f = open(file_path, 'r', encoding='utf-8')
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
-            return []
-        
-        # Auto-detect document type if not provided
-        if doc_type is None:
-            doc_type = self.detect_document_type(content)
-        
-        logger.info(f"Parsing document as {doc_type.value.upper()}")
+            return
         
-        # Parse based on document type
-        if doc_type == DocumentType.GDPR:
-            sections = self.extract_gdpr_sections(content)
-        elif doc_type == DocumentType.HIPAA:
-            sections = self.extract_hipaa_sections(content)
-        else:
-            logger.warning(f"Document type {doc_type} not fully implemented, using GDPR parser")
-            sections = self.extract_gdpr_sections(content)
-        
-        logger.info(f"Extracted {len(sections)} sections from document")
-        return sections
-
+        with f:
+            # Auto-detect document type if not provided
+            if doc_type is None:
+                doc_type = self._detect_from_lines(f)
+                f.seek(0)
+            
+            logger.info(f"Parsing document as {doc_type.value.upper()}")
+            
+            if doc_type not in (DocumentType.GDPR, DocumentType.HIPAA):
+                logger.warning(f"Document type {doc_type} not fully implemented, using GDPR parser")
+            
+            # The file is read line by line while sections are built
+            sections = self.iter_structured_sections(f, doc_type)
+            
+            # Count sentences of structured sections in batches
+            for batch in batched(sections, batch_size):
+                counted = [section for section in batch if 'sentence_count' in section.metadata]
+                counts = self.nlp_service.count_sentences_many(section.content for section in counted)
+                for section, sentence_count in zip(counted, counts):
+                    section.metadata['sentence_count'] = sentence_count
+                yield from batch
 
 def main():
     """Example usage of the document parser."""
@@ -0,0 +1,598 @@
+"""
+Persistent content-hash cache for text embeddings.
+
+This module provides a two-tier embedding cache keyed by (embedding model,
+sha256 of the exact text): an in-memory LRU tier on top of a memory-mapped
+on-disk store with size-bounded eviction.
+
+Each record of the data file holds the sha256 digest of its key next to the
+vector, so a slot that was reused by another writer reads as a miss instead of
+a wrong vector. Slots are allocated by growing the shared data file under a
+lock on the cache directory, so several caches (threads, store objects or
+processes) can write to the same directory. A cache that opens the directory
+while no other cache has it open truncates the data file after the last
+indexed slot and reuses the unindexed slots below it.
+
+New index entries are appended to a log (index.<generation>.log) and folded into
+the index snapshot (index.json) only once the log is as long as the index; the
+snapshot names the log generation it continues with, so a rewrite interrupted at
+any point never mixes a log with the wrong snapshot. Persisting
+a miss costs time proportional to the new entries rather than to the cache size.
+Writes are flushed in batches, after an interval and at interpreter exit.
+"""
+
+import os
+import re
+import json
+import mmap
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking (Windows); each cache behaves as the only writer
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bytes of the key digest stored in front of each vector
+DIGEST_SIZE = 32
+# On-disk layout version, stored in the index snapshot
+CACHE_FORMAT = 2
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + memory-mapped disk) cache of embedding vectors.
+    """
+    
+    # Number of vector slots added to the data file whenever a writer runs out of slots
+    GROWTH_SLOTS = 1024
+    # The log is folded into the snapshot once it has this many entries (or as many as the index)
+    MIN_COMPACT_ENTRIES = 1024
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        memory_size: int = 10000,
+        max_disk_entries: int = 200000,
+        flush_every: int = 256,
+        flush_interval: float = 5.0
+    ):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            cache_dir: Root directory for on-disk cache files
+            model_name: Embedding model identifier (part of the cache key)
+            memory_size: Maximum number of vectors kept in the memory tier
+            max_disk_entries: Maximum number of vectors kept on disk
+            flush_every: maybe_flush() persists once this many entries are pending
+            flush_interval: maybe_flush() persists pending entries older than this (seconds)
+        """
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.dimension: Optional[int] = None
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> slot, LRU order
+        # Slots this cache may write without evicting, lowest last
+        self._free_slots: List[int] = []
+        # (key, slot) entries written since the last flush
+        self._pending: List[Tuple[str, int]] = []
+        # Entries in the current log, and how far this cache has read it
+        self._log_entries = 0
+        self._log_offset = 0
+        self._log_generation = 0
+        # Identity of the snapshot the index was loaded from, to notice rewrites by other writers
+        self._snapshot_stamp: Optional[Tuple[int, int, int]] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        
+        model_slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.cache_path = Path(cache_dir) / model_slug
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        self._data_path = self.cache_path / "vectors.f32"
+        self._index_path = self.cache_path / "index.json"
+        
+        # Exclusive lock for writes, and a shared lock held while the cache is open
+        self._lock_file = open(self.cache_path / "write.lock", 'a+b')
+        self._users_file = open(self.cache_path / "users.lock", 'a+b')
+        
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        with self._locked():
+            self._load_index()
+        atexit.register(self.close)
+    
+    def make_key(self, text: str) -> str:
+        """
+        Build the cache key for a text.
+        
+        Args:
+            text: Exact text that is embedded
+        
+        Returns:
+            Hex digest identifying (model, text)
+        """
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+    
+    @property
+    def _log_path(self) -> Path:
+        return self.cache_path / f"index.{self._log_generation}.log"
+    
+    @property
+    def _record_size(self) -> int:
+        return DIGEST_SIZE + (self.dimension or 0) * 4
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the thread lock and the cross-process write lock of the cache directory."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _is_only_user(self) -> bool:
+        """Register as a user of the directory; True when no other cache has it open."""
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._users_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            only_user = True
+        except OSError:
+            only_user = False
+        fcntl.flock(self._users_file.fileno(), fcntl.LOCK_SH)
+        return only_user
+    
+    def _load_index(self):
+        """Load the on-disk index and map the vector data file (write lock held)."""
+        only_user = self._is_only_user()
+        try:
+            self._read_snapshot()
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache index, starting empty: {e}")
+            self._index = OrderedDict()
+            self._log_entries = 0
+            self._log_offset = 0
+        self._trim_index()
+        self._open_data_file()
+        
+        if only_user:
+            self._reclaim_slots()
+        if self._index:
+            logger.info(f"Loaded embedding cache with {len(self._index)} entries from {self.cache_path}")
+    
+    def _read_snapshot(self):
+        """Read the index snapshot and replay its log."""
+        self._index = OrderedDict()
+        self._log_entries = 0
+        self._log_offset = 0
+        if not self._index_path.exists():
+            self._snapshot_stamp = None
+            return
+        
+        stat = os.stat(self._index_path)
+        with open(self._index_path, 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+        self._snapshot_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        
+        if index_data.get("model") != self.model_name or index_data.get("format") != CACHE_FORMAT:
+            logger.warning(f"Embedding cache at {self.cache_path} has another model or layout, discarding it")
+            self._discard_files()
+            return
+        
+        self.dimension = index_data.get("dimension")
+        self._index = OrderedDict((key, slot) for key, slot in index_data.get("entries", []))
+        self._log_generation = index_data.get("log_generation", 0)
+        
+        # Logs of other generations were left by an interrupted snapshot rewrite
+        for log_path in self.cache_path.glob("index.*.log"):
+            if log_path != self._log_path:
+                log_path.unlink(missing_ok=True)
+        self._replay_log()
+    
+    def _discard_files(self):
+        """Remove an unusable index, its logs and the data file."""
+        for path in [self._index_path, self._data_path, *self.cache_path.glob("index.*.log")]:
+            path.unlink(missing_ok=True)
+        self._snapshot_stamp = None
+        self.dimension = None
+    
+    def _replay_log(self):
+        """Apply log entries appended since this cache last read the log."""
+        if not self._log_path.exists():
+            return
+        
+        slot_keys = {slot: key for key, slot in self._index.items()}
+        with open(self._log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        self._log_offset += len(data)
+        
+        for line in data.splitlines():
+            try:
+                key, slot = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; the entries around it are intact
+                continue
+            self._log_entries += 1
+            # A reused slot no longer holds the vector of its previous key
+            previous = slot_keys.get(slot)
+            if previous is not None and previous != key:
+                self._index.pop(previous, None)
+            self._index.pop(key, None)
+            self._index[key] = slot
+            slot_keys[slot] = key
+    
+    def _refresh(self):
+        """Pick up index entries flushed by other writers (write lock held)."""
+        stamp = None
+        if self._index_path.exists():
+            stat = os.stat(self._index_path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        
+        if stamp != self._snapshot_stamp:
+            # Another writer compacted the index; its snapshot includes the entries we flushed
+            self._read_snapshot()
+            for key, slot in self._pending:
+                self._index.pop(key, None)
+                self._index[key] = slot
+        else:
+            self._replay_log()
+        self._trim_index()
+    
+    def _trim_index(self):
+        """Drop least recently used entries beyond max_disk_entries."""
+        while len(self._index) > max(self.max_disk_entries, 0):
+            self._index.popitem(last=False)
+    
+    def _reclaim_slots(self):
+        """Truncate the data file after the last indexed slot and free the unindexed slots below it."""
+        if not self.dimension:
+            # Nothing was indexed, so nothing in the data file can be read back
+            if self._file is not None and os.path.getsize(self._data_path) > 0:
+                self._resize_data_file(0)
+            return
+        
+        if self._file is None:
+            # The index points into a data file that no longer exists
+            self._index.clear()
+            return
+        
+        used = set(self._index.values())
+        extent = max(used) + 1 if used else 0
+        if os.path.getsize(self._data_path) > extent * self._record_size:
+            self._resize_data_file(extent * self._record_size)
+        self._free_slots = sorted(set(range(extent)) - used, reverse=True)
+        if self._free_slots:
+            logger.info(f"Reclaimed {len(self._free_slots)} unindexed embedding cache slots")
+    
+    def _open_data_file(self):
+        """Open the vector file if it exists and map all of it."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is None:
+            if not self._data_path.exists():
+                return
+            self._file = open(self._data_path, 'r+b')
+        
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+    
+    def _create_data_file(self):
+        """Open the vector file for writing, creating it without truncating another writer's data."""
+        if self._file is None:
+            self._file = os.fdopen(os.open(self._data_path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+    
+    def _resize_data_file(self, size: int):
+        """Truncate or extend the vector file and remap it."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._create_data_file()
+        self._file.truncate(size)
+        self._open_data_file()
+    
+    def _allocate_slot(self) -> int:
+        """Take a free slot, growing the shared data file by a block of slots when none is left."""
+        if not self._free_slots:
+            # Other writers grow the same file, so its size is the allocation counter
+            self._create_data_file()
+            size = os.fstat(self._file.fileno()).st_size
+            start = -(-size // self._record_size)
+            self._resize_data_file((start + self.GROWTH_SLOTS) * self._record_size)
+            self._free_slots = list(range(start + self.GROWTH_SLOTS - 1, start - 1, -1))
+        return self._free_slots.pop()
+    
+    def _read_slot(self, key: str, slot: int) -> Optional[List[float]]:
+        """Read the vector of a slot, or None when the slot holds another key."""
+        offset = slot * self._record_size
+        if self._mmap is None or offset + self._record_size > len(self._mmap):
+            # Another writer grew the file after it was mapped
+            self._open_data_file()
+            if self._mmap is None or offset + self._record_size > len(self._mmap):
+                return None
+        
+        # The vector is read before the digest, which writers clear before changing the vector
+        vector = array('f')
+        vector.frombytes(self._mmap[offset + DIGEST_SIZE:offset + self._record_size])
+        if self._mmap[offset:offset + DIGEST_SIZE] != bytes.fromhex(key):
+            return None
+        return vector.tolist()
+    
+    def _write_slot(self, key: str, slot: int, vector: List[float]):
+        offset = slot * self._record_size
+        if self._mmap is None or offset + self._record_size > len(self._mmap):
+            self._open_data_file()
+        self._mmap[offset:offset + DIGEST_SIZE] = bytes(DIGEST_SIZE)
+        self._mmap[offset + DIGEST_SIZE:offset + self._record_size] = array('f', vector).tobytes()
+        self._mmap[offset:offset + DIGEST_SIZE] = bytes.fromhex(key)
+    
+    def _remember(self, key: str, vector: List[float]):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def get(self, text: str) -> Optional[List[float]]:
+        """
+        Look up the embedding of a text.
+        
+        Args:
+            text: Exact text that was embedded
+        
+        Returns:
+            Cached vector or None on a miss
+        """
+        key = self.make_key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            
+            slot = self._index.get(key)
+            if slot is not None:
+                vector = self._read_slot(key, slot)
+                if vector is not None:
+                    self._index.move_to_end(key)
+                    self._remember(key, vector)
+                    self.hits += 1
+                    return vector
+                # Overwritten by another writer since the index entry was read
+                del self._index[key]
+            
+            self.misses += 1
+            return None
+    
+    def put(self, text: str, vector: List[float]):
+        """
+        Store the embedding of a text in both tiers.
+        
+        Args:
+            text: Exact text that was embedded
+            vector: Embedding vector
+        """
+        key = self.make_key(text)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = len(vector)
+            elif len(vector) != self.dimension:
+                logger.warning(
+                    f"Not caching vector of size {len(vector)} (cache dimension is {self.dimension})"
+                )
+                return
+            
+            self._remember(key, vector)
+            
+            if self.max_disk_entries <= 0 or key in self._index:
+                return
+            
+            with self._locked():
+                if len(self._index) >= self.max_disk_entries:
+                    # Reuse the slot of the least recently used disk entry
+                    evicted, slot = self._index.popitem(last=False)
+                    self._pending = [entry for entry in self._pending if entry[0] != evicted]
+                else:
+                    slot = self._allocate_slot()
+                self._write_slot(key, slot, vector)
+            
+            self._index[key] = slot
+            self._pending.append((key, slot))
+    
+    def maybe_flush(self):
+        """Flush if enough entries are pending or the oldest pending one is old enough."""
+        with self._lock:
+            if not self._pending:
+                return
+            if (
+                len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+    
+    def flush(self):
+        """Persist the vectors and index entries written since the last flush."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            
+            with self._locked():
+                # Vectors reach the disk before the entries that point at them
+                if self._mmap is not None:
+                    self._mmap.flush()
+                
+                self._refresh()
+                if self._snapshot_stamp is None or self._log_entries + len(self._pending) >= max(
+                    self.MIN_COMPACT_ENTRIES, len(self._index)
+                ):
+                    self._write_snapshot()
+                else:
+                    self._append_log(self._pending)
+                self._pending = []
+    
+    def _append_log(self, entries: List[Tuple[str, int]]):
+        """Append (key, slot) entries to the log (write lock held, log fully read)."""
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        with open(self._log_path, 'a+b') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                # Never continue a line cut short by a crashed writer
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            self._log_offset = f.tell()
+        self._log_entries += len(entries)
+    
+    def _write_snapshot(self):
+        """Write the whole index and continue with an empty log of the next generation."""
+        old_log_path = self._log_path
+        index_data = {
+            "model": self.model_name,
+            "format": CACHE_FORMAT,
+            "dimension": self.dimension,
+            "log_generation": self._log_generation + 1,
+            "entries": list(self._index.items()),
+        }
+        tmp_path = self._index_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index_data, f)
+        os.replace(tmp_path, self._index_path)
+        
+        stat = os.stat(self._index_path)
+        self._snapshot_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._log_generation += 1
+        self._log_entries = 0
+        self._log_offset = 0
+        old_log_path.unlink(missing_ok=True)
+    
+    def close(self):
+        """Flush and release the memory map and the directory locks."""
+        with self._lock:
+            if self._lock_file is None:
+                return
+            self.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            # Closing the lock files releases the locks
+            self._users_file.close()
+            self._lock_file.close()
+            self._lock_file = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Hit/miss counters and tier sizes
+        """
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._index),
+            "pending_entries": len(self._pending),
+        }
+
+
+class CachedEmbeddings:
+    """
+    Embeddings wrapper that consults an EmbeddingCache before the provider.
+    """
+    
+    def __init__(self, embeddings: Any, cache: EmbeddingCache):
+        """
+        Initialize the cached embeddings wrapper.
+        
+        Args:
+            embeddings: Underlying LangChain-compatible embeddings provider
+            cache: Embedding cache to consult
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, calling the provider only for uncached texts.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors in input order
+        """
+        vectors: List[Optional[List[float]]] = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        if missing:
+            # Embed each distinct uncached text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            new_vectors = self.embeddings.embed_documents(unique_texts)
+            
+            computed = {}
+            for text, vector in zip(unique_texts, new_vectors):
+                self.cache.put(text, vector)
+                computed[text] = vector
+            for i in missing:
+                vectors[i] = computed[texts[i]]
+            
+            self.cache.maybe_flush()
+        
+        logger.debug(f"Embedded {len(texts)} documents ({len(texts) - len(missing)} from cache)")
+        return vectors
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, serving it from the cache when possible.
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Embedding vector
+        """
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+            self.cache.maybe_flush()
+        return vector
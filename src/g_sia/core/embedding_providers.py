@@ -0,0 +1,214 @@
+"""
+Embedding providers for policy vector stores.
+
+This module provides the OpenAI embedding provider and a local sentence-embedding
+provider that runs a transformers model on CPU with dynamic int8 quantization and
+length-bucketed batching, so ingestion and queries can run without network access.
+"""
+
+import re
+import math
+import zlib
+import logging
+from typing import List, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+DEFAULT_LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Output dimensions of the OpenAI embedding models
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+class LocalSentenceEmbeddings:
+    """
+    CPU sentence-embedding model with the LangChain embeddings interface.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = DEFAULT_LOCAL_EMBEDDING_MODEL,
+        quantization: Optional[str] = "int8",
+        batch_size: int = 32,
+        num_threads: Optional[int] = None,
+        max_length: int = 256,
+        normalize: bool = True
+    ):
+        """
+        Load the model.
+        
+        Args:
+            model_name: Hugging Face model name or local path
+            quantization: 'int8' for dynamic int8 quantization of linear layers, or None
+            batch_size: Number of texts per forward pass
+            num_threads: Number of CPU threads for inference (None keeps the torch default)
+            max_length: Maximum number of tokens per text
+            normalize: Whether to L2-normalize the embeddings
+        """
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+        
+        if quantization not in (None, "int8"):
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        
+        self.model_name = model_name
+        self.quantization = quantization
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.normalize = normalize
+        self._torch = torch
+        
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        if quantization == "int8":
+            # Linear layers dominate encoder inference on CPU
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.dimension = model.config.hidden_size
+        
+        logger.info(
+            f"Loaded local embedding model {model_name} "
+            f"(dimension {self.dimension}, quantization {quantization or 'none'}, "
+            f"{torch.get_num_threads()} threads)"
+        )
+    
+    @property
+    def cache_name(self) -> str:
+        """Identifier for embedding caches (quantized vectors differ slightly)."""
+        return f"local:{self.model_name}:{self.quantization or 'fp32'}"
+    
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch with attention-masked mean pooling."""
+        torch = self._torch
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        with torch.inference_mode():
+            hidden = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            if self.normalize:
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.tolist()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents in length-bucketed batches.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors in input order
+        """
+        # Batching texts of similar length keeps padding (wasted compute) small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode_batch([texts[i] for i in batch])):
+                vectors[i] = vector
+        return vectors
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Embedding vector
+        """
+        return self._encode_batch([text])[0]
+
+
+class HashingEmbeddings:
+    """
+    Deterministic bag-of-words feature-hashing embeddings.
+    
+    Needs no model or network, so benchmarks and tests can build and query an
+    index fully offline. Quality is lexical only.
+    """
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self, dimension: int = 384):
+        """
+        Initialize the hashing embeddings.
+        
+        Args:
+            dimension: Number of hash buckets (vector size)
+        """
+        self.dimension = dimension
+    
+    @property
+    def cache_name(self) -> str:
+        """Identifier for embedding caches."""
+        return f"hashing:{self.dimension}"
+    
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in self.TOKEN_PATTERN.findall(text.lower()):
+            digest = zlib.crc32(token.encode("utf-8"))
+            # The top bit picks the sign so colliding tokens tend to cancel out
+            vector[digest % self.dimension] += 1.0 if digest & 0x80000000 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents."""
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query."""
+        return self._embed(text)
+
+
+def create_embedding_provider(
+    provider: str = "openai",
+    model_name: Optional[str] = None,
+    **options: Any
+) -> Tuple[Any, str, Optional[int]]:
+    """
+    Create an embedding provider.
+    
+    Args:
+        provider: 'openai', 'local' or 'hashing' (offline stub for benchmarks and tests)
+        model_name: Model name (default depends on the provider; ignored for 'hashing')
+        **options: Provider-specific options (local: quantization, batch_size,
+            num_threads, max_length, normalize; hashing: dimension)
+    
+    Returns:
+        Tuple of (embeddings, cache name, vector dimension or None if unknown)
+    """
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        model_name = model_name or DEFAULT_OPENAI_EMBEDDING_MODEL
+        return (
+            OpenAIEmbeddings(model=model_name, **options),
+            model_name,
+            OPENAI_EMBEDDING_DIMENSIONS.get(model_name)
+        )
+    if provider == "local":
+        embeddings = LocalSentenceEmbeddings(model_name or DEFAULT_LOCAL_EMBEDDING_MODEL, **options)
+        return embeddings, embeddings.cache_name, embeddings.dimension
+    if provider == "hashing":
+        embeddings = HashingEmbeddings(**options)
+        return embeddings, embeddings.cache_name, embeddings.dimension
+    raise ValueError(f"Unknown embedding provider: {provider}")
@@ -0,0 +1,668 @@
+"""
+Local FAISS vector store for policy document retrieval.
+
+This module provides an in-process alternative to the Qdrant server store: vectors
+live in a memory-mapped FAISS index and payloads in a compact side file, so agents
+can answer retrieval queries without a network round trip or a running server.
+"""
+
+import os
+import json
+import uuid
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable, Set
+
+import faiss
+import numpy as np
+
+from .content_aware_chunker import ContentChunk
+from .vector_store_base import PolicyVectorStore, NeighbourRange
+from .diversification import mmr_select, section_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Payload fields for which id masks are precomputed at load time
+MASKED_FIELDS = ("document_type", "section_type")
+
+
+class FaissPolicyVectorStore(PolicyVectorStore):
+    """
+    In-process vector store for policy documents backed by a memory-mapped FAISS index.
+    """
+    
+    def __init__(
+        self,
+        collection_name: str = "policy_documents",
+        index_dir: str = "data/faiss_index",
+        embedding_model: Optional[str] = None,
+        vector_size: Optional[int] = None,
+        distance_metric: str = "cosine",
+        embedding_cache_dir: Optional[str] = ".cache/embeddings",
+        embedding_cache_memory_size: int = 10000,
+        embedding_cache_max_entries: int = 200000,
+        result_cache_size: int = 1024,
+        result_cache_ttl: float = 3600.0,
+        embedding_provider: str = "openai",
+        embedding_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize FAISS vector store.
+        
+        Args:
+            collection_name: Name of the collection (subdirectory of index_dir)
+            index_dir: Directory holding the index and payload files
+            embedding_model: Embedding model to use (default depends on the provider)
+            vector_size: Size of the embedding vectors (default: taken from the provider)
+            distance_metric: 'cosine', 'dot' or 'euclidean'
+            embedding_cache_dir: Directory for the persistent embedding cache (None disables it)
+            embedding_cache_memory_size: Number of vectors kept in the in-memory cache tier
+            embedding_cache_max_entries: Number of vectors kept in the on-disk cache tier
+            result_cache_size: Number of cached search result lists (0 disables the cache)
+            result_cache_ttl: Seconds a cached search result stays valid
+            embedding_provider: 'openai' or 'local' (CPU sentence-embedding model)
+            embedding_options: Provider options, e.g. quantization, batch_size, num_threads
+        """
+        self.collection_name = collection_name
+        self.distance_metric = distance_metric if distance_metric in ("cosine", "dot", "euclidean") else "cosine"
+        self.last_ingest_stats: Optional[Dict[str, Any]] = None
+        self._init_result_cache(result_cache_size, result_cache_ttl)
+        
+        self.collection_path = Path(index_dir) / collection_name
+        self._index_path = self.collection_path / "vectors.faiss"
+        self._payload_path = self.collection_path / "payloads.jsonl"
+        self._version_path = self.collection_path / "version"
+        
+        # Initialize embeddings
+        self._init_embeddings(
+            embedding_model,
+            embedding_cache_dir,
+            embedding_cache_memory_size,
+            embedding_cache_max_entries,
+            embedding_provider,
+            embedding_options,
+            vector_size
+        )
+        
+        self._lock = threading.RLock()
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._masks: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._sections: Dict[str, Dict[int, int]] = {}
+        self._index = None
+        self._mmapped = False
+        
+        self._load()
+        self._version_stamp = self._read_version_stamp()
+    
+    @staticmethod
+    def _to_faiss_id(point_id: str) -> int:
+        """Map a point UUID to a positive int64 FAISS id."""
+        return uuid.UUID(point_id).int >> 65
+    
+    def _new_index(self):
+        """Create an empty id-mapped flat index for the configured metric."""
+        if self.distance_metric == "euclidean":
+            base = faiss.IndexFlatL2(self.vector_size)
+        else:
+            base = faiss.IndexFlatIP(self.vector_size)
+        return faiss.IndexIDMap2(base)
+    
+    def _load(self):
+        """Load the index memory-mapped (read-only) together with its payloads."""
+        if not self._index_path.exists():
+            self._index = self._new_index()
+            return
+        
+        try:
+            # Newer FAISS releases can also map flat-code indexes; older ones only map IVF lists
+            mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+            self._index = faiss.read_index(str(self._index_path), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+            self._mmapped = True
+        except RuntimeError as e:
+            logger.warning(f"Could not memory-map FAISS index, loading into RAM: {e}")
+            self._index = faiss.read_index(str(self._index_path))
+            self._mmapped = False
+        self.vector_size = self._index.d
+        
+        self._payloads = {}
+        if self._payload_path.exists():
+            with open(self._payload_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._payloads[record["id"]] = record["payload"]
+        
+        self._rebuild_masks()
+        logger.info(f"Loaded FAISS collection '{self.collection_name}' with {self._index.ntotal} vectors")
+    
+    def _ensure_writable(self):
+        """Replace a read-only memory-mapped index by an in-RAM copy before mutation."""
+        if self._mmapped:
+            self._index = faiss.read_index(str(self._index_path))
+            self._mmapped = False
+    
+    def _save(self):
+        """Persist the index and payload side file."""
+        self.collection_path.mkdir(parents=True, exist_ok=True)
+        faiss.write_index(self._index, str(self._index_path))
+        with open(self._payload_path, 'w', encoding='utf-8') as f:
+            for faiss_id, payload in self._payloads.items():
+                f.write(json.dumps({"id": faiss_id, "payload": payload}, separators=(",", ":")))
+                f.write("\n")
+    
+    def _read_version_stamp(self) -> Optional[str]:
+        """Read the write stamp from the version side file."""
+        try:
+            return self._version_path.read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def _write_version_stamp(self, stamp: str):
+        """Replace the version side file atomically."""
+        self.collection_path.mkdir(parents=True, exist_ok=True)
+        temp_path = self._version_path.with_suffix(".tmp")
+        temp_path.write_text(stamp, encoding='utf-8')
+        os.replace(temp_path, self._version_path)
+    
+    def _on_external_write(self):
+        """Reload the index and payloads written by another process."""
+        with self._lock:
+            self._index = None
+            self._mmapped = False
+            self._payloads = {}
+            self._masks = {}
+            self._sections = {}
+            self._load()
+    
+    def _rebuild_masks(self):
+        """Precompute sorted id arrays for each value of the masked payload fields."""
+        grouped: Dict[Tuple[str, Any], List[int]] = {}
+        for faiss_id, payload in self._payloads.items():
+            for field in MASKED_FIELDS:
+                if field in payload:
+                    grouped.setdefault((field, payload[field]), []).append(faiss_id)
+        self._masks = {key: np.array(sorted(ids), dtype=np.int64) for key, ids in grouped.items()}
+        
+        # Section key -> {chunk index: id}, for neighbour expansion
+        self._sections = {}
+        for faiss_id, payload in self._payloads.items():
+            if "chunk_index" in payload:
+                self._sections.setdefault(section_key(payload), {})[int(payload["chunk_index"])] = faiss_id
+    
+    def _fetch_section_chunks(self, ranges: List[NeighbourRange]) -> Dict[str, Dict[int, str]]:
+        """
+        Look up neighbour chunks in the in-memory section table.
+        
+        Args:
+            ranges: Neighbour lookups
+        
+        Returns:
+            Mapping of section key to {chunk index: content}
+        """
+        section_chunks: Dict[str, Dict[int, str]] = {}
+        with self._lock:
+            for metadata, start, end in ranges:
+                key = section_key(metadata)
+                for chunk_index, faiss_id in self._sections.get(key, {}).items():
+                    if start <= chunk_index <= end:
+                        section_chunks.setdefault(key, {})[chunk_index] = self._payloads[faiss_id].get("content", "")
+        return section_chunks
+    
+    def get_section_hashes(self, document_types: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Read the section hash of every indexed section from the payload table.
+        
+        Args:
+            document_types: Document types to scan (None: all)
+        
+        Returns:
+            Mapping of section key ('gdpr:article:6') to section hash
+            ('' for points indexed before section hashes were stored)
+        """
+        document_types = set(document_types) if document_types is not None else None
+        with self._lock:
+            return self._section_hashes_from_payloads(
+                payload for payload in self._payloads.values()
+                if document_types is None or payload.get("document_type") in document_types
+            )
+    
+    def _delete_section_points(self, section_keys: Iterable[str], keep_ids: Iterable[str]) -> int:
+        """
+        Delete the points of the given sections, except the kept ones.
+        
+        Args:
+            section_keys: Section keys of the sections to clean up
+            keep_ids: Point ids that were just written and stay
+        
+        Returns:
+            Number of deleted points
+        """
+        with self._lock:
+            kept = {self._to_faiss_id(point_id) for point_id in keep_ids}
+            stale_ids = [
+                faiss_id
+                for key in set(section_keys)
+                for faiss_id in self._sections.get(key, {}).values()
+                if faiss_id not in kept
+            ]
+            if stale_ids:
+                self._ensure_writable()
+                self._index.remove_ids(np.array(stale_ids, dtype=np.int64))
+                for faiss_id in stale_ids:
+                    self._payloads.pop(faiss_id, None)
+                self._rebuild_masks()
+                self._save()
+        return len(stale_ids)
+    
+    def get_alias_sections(self, section_keys: Iterable[str]) -> Set[str]:
+        """
+        Find the sections folded into the chunks of the given sections as near-duplicates.
+        
+        Args:
+            section_keys: Keys of the canonical sections
+        
+        Returns:
+            Section keys recorded in the aliases of their points
+        """
+        with self._lock:
+            return {
+                alias["section_key"]
+                for key in set(section_keys)
+                for faiss_id in self._sections.get(key, {}).values()
+                for alias in self._payloads.get(faiss_id, {}).get("aliases") or ()
+            }
+    
+    def _ids_for(self, field: str, value: Any) -> np.ndarray:
+        """Get the ids whose payload field equals value."""
+        key = (field, value)
+        if key not in self._masks:
+            # Fields without a precomputed mask are scanned once and memoized
+            ids = [faiss_id for faiss_id, payload in self._payloads.items() if payload.get(field) == value]
+            self._masks[key] = np.array(sorted(ids), dtype=np.int64)
+        return self._masks[key]
+    
+    def _build_selector(self, filter_conditions: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Translate filter conditions into the array of allowed ids.
+        
+        Mirrors the Qdrant store: a single condition must match, several
+        conditions (including list values) are OR-ed together.
+        
+        Args:
+            filter_conditions: Mapping of payload field to a value or list of values
+        
+        Returns:
+            Allowed ids, or None when unfiltered
+        """
+        if not filter_conditions:
+            return None
+        
+        masks = []
+        for field, value in filter_conditions.items():
+            values = value if isinstance(value, list) else [value]
+            masks.extend(self._ids_for(field, v) for v in values)
+        
+        if not masks:
+            return None
+        return np.unique(np.concatenate(masks))
+    
+    def _prepare_vectors(self, vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if self.distance_metric == "cosine":
+            faiss.normalize_L2(matrix)
+        return matrix
+    
+    def _passes_threshold(self, score: float, score_threshold: Optional[float]) -> bool:
+        if score_threshold is None:
+            return True
+        if self.distance_metric == "euclidean":
+            return score <= score_threshold
+        return score >= score_threshold
+    
+    def _search_vector(
+        self,
+        vector: np.ndarray,
+        limit: int,
+        score_threshold: Optional[float],
+        filter_conditions: Optional[Dict[str, Any]],
+        include_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        """Search the index with one prepared query vector."""
+        with self._lock:
+            if self._index.ntotal == 0:
+                return []
+            
+            allowed_ids = self._build_selector(filter_conditions)
+            params = None
+            if allowed_ids is not None:
+                if len(allowed_ids) == 0:
+                    return []
+                params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(allowed_ids))
+            
+            k = min(limit, self._index.ntotal)
+            scores, ids = self._index.search(vector.reshape(1, -1), k, params=params)
+            
+            results = []
+            for score, faiss_id in zip(scores[0], ids[0]):
+                if faiss_id < 0 or not self._passes_threshold(float(score), score_threshold):
+                    continue
+                payload = self._payloads.get(int(faiss_id), {})
+                result_dict = {
+                    "id": str(int(faiss_id)),
+                    "score": float(score),
+                    # Mirrors the Qdrant store, which omits the payload when metadata is not requested
+                    "content": payload.get("content", "") if include_metadata else "",
+                }
+                if include_metadata and payload:
+                    result_dict["metadata"] = {
+                        key: value for key, value in payload.items()
+                        if key != "content"
+                    }
+                results.append(result_dict)
+            return results
+    
+    def add_chunks(
+        self,
+        chunks: List[ContentChunk],
+        batch_size: int = 100,
+        incremental: bool = False
+    ) -> bool:
+        """
+        Add chunks to the local index.
+        
+        Args:
+            chunks: List of content chunks to add
+            batch_size: Number of chunks to embed per provider call
+            incremental: Only embed new or changed chunks, and delete points of
+                the same document types that no longer exist
+        
+        Returns:
+            Success status
+        """
+        try:
+            logger.info(f"Adding {len(chunks)} chunks to FAISS collection '{self.collection_name}'")
+            prepared = self._prepare_points(chunks)
+            
+            with self._lock:
+                pending = list(prepared.items())
+                stale_ids = []
+                if incremental:
+                    # Points without a document type are never treated as stale
+                    document_types = {payload.get("document_type", "") for _, payload in prepared.values()} - {""}
+                    prepared_ids = {self._to_faiss_id(point_id) for point_id in prepared}
+                    pending = [
+                        (point_id, item) for point_id, item in pending
+                        if self._payloads.get(self._to_faiss_id(point_id), {}).get("content_hash") != item[1]["content_hash"]
+                    ]
+                    stale_ids = [
+                        faiss_id for faiss_id, payload in self._payloads.items()
+                        if payload.get("document_type", "") in document_types and faiss_id not in prepared_ids
+                    ]
+                    logger.info(
+                        f"Incremental update: {len(pending)} new or changed, "
+                        f"{len(prepared) - len(pending)} unchanged, {len(stale_ids)} stale"
+                    )
+                
+                if not pending and not stale_ids:
+                    return True
+                
+                self._ensure_writable()
+                
+                for i in range(0, len(pending), batch_size):
+                    batch = pending[i:i + batch_size]
+                    vectors = self.embeddings.embed_documents([text for _, (text, _) in batch])
+                    
+                    if self._index.ntotal == 0 and vectors and len(vectors[0]) != self.vector_size:
+                        self.vector_size = len(vectors[0])
+                        self._index = self._new_index()
+                    
+                    faiss_ids = np.array([self._to_faiss_id(point_id) for point_id, _ in batch], dtype=np.int64)
+                    # Upsert semantics: replace existing vectors with the same id
+                    self._index.remove_ids(faiss_ids)
+                    self._index.add_with_ids(self._prepare_vectors(vectors), faiss_ids)
+                    for faiss_id, (_, (_, payload)) in zip(faiss_ids.tolist(), batch):
+                        self._payloads[faiss_id] = payload
+                
+                if stale_ids:
+                    self._index.remove_ids(np.array(stale_ids, dtype=np.int64))
+                    for faiss_id in stale_ids:
+                        self._payloads.pop(faiss_id, None)
+                
+                self._rebuild_masks()
+                self._save()
+            
+            logger.info(f"Successfully added {len(pending)} chunks to FAISS collection")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error adding chunks to FAISS store: {e}")
+            return False
+        finally:
+            self._bump_collection_version()
+    
+    def search_similar(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for similar chunks based on query.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score (maximum distance for 'euclidean')
+            filter_conditions: Optional metadata filters
+            include_metadata: Whether to include chunk metadata
+        
+        Returns:
+            List of search results with scores and metadata
+        """
+        cache_key = self._result_cache_key(
+            query, limit, score_threshold, filter_conditions, include_metadata=include_metadata
+        )
+        cached = self._get_cached_results(cache_key)
+        if cached is not None:
+            logger.debug(f"Served {len(cached)} similar chunks from the result cache")
+            return cached
+        
+        try:
+            query_vector = self._prepare_vectors([self.embeddings.embed_query(query)])[0]
+            results = self._search_vector(query_vector, limit, score_threshold, filter_conditions, include_metadata)
+            logger.debug(f"Found {len(results)} similar chunks for query")
+            self._cache_results(cache_key, results)
+            return results
+        except Exception as e:
+            logger.error(f"Error searching similar chunks: {e}")
+            return []
+    
+    def search_diverse(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        fetch_k: int = 40,
+        lambda_mult: float = 0.5,
+        max_per_section: Optional[int] = 2
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with maximal marginal relevance over the top candidates.
+        
+        Candidate vectors are reconstructed from the local index.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score (maximum distance for 'euclidean')
+            filter_conditions: Optional metadata filters
+            include_metadata: Whether to include chunk metadata
+            fetch_k: Number of candidates considered for selection
+            lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+            max_per_section: Maximum number of chunks per section (None for no cap)
+        
+        Returns:
+            Selected search results, in selection order
+        """
+        cache_key = self._result_cache_key(
+            query, limit, score_threshold, filter_conditions,
+            include_metadata=include_metadata, mmr=[fetch_k, lambda_mult, max_per_section]
+        )
+        cached = self._get_cached_results(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            query_vector = self._prepare_vectors([self.embeddings.embed_query(query)])[0]
+            candidates = self._search_vector(
+                query_vector, max(fetch_k, limit), score_threshold, filter_conditions, include_metadata=True
+            )
+            if not candidates:
+                return []
+            
+            with self._lock:
+                vectors = np.vstack([self._index.reconstruct(int(candidate["id"])) for candidate in candidates])
+            selected = mmr_select(
+                query_vector,
+                vectors,
+                k=limit,
+                lambda_mult=lambda_mult,
+                groups=[section_key(candidate.get("metadata", {})) for candidate in candidates],
+                max_per_group=max_per_section
+            )
+            
+            results = []
+            for i in selected:
+                result_dict = candidates[i]
+                if not include_metadata:
+                    result_dict = {"id": result_dict["id"], "score": result_dict["score"], "content": ""}
+                results.append(result_dict)
+            
+            self._cache_results(cache_key, results)
+            return results
+        except Exception as e:
+            logger.error(f"Error in diverse search: {e}")
+            return []
+    
+    def search_many(
+        self,
+        queries: List[Union[str, Dict[str, Any]]],
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one embedding call.
+        
+        Args:
+            queries: Query strings or dictionaries with per-query overrides
+            limit: Default maximum number of results per query
+            score_threshold: Default minimum similarity score
+            filter_conditions: Default metadata filters
+            include_metadata: Whether to include chunk metadata
+        
+        Returns:
+            One list of search results per query, in input order
+        """
+        if not queries:
+            return []
+        
+        try:
+            specs = [spec if isinstance(spec, dict) else {"query": spec} for spec in queries]
+            query_vectors = self._prepare_vectors(
+                self.embeddings.embed_documents([spec["query"] for spec in specs])
+            )
+            return [
+                self._search_vector(
+                    query_vector,
+                    spec.get("limit", limit),
+                    spec.get("score_threshold", score_threshold),
+                    spec.get("filter_conditions", filter_conditions),
+                    include_metadata
+                )
+                for spec, query_vector in zip(specs, query_vectors)
+            ]
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            return [[] for _ in queries]
+    
+    def get_collection_info(self) -> Dict[str, Any]:
+        """
+        Get information about the collection.
+        
+        Returns:
+            Collection information dictionary
+        """
+        count = self._index.ntotal if self._index is not None else 0
+        collection_info = {
+            "name": self.collection_name,
+            "status": "green",
+            "vectors_count": count,
+            "indexed_vectors_count": count,
+            "points_count": count,
+            "segments_count": 1,
+            "backend": "faiss",
+            "memory_mapped": self._mmapped,
+        }
+        if self.embedding_cache is not None:
+            collection_info["embedding_cache"] = self.embedding_cache.get_stats()
+        if self.result_cache is not None:
+            collection_info["result_cache"] = {
+                **self.result_cache.get_stats(),
+                "collection_version": self.collection_version,
+            }
+        return collection_info
+    
+    def clear_collection(self) -> bool:
+        """
+        Clear all points from the collection.
+        
+        Returns:
+            Success status
+        """
+        try:
+            with self._lock:
+                self._index = self._new_index()
+                self._mmapped = False
+                self._payloads = {}
+                self._masks = {}
+                self._sections = {}
+                self._save()
+            self._bump_collection_version()
+            logger.info(f"Cleared FAISS collection '{self.collection_name}'")
+            return True
+        except Exception as e:
+            logger.error(f"Error clearing collection: {e}")
+            return False
+    
+    def delete_collection(self) -> bool:
+        """
+        Delete the entire collection from disk.
+        
+        Returns:
+            Success status
+        """
+        try:
+            with self._lock:
+                self._index = self._new_index()
+                self._mmapped = False
+                self._payloads = {}
+                self._masks = {}
+                self._sections = {}
+                if self.collection_path.exists():
+                    shutil.rmtree(self.collection_path)
+            self._bump_collection_version()
+            logger.info(f"Deleted FAISS collection '{self.collection_name}'")
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting collection: {e}")
+            return False
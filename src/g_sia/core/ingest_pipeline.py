@@ -0,0 +1,217 @@
+"""
+Pipelined embed-and-upsert ingestion for the policy vector store.
+
+This module overlaps embedding requests and vector store uploads so that
+ingest time is bounded by the slower of the two stages rather than their sum.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Callable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (point_id, text to embed, payload)
+IngestItem = Tuple[str, str, Dict[str, Any]]
+# (point_id, vector, payload)
+IngestRecord = Tuple[str, List[float], Dict[str, Any]]
+
+
+@dataclass
+class ProgressEvent:
+    """Progress of one ingestion stage."""
+    stage: str  # 'parse', 'chunk', 'embed' or 'upload'
+    count: int  # Items the stage has completed so far (sections or chunks)
+    elapsed_seconds: float
+    detail: str = ""
+
+
+# Receives progress events; may be called from pipeline worker threads
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def batched(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most batch_size items.
+    
+    Args:
+        items: Items to group (consumed lazily)
+        batch_size: Maximum batch length
+    
+    Yields:
+        Batches in input order
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclass
+class IngestStats:
+    """Throughput statistics of one ingestion run."""
+    chunks: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0
+    upload_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["chunks_per_second"] = self.chunks_per_second
+        return stats
+
+
+class EmbedUpsertPipeline:
+    """
+    Two-stage ingestion pipeline: concurrent embedding feeding parallel uploaders.
+    """
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        upsert_fn: Callable[[List[IngestRecord]], Any],
+        embedding_concurrency: int = 4,
+        upload_workers: int = 2,
+        max_pending_batches: int = 8,
+        progress: Optional[ProgressCallback] = None
+    ):
+        """
+        Initialize the ingestion pipeline.
+        
+        Args:
+            embed_fn: Function embedding a list of texts
+            upsert_fn: Function uploading a batch of (id, vector, payload) records
+            embedding_concurrency: Maximum number of embedding requests in flight
+            upload_workers: Number of parallel upload workers
+            max_pending_batches: Embedded batches that may wait for upload before
+                embedding is paused (backpressure)
+            progress: Optional callback receiving 'embed' and 'upload' events
+        """
+        self.embed_fn = embed_fn
+        self.upsert_fn = upsert_fn
+        self.embedding_concurrency = max(1, embedding_concurrency)
+        self.upload_workers = max(1, upload_workers)
+        self.max_pending_batches = max(1, max_pending_batches)
+        self.progress = progress
+    
+    def run(self, batches: Iterable[List[IngestItem]]) -> IngestStats:
+        """
+        Embed and upload all batches.
+        
+        Batches are pulled lazily, so a generator source is only read as fast
+        as the pipeline can absorb it.
+        
+        Args:
+            batches: Iterable of batches of (point_id, text, payload) items
+        
+        Returns:
+            Ingestion statistics
+        
+        Raises:
+            Exception: The first error raised by either stage
+        """
+        stats = IngestStats()
+        stats_lock = threading.Lock()
+        embedded = 0
+        errors: List[BaseException] = []
+        upload_queue: "queue.Queue" = queue.Queue(maxsize=self.max_pending_batches)
+        in_flight = threading.BoundedSemaphore(self.embedding_concurrency)
+        start = time.perf_counter()
+        
+        def upload_worker():
+            while True:
+                records = upload_queue.get()
+                try:
+                    if records is None:
+                        return
+                    if errors:
+                        continue  # Drain the queue after a failure
+                    upload_start = time.perf_counter()
+                    self.upsert_fn(records)
+                    with stats_lock:
+                        stats.upload_seconds += time.perf_counter() - upload_start
+                        stats.chunks += len(records)
+                        stats.batches += 1
+                        uploaded = stats.chunks
+                        logger.debug(f"Uploaded batch {stats.batches} ({stats.chunks} chunks so far)")
+                    if self.progress is not None:
+                        self.progress(ProgressEvent("upload", uploaded, time.perf_counter() - start))
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    upload_queue.task_done()
+        
+        def embed_batch(batch: List[IngestItem]):
+            nonlocal embedded
+            try:
+                if errors:
+                    return
+                embed_start = time.perf_counter()
+                vectors = self.embed_fn([text for _, text, _ in batch])
+                with stats_lock:
+                    stats.embed_seconds += time.perf_counter() - embed_start
+                    embedded += len(batch)
+                    embedded_so_far = embedded
+                if self.progress is not None:
+                    self.progress(ProgressEvent("embed", embedded_so_far, time.perf_counter() - start))
+                records = [
+                    (point_id, vector, payload)
+                    for (point_id, _, payload), vector in zip(batch, vectors)
+                ]
+                # Blocks while uploads lag behind, pausing further embedding
+                upload_queue.put(records)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                in_flight.release()
+        
+        uploaders = [
+            threading.Thread(target=upload_worker, name=f"ingest-upload-{i}", daemon=True)
+            for i in range(self.upload_workers)
+        ]
+        for thread in uploaders:
+            thread.start()
+        
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.embedding_concurrency,
+                thread_name_prefix="ingest-embed"
+            ) as executor:
+                for batch in batches:
+                    if errors:
+                        break
+                    if not batch:
+                        continue
+                    in_flight.acquire()
+                    executor.submit(embed_batch, batch)
+        finally:
+            for _ in uploaders:
+                upload_queue.put(None)
+            for thread in uploaders:
+                thread.join()
+        
+        stats.elapsed_seconds = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        
+        logger.info(
+            f"Ingested {stats.chunks} chunks in {stats.elapsed_seconds:.2f}s "
+            f"({stats.chunks_per_second:.1f} chunks/s; embed {stats.embed_seconds:.2f}s, "
+            f"upload {stats.upload_seconds:.2f}s)"
+        )
+        return stats
@@ -0,0 +1,165 @@
+"""
+Rule-based sentence segmenter for legal text.
+
+This module provides a pure-Python alternative to spaCy sentence segmentation,
+built from precompiled regular expressions and an exception list tuned for
+GDPR, HIPAA and CCPA text, so citations such as "Art. 6(1)(a)", "§ 164.512(b)",
+"U.S.C." or "e.g." do not end a sentence.
+"""
+
+import re
+import logging
+from typing import List, Tuple, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (start, end) character offsets of a sentence
+SentenceSpan = Tuple[int, int]
+
+# Lower-cased tokens (without their final period) after which a period never ends a sentence
+LEGAL_ABBREVIATIONS = frozenset("""
+e.g i.e cf viz al seq et approx
+art arts no nos para paras p pp sec secs ch subch pt pts subpt cl
+reg regs dir rec o.j oj
+u.s u.s.c c.f.r fed pub stat l cal civ gov bus prof code ann rev supp
+dr mr mrs ms inc ltd co corp assn dept
+jan feb mar apr jun jul aug sep sept oct nov dec
+""".split())
+
+# Paragraph breaks and line-leading list items always start a new sentence
+PARAGRAPH_PATTERN = re.compile(
+    r'\n[ \t]*\n\s*'
+    r'|\n(?=[ \t]*(?:[-*•][ \t]|\([0-9a-zA-Z]{1,4}\)[ \t]|\d{1,3}\.[ \t]|§))'
+)
+# Sentence-final punctuation, optional closing quotes/brackets, whitespace, then a
+# sentence-initial character (capital, digit, opening bracket or quote, section sign)
+BOUNDARY_PATTERN = re.compile(r'[.!?]+["\'”’)\]]*(?=\s+["\'“‘(\[]?[A-Z0-9§])')
+# Last whitespace-delimited token before a position
+TOKEN_BEFORE_PATTERN = re.compile(r'\S+$')
+# Enumerators such as "1", "iv", "a" or "(b)"
+ENUMERATOR_PATTERN = re.compile(r'\(?(?:\d{1,3}|[ivxlcdm]{1,6}|[a-z])\)?$', re.IGNORECASE)
+
+
+class LegalSentenceSegmenter:
+    """
+    Regex sentence segmenter with legal abbreviation and citation exceptions.
+    """
+    
+    def __init__(self, extra_abbreviations: Iterable[str] = ()):
+        """
+        Initialize the segmenter.
+        
+        Args:
+            extra_abbreviations: Additional abbreviations (without final period)
+        """
+        self.abbreviations = LEGAL_ABBREVIATIONS | {abbreviation.lower().rstrip(".") for abbreviation in extra_abbreviations}
+    
+    def _is_boundary(self, text: str, paragraph_start: int, punctuation_start: int) -> bool:
+        """Decide whether the punctuation at the given position ends a sentence."""
+        if text[punctuation_start] != ".":
+            return True
+        
+        match = TOKEN_BEFORE_PATTERN.search(text, max(paragraph_start, punctuation_start - 40), punctuation_start)
+        if match is None:
+            return True
+        token = match.group(0).lstrip("([\"'“‘")
+        lowered = token.lower()
+        
+        if lowered in self.abbreviations:
+            return False
+        # Single-letter initials, e.g. "J. Smith"
+        if len(token) == 1 and token.isalpha():
+            return False
+        # Dotted abbreviations, e.g. "U.S.C" of "U.S.C."
+        if "." in token and all(len(part) <= 2 for part in token.split(".")):
+            return False
+        # Enumerators at the start of a line, e.g. "1. The controller ..."
+        line_start = text.rfind("\n", paragraph_start, match.start()) + 1
+        if not text[max(line_start, paragraph_start):match.start()].strip() and ENUMERATOR_PATTERN.match(token):
+            return False
+        return True
+    
+    def sentence_spans(self, text: str) -> List[SentenceSpan]:
+        """
+        Split a text into sentence offsets.
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            (start, end) offsets of each sentence, without surrounding whitespace
+        """
+        spans = []
+        
+        breaks = list(PARAGRAPH_PATTERN.finditer(text))
+        paragraph_starts = [0] + [match.end() for match in breaks]
+        paragraph_ends = [match.start() for match in breaks] + [len(text)]
+        
+        for paragraph_start, paragraph_end in zip(paragraph_starts, paragraph_ends):
+            start = paragraph_start
+            for match in BOUNDARY_PATTERN.finditer(text, paragraph_start, paragraph_end):
+                if self._is_boundary(text, paragraph_start, match.start()):
+                    spans.append((start, match.end()))
+                    start = match.end()
+            spans.append((start, paragraph_end))
+        
+        # Trim whitespace and drop empty spans
+        trimmed = []
+        for start, end in spans:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                trimmed.append((start, end))
+        return trimmed
+    
+    def split_sentences(self, text: str) -> List[str]:
+        """
+        Split one text into sentences.
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            List of sentences
+        """
+        return [text[start:end] for start, end in self.sentence_spans(text)]
+    
+    def split_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """
+        Split many texts into sentences.
+        
+        Args:
+            texts: Texts to split
+        
+        Returns:
+            Sentences of each text, in input order
+        """
+        return [self.split_sentences(text) for text in texts]
+    
+    def sentence_spans_many(self, texts: Iterable[str]) -> List[List[SentenceSpan]]:
+        """
+        Segment many texts into sentence offsets.
+        
+        Args:
+            texts: Texts to segment
+        
+        Returns:
+            Sentence offsets of each text, in input order
+        """
+        return [self.sentence_spans(text) for text in texts]
+    
+    def count_sentences_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        Count the sentences of many texts.
+        
+        Args:
+            texts: Texts to segment
+        
+        Returns:
+            Sentence count of each text, in input order
+        """
+        return [len(self.sentence_spans(text)) for text in texts]
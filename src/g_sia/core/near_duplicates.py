@@ -0,0 +1,214 @@
+"""
+Near-duplicate chunk elimination with MinHash and locality-sensitive hashing.
+
+Policy text repeats itself: recitals restate articles, HIPAA repeats boilerplate
+across sections and corpus copies overlap. Each chunk is reduced to the set of
+its word shingles and a MinHash signature of that set; signatures are split
+into bands, and chunks sharing any band bucket become candidate pairs, so only
+a handful of comparisons are made per chunk instead of one per indexed chunk.
+A candidate whose estimated Jaccard similarity with an earlier canonical chunk
+reaches the threshold is dropped and recorded as an alias on that canonical
+chunk, which is the one that gets embedded and stored.
+
+Chunks are only compared within their document type, so searches filtered by
+regulation still find every provision.
+"""
+
+import re
+import zlib
+import logging
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Sequence
+
+import numpy as np
+
+from .content_aware_chunker import ContentChunk
+from .vector_store_base import section_fingerprint
+from .diversification import section_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; with a, b < 2^31
+# the products stay below 2^64 and fit unsigned 64-bit arithmetic
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class NearDuplicateFilter:
+    """
+    Drops chunks that are near-duplicates of earlier ones and records them as aliases.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        secondary_section_types: Sequence[str] = ("recital",),
+        seed: int = 1
+    ):
+        """
+        Initialize the filter.
+        
+        Args:
+            threshold: Minimum estimated Jaccard similarity of shingle sets for a duplicate
+            num_perm: Number of MinHash permutations (signature length)
+            bands: Number of LSH bands; num_perm must be a multiple of it. More bands
+                find more candidates below the threshold, fewer bands miss more near it
+            shingle_size: Words per shingle
+            secondary_section_types: Section types that never become canonical
+                while a duplicate from another section type exists (recitals
+                restate the articles that are the binding text)
+            seed: Seed of the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.secondary_section_types = set(secondary_section_types)
+        
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = generator.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        
+        self.last_stats: Optional[Dict[str, Any]] = None
+    
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Settings that change which chunks are kept, for build manifests."""
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "secondary_section_types": sorted(self.secondary_section_types),
+        }
+    
+    def shingles(self, text: str) -> np.ndarray:
+        """
+        Hash the word shingles of a text.
+        
+        Args:
+            text: Chunk text
+        
+        Returns:
+            Unique 32-bit shingle hashes
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            grams = [" ".join(words)]
+        else:
+            grams = [" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+        return np.unique(np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams)
+        ))
+    
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text's shingle set.
+        
+        Args:
+            text: Chunk text
+        
+        Returns:
+            num_perm minimum hash values
+        """
+        hashes = self.shingles(text)
+        # One row per permutation, one column per shingle
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+    
+    @staticmethod
+    def alias_of(chunk: ContentChunk, similarity: float) -> Dict[str, Any]:
+        """Payload entry describing a dropped duplicate chunk."""
+        section = chunk.source_section
+        return {
+            "chunk_id": chunk.chunk_id,
+            "section_key": section_key(chunk.metadata),
+            "section_type": section.section_type,
+            "section_id": section.section_id,
+            "section_title": section.title or "",
+            # Lets section-level reindexing treat the aliased section as indexed
+            "section_hash": section_fingerprint(section),
+            "similarity": round(similarity, 3),
+        }
+    
+    def filter(self, chunks: List[ContentChunk]) -> List[ContentChunk]:
+        """
+        Keep one canonical chunk per group of near-duplicates.
+        
+        Chunks are visited in input order, except that chunks of secondary
+        section types are visited last; a chunk becomes an alias of the most
+        similar canonical chunk found through the LSH buckets, or a canonical
+        chunk itself.
+        
+        Args:
+            chunks: Chunks about to be indexed
+        
+        Returns:
+            Canonical chunks, in input order, with the dropped duplicates listed
+            in their aliases
+        """
+        order = sorted(
+            range(len(chunks)),
+            key=lambda i: (chunks[i].source_section.section_type in self.secondary_section_types, i)
+        )
+        
+        # (document type, band, band hash) -> positions of canonical chunks
+        buckets: Dict[Tuple[str, int, bytes], List[int]] = defaultdict(list)
+        signatures: Dict[int, np.ndarray] = {}
+        canonical_of: Dict[int, int] = {}
+        comparisons = 0
+        
+        for i in order:
+            chunk = chunks[i]
+            # Aliases from an earlier run over the same chunks are replaced
+            chunk.aliases = None
+            signature = self.signature(chunk.content)
+            document_type = chunk.source_section.metadata.get("document_type", "")
+            keys = [(document_type, band, key) for band, key in enumerate(self._band_keys(signature))]
+            
+            candidates = {j for key in keys for j in buckets.get(key, ())}
+            best, best_similarity = None, 0.0
+            for j in candidates:
+                similarity = float(np.mean(signatures[j] == signature))
+                if similarity > best_similarity:
+                    best, best_similarity = j, similarity
+            comparisons += len(candidates)
+            
+            if best is not None and best_similarity >= self.threshold:
+                canonical_of[i] = best
+                canonical = chunks[best]
+                # A second copy of the same document maps to the same point and needs no alias
+                if chunk.chunk_id != canonical.chunk_id:
+                    canonical.aliases = (canonical.aliases or []) + [self.alias_of(chunk, best_similarity)]
+                continue
+            
+            signatures[i] = signature
+            for key in keys:
+                buckets[key].append(i)
+        
+        kept = [chunk for i, chunk in enumerate(chunks) if i not in canonical_of]
+        self.last_stats = {
+            "chunks_in": len(chunks),
+            "chunks_kept": len(kept),
+            "duplicates_removed": len(canonical_of),
+            "canonical_with_aliases": sum(1 for chunk in kept if chunk.aliases),
+            "comparisons": comparisons,
+        }
+        if canonical_of:
+            logger.info(
+                f"Near-duplicate filter: {len(canonical_of)} of {len(chunks)} chunks aliased "
+                f"to {self.last_stats['canonical_with_aliases']} canonical chunks"
+            )
+        return kept
@@ -0,0 +1,162 @@
+"""
+Shared spaCy sentence segmentation service.
+
+This module provides one process-wide, lazily loaded spaCy pipeline used by the
+document parser and the chunker. Only the components needed for sentence
+boundaries are loaded, and many texts are segmented per call through nlp.pipe.
+"""
+
+import logging
+import threading
+from typing import List, Tuple, Any, Optional, Iterable
+
+import spacy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Components of the trained pipelines that sentence segmentation does not need;
+# the statistical 'senter' replaces the dependency parser for sentence boundaries
+EXCLUDED_COMPONENTS = ["parser", "tagger", "ner", "lemmatizer", "attribute_ruler"]
+
+
+class SentenceNLPService:
+    """
+    Lazily loaded spaCy pipeline for batched sentence segmentation.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        batch_size: int = 64,
+        n_process: int = 1
+    ):
+        """
+        Initialize the service (the model is loaded on first use).
+        
+        Args:
+            model_name: spaCy pipeline to load
+            batch_size: Number of texts per nlp.pipe batch
+            n_process: Number of worker processes for nlp.pipe
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self._nlp = None
+        self._lock = threading.Lock()
+    
+    @property
+    def nlp(self):
+        """The loaded spaCy pipeline."""
+        if self._nlp is None:
+            with self._lock:
+                if self._nlp is None:
+                    self._nlp = self._load()
+        return self._nlp
+    
+    def _load(self):
+        """Load the pipeline with only the sentence segmentation components."""
+        try:
+            nlp = spacy.load(self.model_name, exclude=EXCLUDED_COMPONENTS)
+            if "senter" in nlp.disabled:
+                nlp.enable_pipe("senter")
+            elif "senter" not in nlp.pipe_names:
+                nlp.add_pipe("sentencizer")
+            logger.info(f"Loaded {self.model_name} for sentence segmentation ({', '.join(nlp.pipe_names)})")
+        except OSError:
+            logger.warning(f"{self.model_name} not found, using basic sentencizer")
+            from spacy.lang.en import English
+            nlp = English()
+            nlp.add_pipe("sentencizer")
+        return nlp
+    
+    def split_sentences(self, text: str) -> List[str]:
+        """
+        Split one text into sentences.
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            List of sentences
+        """
+        return [sent.text.strip() for sent in self.nlp(text).sents if sent.text.strip()]
+    
+    def split_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """
+        Split many texts into sentences in batches.
+        
+        Args:
+            texts: Texts to split
+        
+        Returns:
+            Sentences of each text, in input order
+        """
+        return [
+            [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+            for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        ]
+    
+    def sentence_spans_many(self, texts: Iterable[str]) -> List[List[Tuple[int, int]]]:
+        """
+        Segment many texts in batches into sentence offsets.
+        
+        Args:
+            texts: Texts to segment
+        
+        Returns:
+            (start, end) offsets of each sentence, without surrounding whitespace,
+            for each text in input order
+        """
+        spans = []
+        for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process):
+            doc_spans = []
+            for sent in doc.sents:
+                stripped = sent.text.strip()
+                if stripped:
+                    start = sent.start_char + len(sent.text) - len(sent.text.lstrip())
+                    doc_spans.append((start, start + len(stripped)))
+            spans.append(doc_spans)
+        return spans
+    
+    def count_sentences_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        Count the sentences of many texts in batches.
+        
+        Args:
+            texts: Texts to segment
+        
+        Returns:
+            Sentence count of each text, in input order
+        """
+        return [
+            sum(1 for _ in doc.sents)
+            for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        ]
+
+
+_service: Optional[SentenceNLPService] = None
+_service_lock = threading.Lock()
+
+
+def get_nlp_service(**options: Any) -> SentenceNLPService:
+    """
+    Get the process-wide NLP service, creating it on first call.
+    
+    Args:
+        **options: SentenceNLPService options, applied when the service is created
+            (later calls update batch_size and n_process only)
+    
+    Returns:
+        Shared NLP service
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = SentenceNLPService(**options)
+        else:
+            for key in ("batch_size", "n_process"):
+                if key in options:
+                    setattr(_service, key, options[key])
+        return _service
@@ -0,0 +1,311 @@
+"""
+Process-pool parse and chunk stage for policy documents.
+
+Documents are parsed in parallel, one task per file, and their sections are then
+chunked in parallel in batches, so a single large regulation is spread over
+several workers. Each worker process builds its parser and chunker once (loading
+the NLP model once per process) and returns chunks as compact tuples of section
+offsets that the parent turns back into ContentChunk objects around its own copy
+of the sections.
+
+With a BuildManifest, the sections and chunk records of every document are
+cached by content hash, so only documents whose markdown changed are parsed and
+only documents whose sections or chunker options changed are chunked again.
+"""
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
+
+from .document_parser import DocumentSection, PolicyDocumentParser
+from .content_aware_chunker import ContentChunk, ContentAwareChunker, SectionTable
+from .nlp_service import get_nlp_service
+from .build_manifest import BuildManifest, code_digest
+from . import document_parser as parser_module, section_lexer, nlp_service as nlp_module
+from . import content_aware_chunker as chunker_module, legal_segmenter, token_counter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (section position in batch, chunk_type, chunk_index, start, end, explicit text,
+#  word_count, estimated_tokens, sentence_count, overlap_with_previous,
+#  overlap_with_next, sentence_spans); chunk text travels as offsets into the section
+ChunkRecord = Tuple[
+    int, str, int, int, Optional[int], Optional[str], int, int, Optional[int], str, str, Optional[List[Tuple[int, int]]]
+]
+
+# Per-process state of pool workers, built once by _init_worker
+_worker_parser: Optional[PolicyDocumentParser] = None
+_worker_chunker: Optional[ContentAwareChunker] = None
+
+
+def _init_worker(chunker_options: Dict[str, Any], nlp_options: Dict[str, Any]) -> None:
+    """Build the parser and chunker of a worker process."""
+    global _worker_parser, _worker_chunker
+    # Pool workers cannot start nlp.pipe subprocesses of their own
+    nlp_service = get_nlp_service(**{**nlp_options, "n_process": 1})
+    _worker_parser = PolicyDocumentParser(nlp_service=nlp_service)
+    _worker_chunker = ContentAwareChunker(**chunker_options)
+
+
+def _parse_task(file_path: str) -> List[DocumentSection]:
+    """Parse one document in a worker."""
+    return _worker_parser.parse_document(file_path)
+
+
+def _chunk_task(sections: List[DocumentSection]) -> List[ChunkRecord]:
+    """Chunk a batch of sections in a worker."""
+    return to_records(_worker_chunker.chunk_document_sections(sections), sections)
+
+
+def to_records(chunks: List[ContentChunk], sections: List[DocumentSection]) -> List[ChunkRecord]:
+    """
+    Convert chunks to compact records that refer to their section by position.
+    
+    Args:
+        chunks: Chunks of the sections
+        sections: Sections the chunks were built from
+    
+    Returns:
+        One record per chunk
+    """
+    positions = {id(section): i for i, section in enumerate(sections)}
+    return [
+        (
+            positions[id(chunk.source_section)],
+            chunk.chunk_type,
+            chunk.chunk_index,
+            chunk.start,
+            chunk.end,
+            chunk.text,
+            chunk.word_count,
+            chunk.estimated_tokens,
+            chunk.sentence_count,
+            chunk.overlap_with_previous,
+            chunk.overlap_with_next,
+            chunk.sentence_spans
+        )
+        for chunk in chunks
+    ]
+
+
+def from_records(records: Iterable[ChunkRecord], sections: List[DocumentSection]) -> List[ContentChunk]:
+    """
+    Rebuild chunks from records around the given sections.
+    
+    Args:
+        records: Records produced by to_records
+        sections: Sections the records refer to
+    
+    Returns:
+        Content chunks
+    """
+    table = SectionTable(sections)
+    return [
+        ContentChunk(
+            table=table,
+            section_ref=position,
+            chunk_type=chunk_type,
+            chunk_index=chunk_index,
+            start=start,
+            end=end,
+            text=text,
+            word_count=word_count,
+            estimated_tokens=estimated_tokens,
+            sentence_count=sentence_count,
+            overlap_with_previous=overlap_prev,
+            overlap_with_next=overlap_next,
+            sentence_spans=spans
+        )
+        for (
+            position, chunk_type, chunk_index, start, end, text, word_count,
+            estimated_tokens, sentence_count, overlap_prev, overlap_next, spans
+        ) in records
+    ]
+
+
+class ParallelDocumentProcessor:
+    """
+    Parses and chunks policy documents on a pool of worker processes.
+    """
+    
+    def __init__(
+        self,
+        chunker_options: Optional[Dict[str, Any]] = None,
+        nlp_options: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        section_batch_chars: int = 100_000,
+        document_parser: Optional[PolicyDocumentParser] = None,
+        chunker: Optional[ContentAwareChunker] = None,
+        manifest: Optional[BuildManifest] = None
+    ):
+        """
+        Initialize the processor.
+        
+        Args:
+            chunker_options: ContentAwareChunker options used in every worker
+            nlp_options: Sentence segmentation service options used in every worker
+            max_workers: Number of worker processes (default: CPU count; 1 processes in-process)
+            section_batch_chars: Approximate section text per chunking task
+            document_parser: Parser for in-process use (built from nlp_options if omitted)
+            chunker: Chunker for in-process use and for joining overlaps across
+                batches (built from chunker_options if omitted)
+            manifest: Build manifest caching the parse and chunk stages (None disables caching)
+        """
+        self.chunker_options = dict(chunker_options or {})
+        self.nlp_options = dict(nlp_options or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.section_batch_chars = section_batch_chars
+        self.document_parser = document_parser or PolicyDocumentParser(nlp_service=get_nlp_service(**self.nlp_options))
+        self.chunker = chunker or ContentAwareChunker(**self.chunker_options)
+        
+        # Stage parameters include the code of each stage, so edits to it invalidate the cache
+        self.manifest = manifest
+        self.parse_params = {
+            "nlp_options": self.nlp_options,
+            "code": code_digest(parser_module, section_lexer, nlp_module),
+        }
+        self.chunk_params = {
+            "chunker_options": self.chunker_options,
+            "nlp_options": self.nlp_options,
+            "code": code_digest(chunker_module, legal_segmenter, nlp_module, token_counter),
+        }
+    
+    def _section_batches(self, sections: List[DocumentSection]) -> List[List[DocumentSection]]:
+        """Split a document's sections into batches of roughly section_batch_chars."""
+        batches = []
+        batch = []
+        batch_chars = 0
+        for section in sections:
+            batch.append(section)
+            batch_chars += len(section.content)
+            if batch_chars >= self.section_batch_chars:
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _join_batches(self, batch_chunks: List[List[ContentChunk]]) -> List[ContentChunk]:
+        """Concatenate the chunks of a document's batches and redo the overlaps at batch edges."""
+        chunks = [chunk for batch in batch_chunks for chunk in batch]
+        stores_overlaps = self.chunker.overlap_size > 0 and self.chunker.store_context_overlaps
+        if stores_overlaps and len(batch_chunks) > 1:
+            # Sentence offsets came back with the records, so nothing is re-segmented
+            self.chunker.add_cross_section_context(chunks)
+        return chunks
+    
+    def _load_cached(self, file_path: str) -> Tuple[Optional[List[DocumentSection]], Optional[List[ContentChunk]]]:
+        """Sections and chunks of a document from the manifest, None for stages that have to run."""
+        sections, sections_digest = self.manifest.load_artifact(
+            "parse", file_path, {"markdown": self.manifest.file_digest(file_path)}, self.parse_params
+        )
+        if sections is None:
+            return None, None
+        records, _ = self.manifest.load_artifact("chunk", file_path, {"sections": sections_digest}, self.chunk_params)
+        return sections, from_records(records, sections) if records is not None else None
+    
+    def _store_sections(self, file_path: str, sections: List[DocumentSection]):
+        """Record the parse stage of a document."""
+        if self.manifest is not None:
+            self.manifest.store_artifact(
+                "parse", file_path, {"markdown": self.manifest.file_digest(file_path)}, self.parse_params, sections
+            )
+    
+    def _store_chunks(self, file_path: str, sections: List[DocumentSection], chunks: List[ContentChunk]):
+        """Record the chunk stage of a document (keyed on the recorded sections)."""
+        if self.manifest is not None:
+            self.manifest.store_artifact(
+                "chunk", file_path, {"sections": self.manifest.output_digest("parse", file_path)},
+                self.chunk_params, to_records(chunks, sections)
+            )
+    
+    def process(self, file_paths: List[str]) -> Iterator[Tuple[str, List[DocumentSection], List[ContentChunk]]]:
+        """
+        Parse and chunk documents.
+        
+        Args:
+            file_paths: Paths of the markdown documents
+        
+        Yields:
+            (file path, sections, chunks) of each document, in input order
+        """
+        # Stages recorded in the manifest are loaded instead of run
+        cached = {}
+        if self.manifest is not None:
+            for i, file_path in enumerate(file_paths):
+                sections, chunks = self._load_cached(file_path)
+                if sections is not None:
+                    cached[i] = (sections, chunks)
+            if cached:
+                up_to_date = sum(1 for _, chunks in cached.values() if chunks is not None)
+                logger.info(f"Build cache: {up_to_date} of {len(file_paths)} documents up to date, "
+                            f"{len(cached) - up_to_date} to re-chunk only")
+        
+        try:
+            yield from self._process(file_paths, cached)
+        finally:
+            if self.manifest is not None:
+                self.manifest.save()
+    
+    def _process(
+        self,
+        file_paths: List[str],
+        cached: Dict[int, Tuple[List[DocumentSection], Optional[List[ContentChunk]]]]
+    ) -> Iterator[Tuple[str, List[DocumentSection], List[ContentChunk]]]:
+        """Run the stages that are not cached, in-process or on the pool."""
+        to_parse = [i for i in range(len(file_paths)) if i not in cached]
+        to_chunk = [i for i in range(len(file_paths)) if cached.get(i, (None, None))[1] is None]
+        
+        if self.max_workers <= 1 or not to_chunk:
+            for i, file_path in enumerate(file_paths):
+                sections, chunks = cached.get(i, (None, None))
+                if sections is None:
+                    sections = self.document_parser.parse_document(file_path)
+                    self._store_sections(file_path, sections)
+                if chunks is None:
+                    chunks = self.chunker.chunk_document_sections(sections) if sections else []
+                    self._store_chunks(file_path, sections, chunks)
+                yield file_path, sections, chunks
+            return
+        
+        logger.info(
+            f"Parsing {len(to_parse)} and chunking {len(to_chunk)} documents on {self.max_workers} worker processes"
+        )
+        
+        # Spawned workers avoid forking a parent that already runs model and client threads
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.chunker_options, self.nlp_options)
+        ) as pool:
+            parse_futures = {pool.submit(_parse_task, file_paths[i]): i for i in to_parse}
+            
+            # Queue the chunking batches of each document as soon as its sections are known
+            documents = {}
+            def submit_chunking(sections: List[DocumentSection]):
+                batches = self._section_batches(sections)
+                return sections, [(batch, pool.submit(_chunk_task, batch)) for batch in batches]
+            
+            for i, (sections, chunks) in cached.items():
+                if chunks is None:
+                    documents[i] = submit_chunking(sections)
+            for future in as_completed(parse_futures):
+                i = parse_futures[future]
+                sections = future.result()
+                self._store_sections(file_paths[i], sections)
+                documents[i] = submit_chunking(sections)
+            
+            for i, file_path in enumerate(file_paths):
+                if i not in documents:
+                    yield (file_path, *cached[i])
+                    continue
+                sections, batch_futures = documents.pop(i)
+                chunks = self._join_batches([from_records(future.result(), batch) for batch, future in batch_futures])
+                self._store_chunks(file_path, sections, chunks)
+                yield file_path, sections, chunks
@@ -9,24 +9,108 @@ import os
 import uuid
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable, Iterator, Set
 from pathlib import Path
 from dataclasses import asdict
 
 from qdrant_client import QdrantClient
+from qdrant_client.local.qdrant_local import QdrantLocal
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-from langchain_openai import OpenAIEmbeddings
 
 from .content_aware_chunker import ContentChunk
 from .document_parser import DocumentSection
+from .ingest_pipeline import EmbedUpsertPipeline, IngestRecord, ProgressCallback, batched
+from .sparse_encoder import BM25SparseEncoder, SparseVectorData
+from .content_store import ChunkContentStore
+from .diversification import mmr_select, section_key
+from .vector_store_base import PolicyVectorStore, NeighbourRange, POINT_ID_NAMESPACE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Named vectors of hybrid collections (plain collections use one unnamed dense vector)
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "bm25"
 
-class QdrantPolicyVectorStore:
+# Payload keys kept in Qdrant in slim mode and returned by phase-one searches
+ROUTING_PAYLOAD_KEYS = (
+    "chunk_id",
+    "document_type",
+    "section_type",
+    "section_id",
+    "section_title",
+    "parent_section",
+    "chunk_type",
+    "chunk_index",
+    "word_count",
+    "estimated_tokens",
+    "content_hash",
+    "section_hash",
+    "aliases",
+)
+
+# Sentinel point holding the write stamp of the collection; searches always exclude it
+VERSION_POINT_ID = str(uuid.uuid5(POINT_ID_NAMESPACE, "collection-version"))
+
+# Parallel upload workers against a Qdrant server (local clients use one)
+DEFAULT_UPLOAD_WORKERS = 2
+
+# Candidates fetched per retriever before reciprocal rank fusion, relative to the limit
+HYBRID_PREFETCH_FACTOR = 4
+
+# Named index/storage profiles for _setup_collection and search-time parameters.
+# "full-precision" is the float32, exact-search baseline the others are measured against.
+COLLECTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "full-precision": {
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 100,
+        "search_ef": None,
+        "exact_search": True,
+        "quantization": None,
+        "oversampling": None,
+        "rescore": False,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+    },
+    "low-latency": {
+        "hnsw_m": 32,
+        "hnsw_ef_construct": 256,
+        "search_ef": 64,
+        "exact_search": False,
+        "quantization": "scalar",
+        "oversampling": 1.5,
+        "rescore": True,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+    },
+    "balanced": {
+        "hnsw_m": 16,
+        "hnsw_ef_construct": 128,
+        "search_ef": 128,
+        "exact_search": False,
+        "quantization": "scalar",
+        "oversampling": 2.0,
+        "rescore": True,
+        "on_disk_vectors": True,
+        "on_disk_payload": False,
+    },
+    "low-memory": {
+        "hnsw_m": 8,
+        "hnsw_ef_construct": 100,
+        "search_ef": 128,
+        "exact_search": False,
+        "quantization": "binary",
+        "oversampling": 3.0,
+        "rescore": True,
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+    },
+}
+
+
+class QdrantPolicyVectorStore(PolicyVectorStore):
     """
     High-performance vector store for policy documents using Qdrant.
     """
@@ -36,9 +120,22 @@ class QdrantPolicyVectorStore:
         collection_name: str = "policy_documents",
         qdrant_url: str = "http://localhost:6333",
         qdrant_api_key: Optional[str] = None,
-        embedding_model: str = "text-embedding-ada-002",
-        vector_size: int = 1536,
-        distance_metric: str = "cosine"
+        embedding_model: Optional[str] = None,
+        vector_size: Optional[int] = None,
+        distance_metric: str = "cosine",
+        embedding_cache_dir: Optional[str] = ".cache/embeddings",
+        embedding_cache_memory_size: int = 10000,
+        embedding_cache_max_entries: int = 200000,
+        collection_profile: Optional[str] = None,
+        enable_hybrid: bool = False,
+        payload_mode: str = "full",
+        content_store_path: Optional[str] = None,
+        result_cache_size: int = 1024,
+        result_cache_ttl: float = 3600.0,
+        embedding_provider: str = "openai",
+        embedding_options: Optional[Dict[str, Any]] = None,
+        qdrant_location: Optional[str] = None,
+        qdrant_path: Optional[str] = None
     ):
         """
         Initialize Qdrant vector store.
@@ -47,21 +144,71 @@ class QdrantPolicyVectorStore:
             collection_name: Name of the Qdrant collection
             qdrant_url: Qdrant server URL
             qdrant_api_key: API key for Qdrant Cloud (optional)
-            embedding_model: OpenAI embedding model to use
-            vector_size: Size of the embedding vectors
+            embedding_model: Embedding model to use (default depends on the provider)
+            vector_size: Size of the embedding vectors (default: taken from the provider)
             distance_metric: Distance metric for similarity search
+            embedding_cache_dir: Directory for the persistent embedding cache (None disables it)
+            embedding_cache_memory_size: Number of vectors kept in the in-memory cache tier
+            embedding_cache_max_entries: Number of vectors kept in the on-disk cache tier
+            collection_profile: Optional tuning profile from COLLECTION_PROFILES
+                ('low-latency', 'balanced', 'low-memory', 'full-precision')
+            enable_hybrid: Index a BM25 sparse vector next to the dense one and
+                fuse both rankings with reciprocal rank fusion at search time
+            payload_mode: 'full' stores every payload field in Qdrant; 'slim' keeps
+                only routing keys there and full payloads in a local content store
+            content_store_path: SQLite file for slim payloads
+                (default: data/content_store/<collection_name>.sqlite)
+            result_cache_size: Number of cached search result lists (0 disables the cache)
+            result_cache_ttl: Seconds a cached search result stays valid
+            embedding_provider: 'openai' or 'local' (CPU sentence-embedding model)
+            embedding_options: Provider options, e.g. quantization, batch_size, num_threads
+            qdrant_location: ':memory:' for an in-process local client instead of a server
+            qdrant_path: Directory of an on-disk local client instead of a server
         """
         self.collection_name = collection_name
-        self.vector_size = vector_size
+        self.last_ingest_stats: Optional[Dict[str, Any]] = None
+        self._init_result_cache(result_cache_size, result_cache_ttl)
         
-        # Initialize Qdrant client
-        self.client = QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
+        if collection_profile is not None and collection_profile not in COLLECTION_PROFILES:
+            raise ValueError(f"Unknown collection profile: {collection_profile}")
+        self.collection_profile = collection_profile
+        self.profile_settings = COLLECTION_PROFILES.get(collection_profile)
+        self.search_params = self._build_search_params()
+        
+        # Hybrid collections store a named dense vector plus a sparse lexical vector
+        self.enable_hybrid = enable_hybrid
+        self.dense_vector_name = DENSE_VECTOR_NAME if enable_hybrid else None
+        self.sparse_encoder = BM25SparseEncoder() if enable_hybrid else None
+        
+        # Slim mode keeps chunk text out of Qdrant and fetches it for the final hits only
+        if payload_mode not in ("full", "slim"):
+            raise ValueError(f"Unknown payload mode: {payload_mode}")
+        self.payload_mode = payload_mode
+        self.content_store = None
+        if payload_mode == "slim":
+            self.content_store = ChunkContentStore(
+                content_store_path or f"data/content_store/{collection_name}.sqlite"
+            )
+        
+        # Initialize Qdrant client; a location or path selects the embedded local mode
+        if qdrant_location or qdrant_path:
+            self.client = QdrantClient(location=qdrant_location, path=qdrant_path)
+        else:
+            self.client = QdrantClient(
+                url=qdrant_url,
+                api_key=qdrant_api_key,
+            )
         
         # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(model=embedding_model)
+        self._init_embeddings(
+            embedding_model,
+            embedding_cache_dir,
+            embedding_cache_memory_size,
+            embedding_cache_max_entries,
+            embedding_provider,
+            embedding_options,
+            vector_size
+        )
         
         # Distance metric mapping
         distance_mapping = {
@@ -86,15 +233,25 @@ class QdrantPolicyVectorStore:
             
             if collection_exists:
                 logger.info(f"Collection '{self.collection_name}' already exists")
+                if self.collection_profile:
+                    logger.info(
+                        f"Existing collection keeps its stored index settings; "
+                        f"only search-time parameters of profile '{self.collection_profile}' apply"
+                    )
+                if self.enable_hybrid and not self._has_sparse_vectors():
+                    logger.warning(
+                        f"Collection '{self.collection_name}' has no '{SPARSE_VECTOR_NAME}' sparse vector; "
+                        f"hybrid search disabled (recreate the collection to enable it)"
+                    )
+                    self.enable_hybrid = False
+                    self.dense_vector_name = None
+                    self.sparse_encoder = None
                 return
             
-            # Create collection with basic configuration
+            # Create collection, tuned by the selected profile if any
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=self.distance_metric,
-                )
+                **self._build_collection_config()
             )
             
             # Create payload indexes for efficient filtering
@@ -106,6 +263,7 @@ class QdrantPolicyVectorStore:
                 ("chunk_type", models.PayloadSchemaType.KEYWORD),
                 ("word_count", models.PayloadSchemaType.INTEGER),
                 ("estimated_tokens", models.PayloadSchemaType.INTEGER),
+                ("chunk_index", models.PayloadSchemaType.INTEGER),
             ]
             
             for field_name, field_type in payload_indexes:
@@ -119,62 +277,258 @@ class QdrantPolicyVectorStore:
                 except Exception as e:
                     logger.warning(f"Could not create index for {field_name}: {e}")
             
-            logger.info(f"Created collection '{self.collection_name}' with optimized settings")
+            logger.info(
+                f"Created collection '{self.collection_name}' with optimized settings"
+                + (f" (profile: {self.collection_profile})" if self.collection_profile else "")
+            )
             
         except Exception as e:
             logger.error(f"Error setting up collection: {e}")
             raise
     
-    def _prepare_chunk_payload(self, chunk: ContentChunk) -> Dict[str, Any]:
+    def _has_sparse_vectors(self) -> bool:
+        """Check whether the existing collection was created for hybrid search."""
+        info = self.client.get_collection(self.collection_name)
+        sparse_vectors = getattr(info.config.params, "sparse_vectors", None) or {}
+        return SPARSE_VECTOR_NAME in sparse_vectors
+    
+    def _build_collection_config(self) -> Dict[str, Any]:
+        """
+        Build create_collection arguments for the selected profile.
+        
+        Returns:
+            Keyword arguments for QdrantClient.create_collection
+        """
+        profile = self.profile_settings
+        if not profile:
+            config = {
+                "vectors_config": VectorParams(
+                    size=self.vector_size,
+                    distance=self.distance_metric,
+                )
+            }
+            return self._add_hybrid_config(config)
+        
+        config = {
+            "vectors_config": VectorParams(
+                size=self.vector_size,
+                distance=self.distance_metric,
+                on_disk=profile["on_disk_vectors"],
+            ),
+            "hnsw_config": models.HnswConfigDiff(
+                m=profile["hnsw_m"],
+                ef_construct=profile["hnsw_ef_construct"],
+            ),
+            "on_disk_payload": profile["on_disk_payload"],
+        }
+        
+        # Quantized vectors stay in RAM; originals may live on disk for rescoring
+        if profile["quantization"] == "scalar":
+            config["quantization_config"] = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                )
+            )
+        elif profile["quantization"] == "binary":
+            config["quantization_config"] = models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        
+        return self._add_hybrid_config(config)
+    
+    def _add_hybrid_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Name the dense vector and add the sparse vector for hybrid collections."""
+        if not self.enable_hybrid:
+            return config
+        config["vectors_config"] = {DENSE_VECTOR_NAME: config["vectors_config"]}
+        config["sparse_vectors_config"] = {
+            SPARSE_VECTOR_NAME: models.SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=False)
+            )
+        }
+        return config
+    
+    def _build_search_params(self) -> Optional[models.SearchParams]:
+        """Build search-time parameters for the selected profile."""
+        profile = self.profile_settings
+        if not profile:
+            return None
+        
+        quantization_params = None
+        if profile["quantization"]:
+            quantization_params = models.QuantizationSearchParams(
+                ignore=False,
+                rescore=profile["rescore"],
+                oversampling=profile["oversampling"],
+            )
+        
+        return models.SearchParams(
+            hnsw_ef=profile["search_ef"],
+            exact=profile["exact_search"],
+            quantization=quantization_params,
+        )
+    
+    def _get_indexed_hashes(self, document_types: Iterable[str]) -> Dict[str, str]:
         """
-        Prepare chunk metadata as Qdrant payload.
+        Fetch the stored content hash of every point of the given document types.
+        
+        Incremental updates delete the scanned points that were not re-added,
+        so the scan never covers the whole collection: without a non-empty
+        document type nothing is scanned, and the version sentinel is skipped.
         
         Args:
-            chunk: Content chunk to prepare
+            document_types: Document types to scan
             
         Returns:
-            Payload dictionary for Qdrant
-        """
-        payload = {
-            # Chunk information
-            "chunk_id": chunk.chunk_id,
-            "content": chunk.content,
-            "chunk_type": chunk.chunk_type,
-            "chunk_index": chunk.chunk_index,
-            "word_count": chunk.word_count,
-            
-            # Section information
-            "section_type": chunk.source_section.section_type,
-            "section_id": chunk.source_section.section_id,
-            "section_title": chunk.source_section.title or "",
-            "parent_section": chunk.source_section.parent_section or "",
-            
-            # Context information
-            "overlap_with_previous": chunk.overlap_with_previous,
-            "overlap_with_next": chunk.overlap_with_next,
-            
-            # Document metadata
-            **chunk.metadata
-        }
+            Mapping of point id to content hash
+        """
+        document_types = [doc_type for doc_type in document_types if doc_type]
+        if not document_types:
+            return {}
+        scroll_filter = Filter(
+            must=[FieldCondition(key="document_type", match=models.MatchAny(any=document_types))],
+            must_not=[models.HasIdCondition(has_id=[VERSION_POINT_ID])]
+        )
         
-        # Ensure all values are JSON serializable
-        for key, value in payload.items():
-            if value is None:
-                payload[key] = ""
-            elif isinstance(value, (int, float, str, bool, list, dict)):
-                continue
-            else:
-                payload[key] = str(value)
+        hashes = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=1000,
+                offset=offset,
+                with_payload=["content_hash"],
+                with_vectors=False
+            )
+            for point in points:
+                if str(point.id) != VERSION_POINT_ID:
+                    hashes[str(point.id)] = (point.payload or {}).get("content_hash", "")
+            if offset is None:
+                break
         
-        return payload
+        return hashes
     
-    def add_chunks(self, chunks: List[ContentChunk], batch_size: int = 100) -> bool:
+    def _fetch_section_chunks(self, ranges: List[NeighbourRange]) -> Dict[str, Dict[int, str]]:
+        """
+        Fetch neighbour chunks with one payload-indexed scroll.
+        
+        Args:
+            ranges: Neighbour lookups
+            
+        Returns:
+            Mapping of section key to {chunk index: content}
+        """
+        if not ranges:
+            return {}
+        
+        # One sub-filter per (section, index range), OR-ed together
+        scroll_filter = Filter(should=[
+            Filter(must=[
+                FieldCondition(key="document_type", match=MatchValue(value=metadata.get("document_type", ""))),
+                FieldCondition(key="section_type", match=MatchValue(value=metadata.get("section_type", ""))),
+                FieldCondition(key="section_id", match=MatchValue(value=metadata.get("section_id", ""))),
+                FieldCondition(key="chunk_index", range=models.Range(gte=start, lte=end)),
+            ])
+            for metadata, start, end in ranges
+        ])
+        with_payload = ["document_type", "section_type", "section_id", "chunk_index"]
+        if self.content_store is None:
+            with_payload.append("content")
+        
+        points = []
+        offset = None
+        while True:
+            page, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=sum(end - start + 1 for _, start, end in ranges),
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False
+            )
+            points.extend(page)
+            if offset is None:
+                break
+        
+        contents = {}
+        if self.content_store is not None:
+            stored = self.content_store.get_many([str(point.id) for point in points])
+            contents = {point_id: payload.get("content", "") for point_id, payload in stored.items()}
+        
+        section_chunks: Dict[str, Dict[int, str]] = {}
+        for point in points:
+            payload = point.payload or {}
+            content = contents.get(str(point.id), payload.get("content", ""))
+            section_chunks.setdefault(section_key(payload), {})[int(payload["chunk_index"])] = content
+        return section_chunks
+    
+    def _index_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a payload to its routing keys in slim mode."""
+        if self.payload_mode != "slim":
+            return payload
+        return {key: payload[key] for key in ROUTING_PAYLOAD_KEYS if key in payload}
+    
+    def _upload_workers(self, requested: Optional[int]) -> int:
+        """
+        Resolve the number of parallel upload workers.
+        
+        The local client (":memory:" or an on-disk path) mutates its in-process
+        collections without locking, so concurrent upserts corrupt stored vectors.
+        """
+        if isinstance(getattr(self.client, "_client", None), QdrantLocal):
+            if requested and requested > 1:
+                logger.warning(f"Local Qdrant client: using 1 upload worker instead of {requested}")
+            return 1
+        return requested or DEFAULT_UPLOAD_WORKERS
+    
+    def _upsert_records(
+        self,
+        records: List[IngestRecord],
+        sparse_vectors: Optional[Dict[str, SparseVectorData]] = None
+    ):
+        """Upload a batch of (id, vector, payload) records."""
+        points = []
+        for point_id, vector, payload in records:
+            if self.enable_hybrid:
+                named_vectors = {DENSE_VECTOR_NAME: vector}
+                indices, values = (sparse_vectors or {}).get(point_id, ([], []))
+                if indices:
+                    named_vectors[SPARSE_VECTOR_NAME] = models.SparseVector(indices=indices, values=values)
+                vector = named_vectors
+            points.append(PointStruct(id=point_id, vector=vector, payload=payload))
+        
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=points
+        )
+    
+    def add_chunks(
+        self,
+        chunks: List[ContentChunk],
+        batch_size: int = 100,
+        incremental: bool = False,
+        embedding_concurrency: int = 4,
+        upload_workers: Optional[int] = None,
+        max_pending_batches: int = 8
+    ) -> bool:
         """
         Add chunks to the vector store.
         
+        Points are keyed by a deterministic id, so re-adding a chunk overwrites
+        its previous version instead of duplicating it.
+        
         Args:
             chunks: List of content chunks to add
             batch_size: Number of chunks to process in each batch
+            incremental: Only embed and upsert new or changed chunks, and delete
+                points of the same document types that no longer exist
+            embedding_concurrency: Maximum number of embedding requests in flight
+            upload_workers: Number of parallel upload workers (default: DEFAULT_UPLOAD_WORKERS,
+                or one for a local client)
+            max_pending_batches: Embedded batches allowed to wait for upload
             
         Returns:
             Success status
@@ -182,58 +536,695 @@ class QdrantPolicyVectorStore:
         try:
             logger.info(f"Adding {len(chunks)} chunks to vector store")
             
-            # Process chunks in batches
-            for i in range(0, len(chunks), batch_size):
-                batch_chunks = chunks[i:i + batch_size]
-                
-                # Prepare batch content for embedding
-                batch_content = []
-                for chunk in batch_chunks:
-                    # Use the chunk content with context for embedding
-                    content = chunk.content
-                    if chunk.source_section.title:
-                        content = f"{chunk.source_section.title}\n\n{content}"
-                    batch_content.append(content)
-                
-                # Generate embeddings for the batch
-                logger.debug(f"Generating embeddings for batch {i//batch_size + 1}")
-                embeddings = self.embeddings.embed_documents(batch_content)
-                
-                # Prepare points for Qdrant
-                points = []
-                for j, (chunk, embedding) in enumerate(zip(batch_chunks, embeddings)):
-                    point_id = str(uuid.uuid4())
-                    payload = self._prepare_chunk_payload(chunk)
-                    
-                    point = PointStruct(
-                        id=point_id,
-                        vector=embedding,
-                        payload=payload
-                    )
-                    points.append(point)
-                
-                # Upload batch to Qdrant
-                operation_info = self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points
+            # Prepare ids, payloads and content hashes up front
+            prepared = self._prepare_points(chunks)
+            
+            pending = list(prepared.items())
+            stale_ids = []
+            if incremental:
+                document_types = {payload.get("document_type", "") for _, payload in prepared.values()}
+                indexed_hashes = self._get_indexed_hashes(document_types)
+                pending = [
+                    (point_id, item) for point_id, item in pending
+                    if indexed_hashes.get(point_id) != item[1]["content_hash"]
+                ]
+                stale_ids = [point_id for point_id in indexed_hashes if point_id not in prepared]
+                if not any(document_types):
+                    logger.warning("Incremental update of chunks without a document type: stale points are kept")
+                logger.info(
+                    f"Incremental update: {len(pending)} new or changed, "
+                    f"{len(prepared) - len(pending)} unchanged, {len(stale_ids)} stale"
                 )
-                
-                logger.debug(f"Uploaded batch {i//batch_size + 1}: {operation_info}")
             
-            logger.info(f"Successfully added {len(chunks)} chunks to vector store")
+            # Sparse lexical vectors are weighted with corpus statistics of all given chunks
+            sparse_vectors = {}
+            if self.enable_hybrid:
+                self.sparse_encoder.fit(embedding_text for embedding_text, _ in prepared.values())
+                sparse_vectors = {
+                    point_id: self.sparse_encoder.encode_document(embedding_text)
+                    for point_id, (embedding_text, _) in pending
+                }
+            
+            # Embed and upload batches through the pipelined ingestion stage
+            pipeline = EmbedUpsertPipeline(
+                embed_fn=self.embeddings.embed_documents,
+                upsert_fn=lambda records: self._upsert_records(records, sparse_vectors),
+                embedding_concurrency=embedding_concurrency,
+                upload_workers=self._upload_workers(upload_workers),
+                max_pending_batches=max_pending_batches
+            )
+            if self.content_store is not None:
+                self.content_store.put_many((point_id, payload) for point_id, (_, payload) in pending)
+            batches = (
+                [
+                    (point_id, embedding_text, self._index_payload(payload))
+                    for point_id, (embedding_text, payload) in pending[i:i + batch_size]
+                ]
+                for i in range(0, len(pending), batch_size)
+            )
+            self.last_ingest_stats = pipeline.run(batches).to_dict()
+            
+            # Remove points whose chunks no longer exist
+            self._delete_points(stale_ids, batch_size)
+            
+            logger.info(f"Successfully added {len(pending)} chunks to vector store")
             return True
             
         except Exception as e:
             logger.error(f"Error adding chunks to vector store: {e}")
             return False
+        finally:
+            # Even a partial write changes what searches can return
+            self._bump_collection_version()
     
-    def search_similar(
+    def add_chunk_stream(
+        self,
+        chunks: Iterable[ContentChunk],
+        batch_size: int = 100,
+        incremental: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        embedding_concurrency: int = 4,
+        upload_workers: Optional[int] = None,
+        max_pending_batches: int = 8
+    ) -> bool:
+        """
+        Embed and upload a stream of chunks without collecting it.
+        
+        Chunks are prepared one batch at a time as the pipeline pulls them, so
+        memory is bounded by the batches in flight rather than the corpus. For
+        incremental updates, stored hashes are fetched per document type when
+        the type first appears and stale points are removed after the stream.
+        
+        Args:
+            chunks: Content chunks (consumed lazily)
+            batch_size: Number of chunks per embedding and upload batch
+            incremental: Only embed and upsert new or changed chunks, and delete
+                points of the streamed document types that no longer exist
+            progress: Optional callback receiving 'embed' and 'upload' events
+            embedding_concurrency: Maximum number of embedding requests in flight
+            upload_workers: Number of parallel upload workers (default: DEFAULT_UPLOAD_WORKERS,
+                or one for a local client)
+            max_pending_batches: Embedded batches allowed to wait for upload
+            
+        Returns:
+            Success status
+        """
+        try:
+            if self.enable_hybrid and not self.sparse_encoder.document_count:
+                raise ValueError("Streaming hybrid ingest needs a fitted sparse encoder (see fit_sparse_encoder)")
+            
+            indexed_hashes: Dict[str, str] = {}
+            scanned_types = set()
+            seen_ids = set()
+            unchanged = 0
+            # Sparse vectors of prepared batches, released once uploaded
+            sparse_vectors: Dict[str, SparseVectorData] = {}
+            
+            def prepared_batches():
+                nonlocal unchanged
+                for chunk_batch in batched(chunks, batch_size):
+                    prepared = self._prepare_points(chunk_batch)
+                    pending = list(prepared.items())
+                    if incremental:
+                        new_types = {payload.get("document_type", "") for _, payload in prepared.values()} - scanned_types
+                        if new_types:
+                            indexed_hashes.update(self._get_indexed_hashes(new_types))
+                            scanned_types.update(new_types)
+                        seen_ids.update(prepared)
+                        pending = [
+                            (point_id, item) for point_id, item in pending
+                            if indexed_hashes.get(point_id) != item[1]["content_hash"]
+                        ]
+                        unchanged += len(prepared) - len(pending)
+                    if self.enable_hybrid:
+                        for point_id, (embedding_text, _) in pending:
+                            sparse_vectors[point_id] = self.sparse_encoder.encode_document(embedding_text)
+                    if self.content_store is not None:
+                        self.content_store.put_many((point_id, payload) for point_id, (_, payload) in pending)
+                    yield [
+                        (point_id, embedding_text, self._index_payload(payload))
+                        for point_id, (embedding_text, payload) in pending
+                    ]
+            
+            def upsert(records: List[IngestRecord]):
+                batch_sparse = {point_id: sparse_vectors.pop(point_id, None) for point_id, _, _ in records}
+                self._upsert_records(records, {point_id: vector for point_id, vector in batch_sparse.items() if vector})
+            
+            pipeline = EmbedUpsertPipeline(
+                embed_fn=self.embeddings.embed_documents,
+                upsert_fn=upsert,
+                embedding_concurrency=embedding_concurrency,
+                upload_workers=self._upload_workers(upload_workers),
+                max_pending_batches=max_pending_batches,
+                progress=progress
+            )
+            self.last_ingest_stats = pipeline.run(prepared_batches()).to_dict()
+            
+            stale_ids = [point_id for point_id in indexed_hashes if point_id not in seen_ids]
+            self._delete_points(stale_ids, batch_size)
+            if incremental:
+                logger.info(
+                    f"Incremental update: {self.last_ingest_stats['chunks']} new or changed, "
+                    f"{unchanged} unchanged, {len(stale_ids)} stale"
+                )
+            
+            logger.info(f"Successfully streamed {self.last_ingest_stats['chunks']} chunks into vector store")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error streaming chunks into vector store: {e}")
+            return False
+        finally:
+            self._bump_collection_version()
+    
+    def replace_sections(self, chunks: List[ContentChunk], section_keys: Iterable[str], batch_size: int = 100) -> bool:
+        """
+        Replace the indexed chunks of whole sections.
+        
+        New chunks are upserted before the leftover points of their sections are
+        deleted, so searches keep finding every section during the update. Hybrid
+        collections encode the new chunks with the already fitted BM25 statistics.
+        
+        Args:
+            chunks: New chunks of the changed sections
+            section_keys: Keys of changed and removed sections; points of these
+                sections that are not among the new chunks are deleted
+            batch_size: Number of chunks per embedding and upload batch
+        
+        Returns:
+            Success status
+        """
+        try:
+            if self.enable_hybrid and not self.sparse_encoder.document_count:
+                raise ValueError("Section updates of hybrid collections need a fitted sparse encoder (see fit_sparse_encoder)")
+            
+            prepared = self._prepare_points(chunks)
+            pending = list(prepared.items())
+            sparse_vectors = {}
+            if self.enable_hybrid:
+                sparse_vectors = {
+                    point_id: self.sparse_encoder.encode_document(embedding_text)
+                    for point_id, (embedding_text, _) in pending
+                }
+            if self.content_store is not None:
+                self.content_store.put_many((point_id, payload) for point_id, (_, payload) in pending)
+            
+            pipeline = EmbedUpsertPipeline(
+                embed_fn=self.embeddings.embed_documents,
+                upsert_fn=lambda records: self._upsert_records(records, sparse_vectors)
+            )
+            batches = (
+                [
+                    (point_id, embedding_text, self._index_payload(payload))
+                    for point_id, (embedding_text, payload) in pending[i:i + batch_size]
+                ]
+                for i in range(0, len(pending), batch_size)
+            )
+            self.last_ingest_stats = pipeline.run(batches).to_dict()
+            
+            keys = set(section_keys) | {section_key(payload) for _, payload in prepared.values()}
+            deleted = self._delete_section_points(keys, prepared)
+            logger.info(f"Replaced {len(keys)} sections: {len(prepared)} chunks written, {deleted} stale points deleted")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error replacing sections: {e}")
+            return False
+        finally:
+            self._bump_collection_version()
+    
+    def get_section_hashes(self, document_types: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Fetch the section hash of every indexed section.
+        
+        Args:
+            document_types: Document types to scan (None: all)
+        
+        Returns:
+            Mapping of section key ('gdpr:article:6') to section hash
+            ('' for points indexed before section hashes were stored)
+        """
+        scroll_filter = None
+        if document_types is not None:
+            scroll_filter = Filter(must=[
+                FieldCondition(key="document_type", match=models.MatchAny(any=list(document_types)))
+            ])
+        
+        def iter_payloads():
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=1000,
+                    offset=offset,
+                    with_payload=["document_type", "section_type", "section_id", "section_hash", "aliases"],
+                    with_vectors=False
+                )
+                for point in points:
+                    yield point.payload or {}
+                if offset is None:
+                    return
+        
+        return self._section_hashes_from_payloads(iter_payloads())
+    
+    def _delete_section_points(self, section_keys: Iterable[str], keep_ids: Iterable[str], batch_size: int = 100) -> int:
+        """
+        Delete the points of the given sections, except the kept ones.
+        
+        Args:
+            section_keys: Section keys of the sections to clean up
+            keep_ids: Point ids that were just written and stay
+            batch_size: Number of sections per filter
+        
+        Returns:
+            Number of deleted points
+        """
+        keep_ids = set(keep_ids)
+        stale_ids = [
+            str(point.id) for point in self._scroll_sections(section_keys, False, batch_size)
+            if str(point.id) not in keep_ids
+        ]
+        self._delete_points(stale_ids, batch_size)
+        return len(stale_ids)
+    
+    def get_alias_sections(self, section_keys: Iterable[str], batch_size: int = 100) -> Set[str]:
+        """
+        Find the sections folded into the chunks of the given sections as near-duplicates.
+        
+        Args:
+            section_keys: Keys of the canonical sections
+            batch_size: Number of sections per filter
+        
+        Returns:
+            Section keys recorded in the aliases of their points
+        """
+        return {
+            alias["section_key"]
+            for point in self._scroll_sections(section_keys, ["aliases"], batch_size)
+            for alias in (point.payload or {}).get("aliases") or ()
+        }
+    
+    def _scroll_sections(self, section_keys: Iterable[str], with_payload: Any, batch_size: int = 100) -> Iterator[Any]:
+        """Scroll the points of the given sections, batch_size sections per filter."""
+        section_keys = sorted(section_keys)
+        for i in range(0, len(section_keys), batch_size):
+            section_filter = Filter(should=[
+                Filter(must=[
+                    FieldCondition(key=field, match=MatchValue(value=value))
+                    for field, value in zip(("document_type", "section_type", "section_id"), key.split(":", 2))
+                ])
+                for key in section_keys[i:i + batch_size]
+            ])
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=section_filter,
+                    limit=1000,
+                    offset=offset,
+                    with_payload=with_payload,
+                    with_vectors=False
+                )
+                yield from points
+                if offset is None:
+                    break
+    
+    def fit_sparse_encoder(self, chunks: Iterable[ContentChunk]) -> None:
+        """
+        Fit the BM25 encoder on a chunk stream before a streaming hybrid ingest.
+        
+        Args:
+            chunks: Content chunks of the whole corpus (consumed lazily)
+        """
+        if not self.enable_hybrid:
+            return
+        self.sparse_encoder.fit(self._get_embedding_text(chunk) for chunk in chunks)
+    
+    def _read_version_stamp(self) -> Optional[str]:
+        """Read the write stamp from the version sentinel point."""
+        records = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[VERSION_POINT_ID],
+            with_payload=True,
+            with_vectors=False
+        )
+        return records[0].payload.get("version_stamp") if records else None
+    
+    def _write_version_stamp(self, stamp: str):
+        """Store the write stamp on the version sentinel point."""
+        # Any valid vector will do: the sentinel is excluded from every search
+        vector = [1.0] + [0.0] * (self.vector_size - 1)
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[
+                PointStruct(
+                    id=VERSION_POINT_ID,
+                    vector={DENSE_VECTOR_NAME: vector} if self.dense_vector_name else vector,
+                    payload={"version_stamp": stamp}
+                )
+            ]
+        )
+    
+    def _delete_points(self, point_ids: List[str], batch_size: int = 100):
+        """Delete points (and their stored content) in batches."""
+        for i in range(0, len(point_ids), batch_size):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=point_ids[i:i + batch_size])
+            )
+        if point_ids and self.content_store is not None:
+            self.content_store.delete_many(point_ids)
+    
+    @staticmethod
+    def _build_filter(filter_conditions: Optional[Dict[str, Any]]) -> Filter:
+        """
+        Translate filter conditions into a Qdrant filter.
+        
+        Args:
+            filter_conditions: Mapping of payload field to a value or list of values
+            
+        Returns:
+            Qdrant filter
+        """
+        # The version sentinel is stored next to the chunks and must never be returned
+        exclude_sentinel = [models.HasIdCondition(has_id=[VERSION_POINT_ID])]
+        if not filter_conditions:
+            return Filter(must_not=exclude_sentinel)
+        
+        conditions = []
+        for field, value in filter_conditions.items():
+            if isinstance(value, list):
+                # Handle list values (OR condition)
+                for v in value:
+                    conditions.append(
+                        FieldCondition(key=field, match=MatchValue(value=v))
+                    )
+            else:
+                conditions.append(
+                    FieldCondition(key=field, match=MatchValue(value=value))
+                )
+        
+        if not conditions:
+            return Filter(must_not=exclude_sentinel)
+        if len(conditions) > 1:
+            return Filter(should=conditions, must_not=exclude_sentinel)
+        return Filter(must=[conditions[0]], must_not=exclude_sentinel)
+    
+    @staticmethod
+    def _format_results(search_results: List[Any], include_metadata: bool) -> List[Dict[str, Any]]:
+        """Convert scored Qdrant points into result dictionaries."""
+        results = []
+        for result in search_results:
+            result_dict = {
+                "id": str(result.id),
+                "score": result.score,
+                "content": result.payload.get("content", "") if result.payload else "",
+            }
+            
+            if include_metadata and result.payload:
+                result_dict["metadata"] = {
+                    key: value for key, value in result.payload.items()
+                    if key != "content"
+                }
+            
+            results.append(result_dict)
+        return results
+    
+    @staticmethod
+    def _format_candidates(search_results: List[Any]) -> List[Dict[str, Any]]:
+        """Convert scored points with routing payloads into phase-one candidates."""
+        return [
+            {"id": str(result.id), "score": result.score, "metadata": result.payload or {}}
+            for result in search_results
+        ]
+    
+    def _build_hybrid_prefetch(
+        self,
+        query: str,
+        query_embedding: List[float],
+        search_filter: Optional[Filter],
+        limit: int,
+        score_threshold: Optional[float]
+    ) -> List[models.Prefetch]:
+        """
+        Build the dense and sparse candidate queries fused by RRF.
+        
+        The score threshold only applies to dense candidates, so exact lexical
+        matches such as citations still reach the fused ranking.
+        """
+        candidates = max(limit * HYBRID_PREFETCH_FACTOR, limit)
+        prefetch = [
+            models.Prefetch(
+                query=query_embedding,
+                using=DENSE_VECTOR_NAME,
+                filter=search_filter,
+                params=self.search_params,
+                score_threshold=score_threshold,
+                limit=candidates,
+            )
+        ]
+        
+        indices, values = self.sparse_encoder.encode_query(query)
+        if indices:
+            prefetch.append(
+                models.Prefetch(
+                    query=models.SparseVector(indices=indices, values=values),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=search_filter,
+                    limit=candidates,
+                )
+            )
+        return prefetch
+    
+    def _uses_hybrid(self, search_mode: Optional[str]) -> bool:
+        """Resolve the search mode ('dense' or 'hybrid') for a request."""
+        return self.enable_hybrid and (search_mode or "hybrid") == "hybrid"
+    
+    def _payload_selector(self, include_metadata: bool, routing_only: bool = False) -> Union[bool, models.PayloadSelectorInclude]:
+        """Choose which payload fields a search returns."""
+        if routing_only or self.payload_mode == "slim":
+            return models.PayloadSelectorInclude(include=list(ROUTING_PAYLOAD_KEYS))
+        return include_metadata
+    
+    def _search_points(
+        self,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+        filter_conditions: Optional[Dict[str, Any]],
+        with_payload: Union[bool, models.PayloadSelectorInclude],
+        search_mode: Optional[str] = None,
+        with_vectors: bool = False,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Any]:
+        """
+        Run one dense or hybrid search and return raw scored points.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score (dense candidates only in hybrid mode)
+            filter_conditions: Optional metadata filters
+            with_payload: Payload selection
+            search_mode: 'dense' or 'hybrid'
+            with_vectors: Whether to return the dense vectors of the hits
+            query_embedding: Precomputed query embedding
+            
+        Returns:
+            Scored points
+        """
+        # Generate query embedding
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        search_filter = self._build_filter(filter_conditions)
+        if with_vectors and self.dense_vector_name:
+            with_vectors = [self.dense_vector_name]
+        
+        if self._uses_hybrid(search_mode):
+            # Fuse dense and sparse rankings inside one Qdrant query
+            response = self.client.query_points(
+                collection_name=self.collection_name,
+                prefetch=self._build_hybrid_prefetch(
+                    query, query_embedding, search_filter, limit, score_threshold
+                ),
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors
+            )
+            return response.points
+        
+        # The dense vector is addressed by name in hybrid collections
+        response = self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_embedding,
+            using=self.dense_vector_name,
+            query_filter=search_filter,
+            search_params=self.search_params,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=with_payload,
+            with_vectors=with_vectors
+        )
+        return response.points
+    
+    def _search_points_many(
+        self,
+        specs: List[Dict[str, Any]],
+        limit: int,
+        score_threshold: Optional[float],
+        filter_conditions: Optional[Dict[str, Any]],
+        with_payload: Union[bool, models.PayloadSelectorInclude]
+    ) -> List[List[Any]]:
+        """
+        Run a batch of searches with one embedding call and one Qdrant request.
+        
+        Args:
+            specs: Query specifications with optional per-query overrides
+            limit: Default maximum number of results per query
+            score_threshold: Default minimum similarity score
+            filter_conditions: Default metadata filters
+            with_payload: Payload selection
+            
+        Returns:
+            Scored points per query
+        """
+        # Embed all queries in one provider call
+        query_embeddings = self.embeddings.embed_documents([spec["query"] for spec in specs])
+        
+        if self._uses_hybrid(None):
+            # Fused hybrid queries, still sent as one batch request
+            query_requests = []
+            for spec, query_embedding in zip(specs, query_embeddings):
+                spec_limit = spec.get("limit", limit)
+                query_requests.append(
+                    models.QueryRequest(
+                        prefetch=self._build_hybrid_prefetch(
+                            spec["query"],
+                            query_embedding,
+                            self._build_filter(spec.get("filter_conditions", filter_conditions)),
+                            spec_limit,
+                            spec.get("score_threshold", score_threshold)
+                        ),
+                        query=models.FusionQuery(fusion=models.Fusion.RRF),
+                        limit=spec_limit,
+                        with_payload=with_payload,
+                        with_vector=False
+                    )
+                )
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=query_requests
+            )
+            return [response.points for response in responses]
+        
+        requests = [
+            models.QueryRequest(
+                query=query_embedding,
+                using=self.dense_vector_name,
+                filter=self._build_filter(spec.get("filter_conditions", filter_conditions)),
+                params=self.search_params,
+                limit=spec.get("limit", limit),
+                score_threshold=spec.get("score_threshold", score_threshold),
+                with_payload=with_payload,
+                with_vector=False
+            )
+            for spec, query_embedding in zip(specs, query_embeddings)
+        ]
+        
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=requests
+        )
+        return [response.points for response in responses]
+    
+    def search_candidates(
         self,
         query: str,
         limit: int = 10,
         score_threshold: float = 0.7,
         filter_conditions: Optional[Dict[str, Any]] = None,
+        search_mode: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Phase one of two-phase retrieval: ids, scores and routing keys only.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of candidates
+            score_threshold: Minimum similarity score
+            filter_conditions: Optional metadata filters
+            search_mode: 'dense' or 'hybrid' (defaults to hybrid when enabled)
+            
+        Returns:
+            Candidates with 'id', 'score' and routing 'metadata'
+        """
+        try:
+            points = self._search_points(
+                query, limit, score_threshold, filter_conditions,
+                with_payload=self._payload_selector(True, routing_only=True),
+                search_mode=search_mode
+            )
+            return self._format_candidates(points)
+        except Exception as e:
+            logger.error(f"Error searching candidates: {e}")
+            return []
+    
+    def fetch_contents(
+        self,
+        candidates: List[Dict[str, Any]],
         include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Phase two of two-phase retrieval: fetch full text for the final hits.
+        
+        Args:
+            candidates: Candidates from search_candidates, after any reranking or dedup
+            include_metadata: Whether to include full chunk metadata
+            
+        Returns:
+            Search results with content, in candidate order
+        """
+        point_ids = [candidate["id"] for candidate in candidates]
+        if not point_ids:
+            return []
+        
+        if self.content_store is not None:
+            payloads = self.content_store.get_many(point_ids)
+        else:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=True,
+                with_vectors=False
+            )
+            payloads = {str(record.id): record.payload or {} for record in records}
+        
+        results = []
+        for candidate in candidates:
+            payload = payloads.get(candidate["id"]) or candidate.get("metadata", {})
+            result_dict = {
+                "id": candidate["id"],
+                "score": candidate["score"],
+                "content": payload.get("content", ""),
+            }
+            if include_metadata:
+                result_dict["metadata"] = {
+                    key: value for key, value in payload.items()
+                    if key != "content"
+                }
+            results.append(result_dict)
+        return results
+    
+    def search_similar(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        search_mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar chunks based on query.
@@ -241,121 +1232,176 @@ class QdrantPolicyVectorStore:
         Args:
             query: Search query
             limit: Maximum number of results
-            score_threshold: Minimum similarity score
+            score_threshold: Minimum similarity score (dense candidates only in hybrid mode)
             filter_conditions: Optional metadata filters
             include_metadata: Whether to include chunk metadata
+            search_mode: 'dense' or 'hybrid' (defaults to hybrid when enabled);
+                hybrid results are scored by reciprocal rank fusion
             
         Returns:
             List of search results with scores and metadata
         """
+        cache_key = self._result_cache_key(
+            query, limit, score_threshold, filter_conditions,
+            include_metadata=include_metadata, search_mode=search_mode
+        )
+        cached = self._get_cached_results(cache_key)
+        if cached is not None:
+            logger.debug(f"Served {len(cached)} similar chunks from the result cache")
+            return cached
+        
         try:
-            # Generate query embedding
-            query_embedding = self.embeddings.embed_query(query)
-            
-            # Prepare search filters
-            search_filter = None
-            if filter_conditions:
-                conditions = []
-                for field, value in filter_conditions.items():
-                    if isinstance(value, list):
-                        # Handle list values (OR condition)
-                        for v in value:
-                            conditions.append(
-                                FieldCondition(key=field, match=MatchValue(value=v))
-                            )
-                    else:
-                        conditions.append(
-                            FieldCondition(key=field, match=MatchValue(value=value))
-                        )
-                
-                if conditions:
-                    search_filter = Filter(should=conditions) if len(conditions) > 1 else Filter(must=[conditions[0]])
-            
-            # Perform search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                query_filter=search_filter,
-                limit=limit,
-                score_threshold=score_threshold,
-                with_payload=include_metadata,
-                with_vectors=False
+            points = self._search_points(
+                query, limit, score_threshold, filter_conditions,
+                with_payload=self._payload_selector(include_metadata),
+                search_mode=search_mode
             )
             
-            # Format results
-            results = []
-            for result in search_results:
-                result_dict = {
-                    "score": result.score,
-                    "content": result.payload.get("content", "") if result.payload else "",
-                }
-                
-                if include_metadata and result.payload:
-                    result_dict["metadata"] = {
-                        key: value for key, value in result.payload.items()
-                        if key != "content"
-                    }
-                
-                results.append(result_dict)
+            # Slim payloads carry no text, so the hits are completed from the content store
+            if self.payload_mode == "slim":
+                results = self.fetch_contents(self._format_candidates(points), include_metadata)
+            else:
+                results = self._format_results(points, include_metadata)
             
             logger.debug(f"Found {len(results)} similar chunks for query")
+            self._cache_results(cache_key, results)
             return results
             
         except Exception as e:
             logger.error(f"Error searching similar chunks: {e}")
             return []
     
-    def search_by_document_type(
+    def _dense_vector_of(self, point: Any) -> List[float]:
+        """Extract the dense vector of a scored point."""
+        if isinstance(point.vector, dict):
+            return point.vector[self.dense_vector_name or DENSE_VECTOR_NAME]
+        return point.vector
+    
+    def search_diverse(
         self,
         query: str,
-        document_type: str,
         limit: int = 10,
-        score_threshold: float = 0.7
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        fetch_k: int = 40,
+        lambda_mult: float = 0.5,
+        max_per_section: Optional[int] = 2,
+        search_mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search within a specific document type.
+        Search with maximal marginal relevance over the top candidates.
         
         Args:
             query: Search query
-            document_type: Document type to filter by (e.g., 'gdpr', 'hipaa')
             limit: Maximum number of results
             score_threshold: Minimum similarity score
+            filter_conditions: Optional metadata filters
+            include_metadata: Whether to include chunk metadata
+            fetch_k: Number of candidates fetched (with vectors) for selection
+            lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+            max_per_section: Maximum number of chunks per section (None for no cap)
+            search_mode: 'dense' or 'hybrid' (defaults to hybrid when enabled)
             
         Returns:
-            List of search results
+            Selected search results, in selection order
         """
-        return self.search_similar(
-            query=query,
-            limit=limit,
-            score_threshold=score_threshold,
-            filter_conditions={"document_type": document_type}
+        cache_key = self._result_cache_key(
+            query, limit, score_threshold, filter_conditions,
+            include_metadata=include_metadata, search_mode=search_mode, mmr=[fetch_k, lambda_mult, max_per_section]
         )
+        cached = self._get_cached_results(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            query_embedding = self.embeddings.embed_query(query)
+            points = self._search_points(
+                query, max(fetch_k, limit), score_threshold, filter_conditions,
+                with_payload=self._payload_selector(True),
+                search_mode=search_mode,
+                with_vectors=True,
+                query_embedding=query_embedding
+            )
+            
+            selected = mmr_select(
+                query_embedding,
+                [self._dense_vector_of(point) for point in points],
+                k=limit,
+                lambda_mult=lambda_mult,
+                groups=[section_key(point.payload or {}) for point in points],
+                max_per_group=max_per_section
+            )
+            points = [points[i] for i in selected]
+            
+            if self.payload_mode == "slim":
+                results = self.fetch_contents(self._format_candidates(points), include_metadata)
+            else:
+                results = self._format_results(points, include_metadata)
+            
+            logger.debug(f"Selected {len(results)} diverse chunks from {max(fetch_k, limit)} candidates")
+            self._cache_results(cache_key, results)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in diverse search: {e}")
+            return []
     
-    def search_by_section_type(
+    def search_many(
         self,
-        query: str,
-        section_type: str,
+        queries: List[Union[str, Dict[str, Any]]],
         limit: int = 10,
-        score_threshold: float = 0.7
-    ) -> List[Dict[str, Any]]:
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[List[Dict[str, Any]]]:
         """
-        Search within a specific section type.
+        Search for several queries with one embedding call and one batch search.
+        
+        Each query is either a string or a dictionary with a 'query' key and
+        optional 'limit', 'score_threshold' and 'filter_conditions' overrides.
         
         Args:
-            query: Search query
-            section_type: Section type to filter by (e.g., 'recital', 'article', 'section')
-            limit: Maximum number of results
-            score_threshold: Minimum similarity score
+            queries: Queries to search for
+            limit: Default maximum number of results per query
+            score_threshold: Default minimum similarity score
+            filter_conditions: Default metadata filters
+            include_metadata: Whether to include chunk metadata
             
         Returns:
-            List of search results
+            One list of search results per query, in input order
         """
-        return self.search_similar(
-            query=query,
-            limit=limit,
-            score_threshold=score_threshold,
-            filter_conditions={"section_type": section_type}
-        )
+        if not queries:
+            return []
+        
+        try:
+            specs = [spec if isinstance(spec, dict) else {"query": spec} for spec in queries]
+            batch_points = self._search_points_many(
+                specs, limit, score_threshold, filter_conditions,
+                with_payload=self._payload_selector(include_metadata)
+            )
+            
+            if self.payload_mode == "slim":
+                # One phase-two fetch for the hits of all queries
+                candidate_lists = [self._format_candidates(points) for points in batch_points]
+                fetched = self.fetch_contents(
+                    [candidate for candidates in candidate_lists for candidate in candidates],
+                    include_metadata
+                )
+                results = []
+                offset = 0
+                for candidates in candidate_lists:
+                    results.append(fetched[offset:offset + len(candidates)])
+                    offset += len(candidates)
+            else:
+                results = [self._format_results(points, include_metadata) for points in batch_points]
+            
+            logger.debug(f"Batch search for {len(specs)} queries returned {sum(len(r) for r in results)} chunks")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            return [[] for _ in queries]
     
     def get_collection_info(self) -> Dict[str, Any]:
         """
@@ -366,14 +1412,29 @@ class QdrantPolicyVectorStore:
         """
         try:
             info = self.client.get_collection(self.collection_name)
-            return {
+            # Chunk counts leave out the version sentinel
+            sentinel = 1 if self._read_version_stamp() is not None else 0
+            collection_info = {
                 "name": self.collection_name,
                 "status": str(info.status) if hasattr(info, 'status') else 'active',
-                "vectors_count": getattr(info, 'vectors_count', 0),
+                "vectors_count": max((getattr(info, 'vectors_count', 0) or 0) - sentinel, 0),
                 "indexed_vectors_count": getattr(info, 'indexed_vectors_count', 0),
-                "points_count": getattr(info, 'points_count', 0),
+                "points_count": max((getattr(info, 'points_count', 0) or 0) - sentinel, 0),
                 "segments_count": getattr(info, 'segments_count', 0),
             }
+            if self.collection_profile:
+                collection_info["profile"] = self.collection_profile
+            if self.embedding_cache is not None:
+                collection_info["embedding_cache"] = self.embedding_cache.get_stats()
+            if self.result_cache is not None:
+                collection_info["result_cache"] = {
+                    **self.result_cache.get_stats(),
+                    "collection_version": self.collection_version,
+                }
+            collection_info["payload_mode"] = self.payload_mode
+            if self.content_store is not None:
+                collection_info["content_store_entries"] = self.content_store.count()
+            return collection_info
         except Exception as e:
             logger.error(f"Error getting collection info: {e}")
             return {
@@ -406,6 +1467,9 @@ class QdrantPolicyVectorStore:
                     )
                 )
             )
+            if self.content_store is not None:
+                self.content_store.clear()
+            self._bump_collection_version()
             logger.info(f"Cleared collection '{self.collection_name}'")
             return True
         except Exception as e:
@@ -421,6 +1485,9 @@ class QdrantPolicyVectorStore:
         """
         try:
             self.client.delete_collection(self.collection_name)
+            if self.content_store is not None:
+                self.content_store.clear()
+            self._bump_collection_version()
             logger.info(f"Deleted collection '{self.collection_name}'")
             return True
         except Exception as e:
@@ -0,0 +1,191 @@
+"""
+Cross-encoder reranking of retrieved policy chunks.
+
+This module rescores vector search candidates with a small CPU cross-encoder
+that reads query and chunk together. Scores are computed in batches, cached per
+(query, chunk id, content hash), and bounded by a per-request latency budget.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from .result_cache import RetrievalResultCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """
+    Batched, cached cross-encoder reranker running on CPU.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANKER_MODEL,
+        batch_size: int = 16,
+        max_length: int = 512,
+        num_threads: Optional[int] = None,
+        cache_size: int = 10000
+    ):
+        """
+        Load the cross-encoder.
+        
+        Args:
+            model_name: Hugging Face model name or local path
+            batch_size: Number of (query, chunk) pairs per forward pass
+            max_length: Maximum number of tokens per pair
+            num_threads: Number of CPU threads for inference (None keeps the torch default)
+            cache_size: Number of (query, chunk id, content hash) scores kept in memory
+        """
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._torch = torch
+        
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        
+        self._scores: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.budget_fallbacks = 0
+        
+        logger.info(f"Loaded cross-encoder {model_name}")
+    
+    @staticmethod
+    def _candidate_key(query: str, candidate: Dict[str, Any]) -> Tuple[str, str, str]:
+        """
+        Score cache key of a candidate chunk.
+        
+        Point ids survive amendments of a chunk, so the key includes the stored
+        content hash, or a hash of the text when results carry no metadata.
+        """
+        metadata = candidate.get("metadata") or {}
+        candidate_id = str(candidate.get("id") or metadata.get("chunk_id", ""))
+        content_hash = metadata.get("content_hash") or hashlib.sha1(
+            candidate.get("content", "").encode("utf-8")
+        ).hexdigest()
+        return query, candidate_id, content_hash
+    
+    def _score_batch(self, query: str, texts: List[str]) -> List[float]:
+        """Score one batch of (query, text) pairs."""
+        torch = self._torch
+        encoded = self.tokenizer(
+            [query] * len(texts),
+            texts,
+            padding=True,
+            truncation="only_second",
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        with torch.inference_mode():
+            logits = self.model(**encoded).logits
+        # Single-logit relevance models; otherwise use the positive class
+        if logits.shape[-1] == 1:
+            return logits[:, 0].tolist()
+        return logits[:, -1].tolist()
+    
+    def _remember(self, key: Tuple[str, str, str], score: float):
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+    
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        top_k: int,
+        latency_budget_ms: Optional[float] = None,
+        fallback_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank search results and keep the best ones.
+        
+        Candidates are scored in vector order. If the latency budget runs out
+        before every candidate is scored, the vector order is kept instead and
+        every returned result is marked with 'rerank_fallback'.
+        
+        Args:
+            query: Search query
+            candidates: Search results in vector order
+            top_k: Number of results to keep
+            latency_budget_ms: Time budget for scoring (None means unbounded)
+            fallback_k: Number of results kept in vector order when the budget
+                runs out (default: top_k)
+        
+        Returns:
+            Best results, each with a 'rerank_score' when reranking completed
+        """
+        start = time.perf_counter()
+        normalized_query = RetrievalResultCache.normalize_query(query)
+        
+        scores: List[Optional[float]] = []
+        with self._lock:
+            for candidate in candidates:
+                score = self._scores.get(self._candidate_key(normalized_query, candidate))
+                scores.append(score)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        self.cache_hits += len(candidates) - len(missing)
+        self.cache_misses += len(missing)
+        
+        for offset in range(0, len(missing), self.batch_size):
+            if latency_budget_ms is not None and (time.perf_counter() - start) * 1000 >= latency_budget_ms:
+                self.budget_fallbacks += 1
+                logger.info(
+                    f"Rerank budget of {latency_budget_ms:.0f} ms exhausted after "
+                    f"{offset}/{len(missing)} uncached candidates; keeping vector order"
+                )
+                kept = candidates[:top_k if fallback_k is None else fallback_k]
+                return [{**candidate, "rerank_fallback": True} for candidate in kept]
+            
+            batch = missing[offset:offset + self.batch_size]
+            batch_scores = self._score_batch(query, [candidates[i].get("content", "") for i in batch])
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+                self._remember(self._candidate_key(normalized_query, candidates[i]), score)
+        
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda item: (-item[0], item[1]))
+        results = []
+        for score, i in ranked[:top_k]:
+            result = dict(candidates[i])
+            result["rerank_score"] = score
+            results.append(result)
+        
+        logger.debug(f"Reranked {len(candidates)} candidates in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get reranker statistics.
+        
+        Returns:
+            Score cache counters and budget fallbacks
+        """
+        total = self.cache_hits + self.cache_misses
+        return {
+            "model": self.model_name,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / total if total else 0.0,
+            "cached_scores": len(self._scores),
+            "budget_fallbacks": self.budget_fallbacks,
+        }
@@ -0,0 +1,156 @@
+"""
+Retrieval result cache for policy vector stores.
+
+This module provides an LRU cache with time-to-live expiry for search results,
+keyed by the normalized query, search parameters and the collection version the
+results were computed against. A write to the collection bumps its version, so
+results computed before the write can never be served afterwards. Writes made
+through another process or store object are detected from the write stamp the
+stores keep in the collection itself, which is read before the cache is used.
+"""
+
+import re
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RetrievalResultCache:
+    """
+    Thread-safe LRU + TTL cache of search results.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        """
+        Initialize the result cache.
+        
+        Args:
+            max_entries: Maximum number of cached result lists
+            ttl_seconds: Seconds a cached result list stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize case and whitespace so trivially different queries share an entry."""
+        return re.sub(r'\s+', ' ', query).strip().lower()
+    
+    def make_key(
+        self,
+        version: int,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+        filter_conditions: Optional[Dict[str, Any]],
+        **options: Any
+    ) -> Tuple:
+        """
+        Build the cache key for a search.
+        
+        Args:
+            version: Collection version the search runs against
+            query: Search query
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score
+            filter_conditions: Metadata filters
+            **options: Further arguments that change the results
+        
+        Returns:
+            Hashable cache key
+        """
+        return (
+            version,
+            self.normalize_query(query),
+            limit,
+            score_threshold,
+            json.dumps(filter_conditions or {}, sort_keys=True, default=str),
+            json.dumps(options, sort_keys=True, default=str),
+        )
+    
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results.
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Copy of the cached results, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers may annotate results, so never hand out the cached objects
+        return copy.deepcopy(results)
+    
+    def put(self, key: Tuple, results: List[Dict[str, Any]]):
+        """
+        Cache search results.
+        
+        Args:
+            key: Cache key from make_key
+            results: Search results to cache
+        """
+        if self.max_entries <= 0:
+            return
+        
+        results = copy.deepcopy(results)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Hit/miss counters and the number of cached entries
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
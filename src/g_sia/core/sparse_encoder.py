@@ -0,0 +1,164 @@
+"""
+BM25 sparse lexical encoder for policy documents.
+
+This module turns chunk text into sparse term-weight vectors for hybrid retrieval.
+Tokenization keeps legal citations such as "§ 164.512", "Article 9" or "Recital 26"
+as single terms so exact references match lexically even when dense embeddings
+rank them poorly.
+"""
+
+import re
+import math
+import zlib
+import logging
+from collections import Counter
+from typing import List, Dict, Tuple, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (term indices, term weights)
+SparseVectorData = Tuple[List[int], List[float]]
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to
+was were which with shall may any such other than not be been being into under
+""".split())
+
+# Structural references, e.g. "Article 9", "Recital 26", "Section 164.512", "Art. 6(1)(a)"
+REFERENCE_PATTERN = re.compile(
+    r'\b(article|art\.?|recital|chapter|section|part|subpart|paragraph|title)\s+'
+    r'(\d+(?:\.\d+)*(?:\([0-9a-z]+\))*|[ivxlcdm]+|[a-z])(?!\w)'
+)
+# Section sign citations, e.g. "§ 164.512(b)", "§§ 160.101"
+SECTION_SIGN_PATTERN = re.compile(r'§+\s*(\d+(?:\.\d+)*)((?:\([0-9a-z]+\))*)')
+# Plain words and numbers (keeping dotted section numbers together)
+WORD_PATTERN = re.compile(r'\d+(?:\.\d+)+|[a-z]+|\d+')
+
+REFERENCE_ALIASES = {"art": "article", "art.": "article"}
+
+
+class BM25SparseEncoder:
+    """
+    Corpus-fitted BM25 encoder producing sparse vectors with hashed term ids.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the encoder.
+        
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.document_count = 0
+        self.average_length = 0.0
+        self.document_frequency: Dict[str, int] = {}
+    
+    @staticmethod
+    def term_id(term: str) -> int:
+        """Map a term to a stable sparse vector index."""
+        return zlib.crc32(term.encode("utf-8")) & 0x7FFFFFFF
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Split text into lexical terms, emitting citations as single terms.
+        
+        Args:
+            text: Text to tokenize
+        
+        Returns:
+            List of terms
+        """
+        text = text.lower()
+        terms = []
+        
+        for match in REFERENCE_PATTERN.finditer(text):
+            kind = REFERENCE_ALIASES.get(match.group(1), match.group(1))
+            reference = match.group(2)
+            terms.append(f"{kind}:{reference}")
+            # Also index the unqualified number, e.g. "article:6(1)(a)" -> "article:6"
+            base = reference.split("(", 1)[0]
+            if base != reference:
+                terms.append(f"{kind}:{base}")
+        
+        for match in SECTION_SIGN_PATTERN.finditer(text):
+            terms.append(f"§{match.group(1)}")
+            if match.group(2):
+                terms.append(f"§{match.group(1)}{match.group(2)}")
+        
+        terms.extend(
+            word for word in WORD_PATTERN.findall(text)
+            if word not in STOPWORDS and (len(word) > 1 or word.isdigit())
+        )
+        return terms
+    
+    def fit(self, texts: Iterable[str]) -> "BM25SparseEncoder":
+        """
+        Collect document frequencies and average length from a corpus.
+        
+        Args:
+            texts: Corpus texts
+        
+        Returns:
+            The fitted encoder
+        """
+        document_frequency: Counter = Counter()
+        total_length = 0
+        count = 0
+        for text in texts:
+            terms = self.tokenize(text)
+            document_frequency.update(set(terms))
+            total_length += len(terms)
+            count += 1
+        
+        self.document_count = count
+        self.average_length = total_length / count if count else 0.0
+        self.document_frequency = dict(document_frequency)
+        logger.debug(f"Fitted BM25 encoder on {count} documents, {len(self.document_frequency)} terms")
+        return self
+    
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency of a term."""
+        df = self.document_frequency.get(term, 0)
+        return math.log(1.0 + (self.document_count - df + 0.5) / (df + 0.5))
+    
+    def encode_document(self, text: str) -> SparseVectorData:
+        """
+        Encode a document with BM25 term weights.
+        
+        Args:
+            text: Document text
+        
+        Returns:
+            Tuple of (term indices, weights)
+        """
+        terms = self.tokenize(text)
+        if not terms:
+            return [], []
+        
+        length_norm = 1.0 - self.b + self.b * (len(terms) / self.average_length if self.average_length else 1.0)
+        weights: Dict[int, float] = {}
+        for term, tf in Counter(terms).items():
+            weight = self.idf(term) * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+            index = self.term_id(term)
+            weights[index] = weights.get(index, 0.0) + weight
+        
+        indices = sorted(weights)
+        return indices, [weights[index] for index in indices]
+    
+    def encode_query(self, text: str) -> SparseVectorData:
+        """
+        Encode a query as a binary bag of terms (IDF is already in document weights).
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Tuple of (term indices, weights)
+        """
+        indices = sorted({self.term_id(term) for term in self.tokenize(text)})
+        return indices, [1.0] * len(indices)
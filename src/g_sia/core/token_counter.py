@@ -0,0 +1,165 @@
+"""
+BPE token counting for chunk sizing and prompt packing.
+
+This module wraps a local tiktoken encoding with an LRU cache of per-text counts.
+Chunk packing sums the counts of sentences, which repeat across re-indexing runs
+and overlaps, so most lookups are cache hits.
+
+tiktoken downloads an encoding the first time it is used. When the encoding
+cannot be loaded (offline, no tiktoken cache), the counter falls back to the
+1.3 tokens-per-word estimate with a warning.
+"""
+
+import re
+import logging
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rough approximation used without a BPE encoding: 1.3 tokens per word for English
+TOKENS_PER_WORD = 1.3
+_WORD_PATTERN = re.compile(r'\S+')
+
+
+class TokenCounter:
+    """
+    Cached BPE token counter.
+    """
+    
+    def __init__(
+        self,
+        encoding_name: str = "cl100k_base",
+        cache_size: int = 65536,
+        max_cached_chars: int = 2000
+    ):
+        """
+        Initialize the counter (the encoding is loaded on first use).
+        
+        Args:
+            encoding_name: tiktoken encoding (cl100k_base matches the OpenAI
+                embedding and chat models used by the agent)
+            cache_size: Number of per-text counts kept in the LRU cache
+            max_cached_chars: Longer texts (whole sections, prompts) are counted
+                without caching so the cache stays sentence-sized
+        """
+        self.encoding_name = encoding_name
+        self.max_cached_chars = max_cached_chars
+        self._encoding = None
+        # Set when the encoding could not be loaded and counts are word estimates
+        self.fallback = False
+        self._lock = threading.Lock()
+        self._count_cached = lru_cache(maxsize=cache_size)(self._count)
+    
+    @property
+    def encoding(self):
+        """The loaded tiktoken encoding, or None if it is unavailable."""
+        if self._encoding is None and not self.fallback:
+            with self._lock:
+                if self._encoding is None and not self.fallback:
+                    try:
+                        import tiktoken
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                        logger.info(f"Loaded {self.encoding_name} tokenizer for token accounting")
+                    except Exception as e:
+                        self.fallback = True
+                        logger.warning(
+                            f"Could not load the {self.encoding_name} tokenizer ({e}); "
+                            f"estimating {TOKENS_PER_WORD} tokens per word instead"
+                        )
+        return self._encoding
+    
+    def _count(self, text: str) -> int:
+        encoding = self.encoding
+        if encoding is None:
+            return int(len(text.split()) * TOKENS_PER_WORD)
+        # Special-token text in documents is counted as ordinary text
+        return len(encoding.encode_ordinary(text))
+    
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+        
+        Args:
+            text: Text to count
+        
+        Returns:
+            Number of BPE tokens (estimated if the encoding is unavailable)
+        """
+        if len(text) > self.max_cached_chars:
+            return self._count(text)
+        return self._count_cached(text)
+    
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        Count the tokens of many texts.
+        
+        Args:
+            texts: Texts to count
+        
+        Returns:
+            Token count of each text, in input order
+        """
+        return [self.count(text) for text in texts]
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut a text to at most max_tokens tokens.
+        
+        Args:
+            text: Text to cut
+            max_tokens: Maximum number of tokens to keep
+        
+        Returns:
+            The text itself if it fits, otherwise its longest fitting prefix
+        """
+        encoding = self.encoding
+        if encoding is None:
+            # Keep as many words as the estimate allows, with their original spacing
+            max_words = int(max(0, max_tokens) / TOKENS_PER_WORD)
+            words = list(_WORD_PATTERN.finditer(text))
+            if len(words) <= max_words:
+                return text
+            return text[:words[max_words - 1].end()] if max_words else ""
+        
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max(0, max_tokens)])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        info = self._count_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "encoding": self.encoding_name,
+            "fallback": self.fallback,
+            "cache_entries": info.currsize,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter(**options: Any) -> TokenCounter:
+    """
+    Get the process-wide token counter, creating it on first call.
+    
+    Args:
+        **options: TokenCounter options, applied when the counter is created
+    
+    Returns:
+        Shared token counter
+    """
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            _counter = TokenCounter(**options)
+        return _counter
@@ -0,0 +1,634 @@
+"""
+Backend interface for policy vector stores.
+
+This module defines the contract shared by the Qdrant server store and the
+local FAISS store, together with the chunk-to-point helpers both use.
+"""
+
+import json
+import time
+import uuid
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable, Set
+
+from .content_aware_chunker import ContentChunk
+from .document_parser import DocumentSection
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+from .embedding_providers import create_embedding_provider
+from .result_cache import RetrievalResultCache
+from .diversification import section_key
+from .ingest_pipeline import ProgressEvent, ProgressCallback, batched
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic point ids derived from chunk identity
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "g-sia/policy-chunks")
+
+# (section metadata, first chunk index, last chunk index) of a neighbour lookup
+NeighbourRange = Tuple[Dict[str, Any], int, int]
+
+
+def section_fingerprint(section: DocumentSection) -> str:
+    """
+    Hash the parts of a section that its chunks are built from.
+    
+    Args:
+        section: Document section
+    
+    Returns:
+        Hex sha256 digest, stored with every chunk of the section as 'section_hash'
+    """
+    digest = hashlib.sha256()
+    for part in (section.section_type, section.section_id, section.title or "", section.parent_section or "", section.content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def join_chunk_texts(texts: List[str]) -> str:
+    """
+    Join consecutive chunks of a section, dropping the sentence overlap between them.
+    
+    Args:
+        texts: Chunk contents in chunk_index order
+    
+    Returns:
+        Contiguous passage text
+    """
+    passage = ""
+    for text in texts:
+        if not passage:
+            passage = text
+            continue
+        # Chunks repeat the last sentence(s) of their predecessor; cut the longest such prefix
+        overlap = 0
+        for end in range(min(len(passage), len(text)), 0, -1):
+            if text[end - 1] in ".;:!?" and passage.endswith(text[:end]):
+                overlap = end
+                break
+        passage = f"{passage} {text[overlap:].lstrip()}" if overlap < len(text) else passage
+    return passage
+
+
+class PolicyVectorStore(ABC):
+    """
+    Abstract vector store for policy document chunks.
+    """
+    
+    collection_name: str
+    last_ingest_stats: Optional[Dict[str, Any]] = None
+    embedding_cache: Optional[EmbeddingCache] = None
+    result_cache: Optional[RetrievalResultCache] = None
+    # Bumped by every write so cached results never outlive the data they came from
+    collection_version: int = 0
+    # Write stamp last seen in the shared collection, see _sync_collection_version
+    _version_stamp: Optional[str] = None
+    
+    def _init_embeddings(
+        self,
+        embedding_model: Optional[str],
+        embedding_cache_dir: Optional[str],
+        embedding_cache_memory_size: int,
+        embedding_cache_max_entries: int,
+        embedding_provider: str = "openai",
+        embedding_options: Optional[Dict[str, Any]] = None,
+        vector_size: Optional[int] = None
+    ):
+        """
+        Initialize embeddings, served through the content-hash cache when enabled.
+        
+        The vector size is taken from the provider unless given explicitly.
+        """
+        self.embeddings, cache_name, dimension = create_embedding_provider(
+            embedding_provider, embedding_model, **(embedding_options or {})
+        )
+        self.embedding_provider = embedding_provider
+        self.embedding_model_name = cache_name
+        self.vector_size = vector_size or dimension
+        if self.vector_size is None:
+            raise ValueError(f"Unknown vector size for embedding model {cache_name}; pass vector_size")
+        
+        self.embedding_cache = None
+        if embedding_cache_dir:
+            self.embedding_cache = EmbeddingCache(
+                cache_dir=embedding_cache_dir,
+                model_name=cache_name,
+                memory_size=embedding_cache_memory_size,
+                max_disk_entries=embedding_cache_max_entries
+            )
+            self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
+    
+    def _init_result_cache(self, result_cache_size: int, result_cache_ttl: float):
+        """Initialize the retrieval result cache (disabled when the size is 0)."""
+        self.collection_version = 0
+        self.result_cache = None
+        if result_cache_size > 0:
+            self.result_cache = RetrievalResultCache(
+                max_entries=result_cache_size,
+                ttl_seconds=result_cache_ttl
+            )
+    
+    def _read_version_stamp(self) -> Optional[str]:
+        """Read the stamp left in the collection by its last writer (None if there is none)."""
+        return None
+    
+    def _write_version_stamp(self, stamp: str):
+        """Store a new write stamp in the collection, where other processes can see it."""
+    
+    def _on_external_write(self):
+        """React to a write made by another process or store object."""
+    
+    def _bump_collection_version(self):
+        """Invalidate cached results after the collection changed."""
+        self.collection_version += 1
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        
+        # Random stamps cannot collide when several writers bump concurrently
+        stamp = uuid.uuid4().hex
+        try:
+            self._write_version_stamp(stamp)
+            self._version_stamp = stamp
+        except Exception as e:
+            logger.warning(f"Could not store the version stamp of '{self.collection_name}': {e}")
+    
+    def _sync_collection_version(self) -> bool:
+        """
+        Pick up writes made through other processes or store objects.
+        
+        The collection version counter is per instance, so the write stamp
+        stored in the collection is compared with the last one seen before
+        cached results are served.
+        
+        Returns:
+            False when the stamp could not be read and the cache must be bypassed
+        """
+        try:
+            stamp = self._read_version_stamp()
+        except Exception as e:
+            logger.warning(f"Could not read the version stamp of '{self.collection_name}': {e}")
+            return False
+        
+        if stamp != self._version_stamp:
+            self._version_stamp = stamp
+            self.collection_version += 1
+            if self.result_cache is not None:
+                self.result_cache.clear()
+            self._on_external_write()
+        return True
+    
+    def _result_cache_key(
+        self,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+        filter_conditions: Optional[Dict[str, Any]],
+        **options: Any
+    ) -> Optional[Tuple]:
+        """Build the result cache key for a search, or None when caching is disabled."""
+        if self.result_cache is None or not self._sync_collection_version():
+            return None
+        return self.result_cache.make_key(
+            self.collection_version, query, limit, score_threshold, filter_conditions, **options
+        )
+    
+    def _get_cached_results(self, cache_key: Optional[Tuple]) -> Optional[List[Dict[str, Any]]]:
+        """Look up cached search results."""
+        if cache_key is None:
+            return None
+        return self.result_cache.get(cache_key)
+    
+    def _cache_results(self, cache_key: Optional[Tuple], results: List[Dict[str, Any]]):
+        """Cache search results computed for the given key."""
+        if cache_key is not None and self.result_cache is not None:
+            self.result_cache.put(cache_key, results)
+    
+    def _prepare_chunk_payload(self, chunk: ContentChunk) -> Dict[str, Any]:
+        """
+        Prepare chunk metadata as point payload.
+        
+        Args:
+            chunk: Content chunk to prepare
+        
+        Returns:
+            Payload dictionary
+        """
+        payload = {
+            # Chunk information
+            "chunk_id": chunk.chunk_id,
+            "content": chunk.content,
+            "chunk_type": chunk.chunk_type,
+            "chunk_index": chunk.chunk_index,
+            "word_count": chunk.word_count,
+            
+            # Section information
+            "section_type": chunk.source_section.section_type,
+            "section_id": chunk.source_section.section_id,
+            "section_title": chunk.source_section.title or "",
+            "parent_section": chunk.source_section.parent_section or "",
+            # Lets section-level reindexing find sections whose text changed
+            "section_hash": section_fingerprint(chunk.source_section),
+            
+            # Document metadata
+            **chunk.metadata
+        }
+        
+        # Context overlaps are only stored when the chunker produced them
+        if chunk.overlap_with_previous:
+            payload["overlap_with_previous"] = chunk.overlap_with_previous
+        if chunk.overlap_with_next:
+            payload["overlap_with_next"] = chunk.overlap_with_next
+        if chunk.aliases:
+            payload["aliases"] = chunk.aliases
+        
+        # Ensure all values are JSON serializable
+        for key, value in payload.items():
+            if value is None:
+                payload[key] = ""
+            elif isinstance(value, (int, float, str, bool, list, dict)):
+                continue
+            else:
+                payload[key] = str(value)
+        
+        return payload
+    
+    @staticmethod
+    def make_point_id(chunk: ContentChunk) -> str:
+        """
+        Build a stable point id from the chunk's position in the corpus.
+        
+        Args:
+            chunk: Content chunk
+        
+        Returns:
+            UUID string derived from document, section type, section id and chunk index
+        """
+        identity = ":".join([
+            str(chunk.metadata.get("document_type", "")),
+            chunk.source_section.section_type,
+            chunk.source_section.section_id,
+            str(chunk.chunk_index),
+        ])
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, identity))
+    
+    @staticmethod
+    def _get_embedding_text(chunk: ContentChunk) -> str:
+        """Build the text that is embedded for a chunk."""
+        # Use the chunk content with context for embedding
+        content = chunk.content
+        if chunk.source_section.title:
+            content = f"{chunk.source_section.title}\n\n{content}"
+        return content
+    
+    @staticmethod
+    def _compute_content_hash(embedding_text: str, payload: Dict[str, Any]) -> str:
+        """Hash the embedded text together with the stored payload."""
+        digest = hashlib.sha256()
+        digest.update(embedding_text.encode("utf-8"))
+        digest.update(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _prepare_points(self, chunks: List[ContentChunk]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """
+        Prepare ids, embedding texts and payloads (with content hash) for chunks.
+        
+        Args:
+            chunks: Content chunks to prepare
+        
+        Returns:
+            Mapping of point id to (embedding text, payload)
+        """
+        prepared = {}
+        for chunk in chunks:
+            point_id = self.make_point_id(chunk)
+            if point_id in prepared:
+                logger.warning(f"Duplicate chunk identity for {chunk.chunk_id}, keeping the last one")
+            embedding_text = self._get_embedding_text(chunk)
+            payload = self._prepare_chunk_payload(chunk)
+            payload["content_hash"] = self._compute_content_hash(embedding_text, payload)
+            prepared[point_id] = (embedding_text, payload)
+        return prepared
+    
+    @abstractmethod
+    def _fetch_section_chunks(self, ranges: List[NeighbourRange]) -> Dict[str, Dict[int, str]]:
+        """
+        Fetch chunk contents of sections by chunk index range.
+        
+        Args:
+            ranges: Neighbour lookups
+        
+        Returns:
+            Mapping of section key to {chunk index: content}
+        """
+    
+    @abstractmethod
+    def get_section_hashes(self, document_types: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Fetch the section hash of every indexed section.
+        
+        Args:
+            document_types: Document types to scan (None: all)
+        
+        Returns:
+            Mapping of section key ('gdpr:article:6') to section hash
+            ('' for points indexed before section hashes were stored); sections
+            folded into other chunks as near-duplicate aliases are included
+        """
+    
+    @staticmethod
+    def _section_hashes_from_payloads(payloads: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        """Section key -> section hash over point payloads, including sections folded in as aliases."""
+        hashes = {}
+        aliased = {}
+        for payload in payloads:
+            key = section_key(payload)
+            section_hash = payload.get("section_hash", "")
+            # A section whose points disagree (an interrupted update) is treated as changed
+            hashes[key] = section_hash if hashes.get(key, section_hash) == section_hash else ""
+            for alias in payload.get("aliases") or ():
+                aliased.setdefault(alias["section_key"], alias.get("section_hash", ""))
+        
+        # Sections that have points of their own are authoritative
+        for key, section_hash in aliased.items():
+            hashes.setdefault(key, section_hash)
+        return hashes
+    
+    @abstractmethod
+    def _delete_section_points(self, section_keys: Iterable[str], keep_ids: Iterable[str]) -> int:
+        """
+        Delete the points of the given sections, except the kept ones.
+        
+        Args:
+            section_keys: Section keys of the sections to clean up
+            keep_ids: Point ids that were just written and stay
+        
+        Returns:
+            Number of deleted points
+        """
+    
+    @abstractmethod
+    def get_alias_sections(self, section_keys: Iterable[str]) -> Set[str]:
+        """
+        Find the sections folded into the chunks of the given sections as near-duplicates.
+        
+        Args:
+            section_keys: Keys of the canonical sections
+        
+        Returns:
+            Section keys recorded in the aliases of their points
+        """
+    
+    def replace_sections(self, chunks: List[ContentChunk], section_keys: Iterable[str], batch_size: int = 100) -> bool:
+        """
+        Replace the indexed chunks of whole sections.
+        
+        New chunks are written before the leftover points of their sections are
+        deleted, so searches keep finding every section during the update.
+        
+        Args:
+            chunks: New chunks of the changed sections
+            section_keys: Keys of changed and removed sections; points of these
+                sections that are not among the new chunks are deleted
+            batch_size: Number of chunks per embedding batch
+        
+        Returns:
+            Success status
+        """
+        if chunks and not self.add_chunks(chunks, batch_size=batch_size):
+            return False
+        keys = set(section_keys) | {section_key(chunk.metadata) for chunk in chunks}
+        try:
+            self._delete_section_points(keys, [self.make_point_id(chunk) for chunk in chunks])
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting replaced section points: {e}")
+            return False
+        finally:
+            self._bump_collection_version()
+    
+    def expand_with_neighbours(self, results: List[Dict[str, Any]], window: int = 1) -> List[Dict[str, Any]]:
+        """
+        Expand search hits with adjacent chunks of their sections into passages.
+        
+        Hits whose windows touch within one section are merged into a single
+        passage that keeps the best score. Results without chunk metadata are
+        returned unchanged.
+        
+        Args:
+            results: Search results (with metadata)
+            window: Number of chunks to add on each side of a hit
+        
+        Returns:
+            Passages ordered by their best hit score
+        """
+        if window <= 0 or not results:
+            return results
+        
+        # Group hits by section, keeping first-seen order
+        sections: Dict[str, List[Dict[str, Any]]] = {}
+        passthrough = []
+        for result in results:
+            metadata = result.get("metadata") or {}
+            if "chunk_index" not in metadata:
+                passthrough.append(result)
+                continue
+            sections.setdefault(section_key(metadata), []).append(result)
+        
+        ranges = []
+        for hits in sections.values():
+            for hit in hits:
+                chunk_index = int(hit["metadata"]["chunk_index"])
+                ranges.append((hit["metadata"], max(0, chunk_index - window), chunk_index + window))
+        section_chunks = self._fetch_section_chunks(ranges)
+        
+        passages = []
+        for key, hits in sections.items():
+            chunks = section_chunks.get(key, {})
+            for hit in hits:
+                chunks.setdefault(int(hit["metadata"]["chunk_index"]), hit.get("content", ""))
+            
+            # Merge touching windows into contiguous spans
+            spans: List[List[Any]] = []
+            for hit in sorted(hits, key=lambda h: int(h["metadata"]["chunk_index"])):
+                chunk_index = int(hit["metadata"]["chunk_index"])
+                start, end = max(0, chunk_index - window), chunk_index + window
+                if spans and start <= spans[-1][1] + 1:
+                    spans[-1][1] = max(spans[-1][1], end)
+                    spans[-1][2].append(hit)
+                else:
+                    spans.append([start, end, [hit]])
+            
+            for start, end, span_hits in spans:
+                best = max(span_hits, key=lambda h: h.get("score", 0.0))
+                indices = [i for i in sorted(chunks) if start <= i <= end]
+                passage = dict(best)
+                passage["content"] = join_chunk_texts([chunks[i] for i in indices])
+                passage["metadata"] = {**best["metadata"], "chunk_indices": indices}
+                passages.append(passage)
+        
+        passages.extend(passthrough)
+        passages.sort(key=lambda p: p.get("score", 0.0), reverse=True)
+        return passages
+    
+    @abstractmethod
+    def add_chunks(self, chunks: List[ContentChunk], batch_size: int = 100, incremental: bool = False) -> bool:
+        """Add chunks to the vector store."""
+    
+    def add_chunk_stream(
+        self,
+        chunks: Iterable[ContentChunk],
+        batch_size: int = 100,
+        incremental: bool = False,
+        progress: Optional[ProgressCallback] = None
+    ) -> bool:
+        """
+        Add a stream of chunks batch by batch, holding one batch at a time.
+        
+        Stale points can only be found once the whole stream has been seen, so
+        backends without a streaming override collect it for incremental updates.
+        
+        Args:
+            chunks: Content chunks (consumed lazily)
+            batch_size: Number of chunks per add_chunks call
+            incremental: Only embed new or changed chunks and drop removed ones
+            progress: Optional callback receiving 'upload' events
+        
+        Returns:
+            Success status
+        """
+        if incremental:
+            return self.add_chunks(list(chunks), batch_size=batch_size, incremental=True)
+        
+        start = time.perf_counter()
+        added = 0
+        for batch in batched(chunks, batch_size):
+            if not self.add_chunks(batch, batch_size=batch_size):
+                return False
+            added += len(batch)
+            if progress is not None:
+                progress(ProgressEvent("upload", added, time.perf_counter() - start))
+        return True
+    
+    @abstractmethod
+    def search_similar(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Search for similar chunks based on query."""
+    
+    @abstractmethod
+    def search_diverse(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        fetch_k: int = 40,
+        lambda_mult: float = 0.5,
+        max_per_section: Optional[int] = 2
+    ) -> List[Dict[str, Any]]:
+        """Search with maximal marginal relevance, capped per section."""
+    
+    @abstractmethod
+    def search_many(
+        self,
+        queries: List[Union[str, Dict[str, Any]]],
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries at once."""
+    
+    @abstractmethod
+    def get_collection_info(self) -> Dict[str, Any]:
+        """Get information about the collection."""
+    
+    @abstractmethod
+    def clear_collection(self) -> bool:
+        """Clear all points from the collection."""
+    
+    @abstractmethod
+    def delete_collection(self) -> bool:
+        """Delete the entire collection."""
+    
+    def search_by_document_type(
+        self,
+        query: str,
+        document_type: str,
+        limit: int = 10,
+        score_threshold: float = 0.7
+    ) -> List[Dict[str, Any]]:
+        """
+        Search within a specific document type.
+        
+        Args:
+            query: Search query
+            document_type: Document type to filter by (e.g., 'gdpr', 'hipaa')
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score
+        
+        Returns:
+            List of search results
+        """
+        return self.search_similar(
+            query=query,
+            limit=limit,
+            score_threshold=score_threshold,
+            filter_conditions={"document_type": document_type}
+        )
+    
+    def search_by_section_type(
+        self,
+        query: str,
+        section_type: str,
+        limit: int = 10,
+        score_threshold: float = 0.7
+    ) -> List[Dict[str, Any]]:
+        """
+        Search within a specific section type.
+        
+        Args:
+            query: Search query
+            section_type: Section type to filter by (e.g., 'recital', 'article', 'section')
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score
+        
+        Returns:
+            List of search results
+        """
+        return self.search_similar(
+            query=query,
+            limit=limit,
+            score_threshold=score_threshold,
+            filter_conditions={"section_type": section_type}
+        )
+
+
+def create_vector_store(backend: str = "qdrant", **kwargs) -> PolicyVectorStore:
+    """
+    Create a policy vector store for the given backend.
+    
+    Args:
+        backend: 'qdrant' (server) or 'faiss' (local, memory-mapped)
+        **kwargs: Backend-specific constructor arguments
+    
+    Returns:
+        Vector store instance
+    """
+    if backend == "qdrant":
+        from .qdrant_vector_store import QdrantPolicyVectorStore
+        return QdrantPolicyVectorStore(**kwargs)
+    if backend == "faiss":
+        from .faiss_vector_store import FaissPolicyVectorStore
+        return FaissPolicyVectorStore(**kwargs)
+    raise ValueError(f"Unknown vector store backend: {backend}")
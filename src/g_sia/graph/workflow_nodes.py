@@ -171,7 +171,11 @@ class WorkflowNodes:
             # Re-check policy compliance of rewritten query
             logger.info(f"[{state['workflow_id']}] Re-checking policy compliance of rewritten query...")
             
-            rewrite_policy_check = self.policy_agent.get_policy_verdict(updated_state["rewritten_query"])
+            # Passages behind the original verdict are retrieved in the same batched round trip
+            rewrite_policy_check = self.policy_agent.get_policy_verdict(
+                updated_state["rewritten_query"],
+                context_queries=[state["original_query"]]
+            )
             
             if rewrite_policy_check and rewrite_policy_check.get("verdict") == "BLOCK":
                 return set_error(updated_state, 
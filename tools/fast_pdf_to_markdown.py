@@ -13,6 +13,11 @@ import PyPDF2
 import re
 from typing import List
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from g_sia.core.build_manifest import BuildManifest
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -151,6 +156,17 @@ def main():
         type=str,
         help="Process single PDF file"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=".cache/build",
+        help="Build manifest directory; PDFs whose markdown is up to date are skipped"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert every PDF even if its markdown is up to date"
+    )
     
     args = parser.parse_args()
     
@@ -163,6 +179,16 @@ def main():
     
     # Initialize converter
     converter = FastPDFToMarkdown()
+    manifest = BuildManifest(args.cache_dir)
+    # The extraction code is part of the stage, so editing it re-converts every PDF
+    convert_params = {"converter": "pypdf2", "code": manifest.file_digest(__file__)}
+    
+    def convert(pdf_path: Path, output_path: Path) -> bool:
+        return manifest.run_file_stage(
+            "pdf_to_markdown", str(pdf_path), str(output_path), convert_params,
+            lambda: converter.convert_pdf_to_markdown(pdf_path, output_path),
+            force=args.force
+        )
     
     logger.info("🚀 FAST PDF TO MARKDOWN CONVERSION")
     logger.info("Using PyPDF2 text extraction (instant processing!)")
@@ -176,7 +202,7 @@ def main():
             return 1
         
         output_path = output_dir / f"{pdf_path.stem}.md"
-        success = converter.convert_pdf_to_markdown(pdf_path, output_path)
+        success = convert(pdf_path, output_path)
         
         if success:
             logger.info("🎉 Single file conversion completed!")
@@ -205,7 +231,7 @@ def main():
         for pdf_path in pdf_files:
             output_path = output_dir / f"{pdf_path.stem}.md"
             
-            if converter.convert_pdf_to_markdown(pdf_path, output_path):
+            if convert(pdf_path, output_path):
                 successful += 1
             else:
                 failed += 1